@@ -0,0 +1,18 @@
+import pytest
+
+from bibliopixel.colors import hue
+
+HSV2RGB = (hue.hsv2rgb_raw, hue.hsv2rgb_spectrum, hue.hsv2rgb_rainbow,
+           hue.hsv2rgb_360)
+HSV = [(h, 255, 255) for h in range(256)]
+HSV_360 = [(h, 1.0, 1.0) for h in range(360)]
+
+
+@pytest.mark.parametrize('hsv2rgb', HSV2RGB, ids=lambda f: f.__name__)
+def test_hsv2rgb(hsv2rgb, benchmark):
+    values = HSV_360 if hsv2rgb is hue.hsv2rgb_360 else HSV
+
+    def convert():
+        for hsv in values:
+            hsv2rgb(hsv)
+    benchmark(convert)
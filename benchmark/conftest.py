@@ -0,0 +1,31 @@
+import pytest
+
+from bibliopixel import data_maker
+
+# Pixel counts for benchmarks of the frame path, from a small strip to a
+# large installation.
+PIXEL_COUNTS = 100, 1000, 10000, 100000
+
+
+@pytest.fixture(params=PIXEL_COUNTS)
+def pixel_count(request):
+    return request.param
+
+
+@pytest.fixture(params=['list', 'numpy'])
+def maker(request):
+    """The data_maker.Maker for the layout's colors."""
+    if request.param == 'list':
+        return data_maker.Maker()
+    if not data_maker.numpy:
+        pytest.skip('numpy is not installed')
+    return data_maker.Maker(integer=True, use_numpy=True)
+
+
+@pytest.fixture
+def colors(pixel_count, maker):
+    """A varied list of colors, of the right size and type."""
+    result = maker.color_list(pixel_count)
+    for i in range(pixel_count):
+        result[i] = i % 256, (7 * i) % 256, (13 * i) % 256
+    return result
@@ -0,0 +1,50 @@
+import pytest
+from unittest import mock
+
+from bibliopixel.drivers.network import Network
+from bibliopixel.drivers.serial import Serial, LEDTYPE
+from bibliopixel.drivers.SimPixel import SimPixel
+from bibliopixel.drivers.SPI import SPI, SPI_INTERFACES
+from bibliopixel.return_codes import RETURN_CODES
+
+# The serial protocol sends a 16-bit byte count.
+MAX_HEADER_PIXELS = 0xFFFF // 3
+
+
+def apa102(num):
+    return SPI(ledtype='APA102', num=num, interface=SPI_INTERFACES.DUMMY)
+
+
+def lpd8806(num):
+    return SPI(ledtype='LPD8806', num=num, interface=SPI_INTERFACES.DUMMY)
+
+
+def ws281x(num):
+    return SPI(ledtype='WS2812', num=num, interface=SPI_INTERFACES.DUMMY,
+               max_pixels=0)
+
+
+def serial(num):
+    if num > MAX_HEADER_PIXELS:
+        pytest.skip('Too many pixels for the serial protocol')
+    with mock.patch.object(Serial, '_connect',
+                           return_value=RETURN_CODES.SUCCESS):
+        return Serial(LEDTYPE.WS2812B, num)
+
+
+def network(num):
+    return Network(num)
+
+
+def simpixel(num):
+    return SimPixel(num)
+
+
+DRIVERS = apa102, lpd8806, ws281x, serial, network, simpixel
+
+
+@pytest.mark.parametrize('make_driver', DRIVERS, ids=lambda d: d.__name__)
+def test_compute_packet(make_driver, colors, pixel_count, benchmark):
+    driver = make_driver(pixel_count)
+    driver.set_colors(colors, 0)
+    benchmark(driver._compute_packet)
@@ -0,0 +1,30 @@
+import pytest
+
+from bibliopixel import image
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.layout import Matrix
+
+Image = pytest.importorskip('PIL.Image')
+
+SIZES = 16, 64, 256
+
+
+def make_image(size, mode='RGBA'):
+    img = Image.new(mode, (size, size))
+    img.putdata([(x % 256, y % 256, (x + y) % 256, 255)[:len(mode)]
+                 for y in range(size) for x in range(size)])
+    return img
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_load_image(size, tmpdir, benchmark):
+    path = str(tmpdir.join('image.png'))
+    make_image(size).save(path)
+    matrix = Matrix(DriverBase(num=size * size), width=size, height=size)
+    benchmark(image.showImage, matrix, imagePath=path)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_image_to_colorlist(size, benchmark):
+    img = make_image(size, 'RGB')
+    benchmark(image.image_to_colorlist, img)
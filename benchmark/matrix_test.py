@@ -42,7 +42,7 @@ def test_draw_circle2(benchmark):
 
     def test():
         matrix.drawCircle(4, 4, 15, WHITE)
-        expected = [3, 13, 17, 31]  # Why isn't this empty!?
+        expected = []  # Negative coordinates are clipped, not wrapped.
         assert_changed(matrix, expected)
     benchmark(test)
 
@@ -52,8 +52,8 @@ def test_draw_circle3(benchmark):
 
     def test():
         matrix.drawCircle(4, 6, 20, WHITE)
-        expected = [0]
-        assert_changed(matrix, expected)  # Huh?
+        expected = []
+        assert_changed(matrix, expected)
     benchmark(test)
 
 
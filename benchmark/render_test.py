@@ -0,0 +1,21 @@
+from bibliopixel.drivers.driver_base import DriverBase
+
+
+def test_render(colors, pixel_count, benchmark):
+    driver = DriverBase(num=pixel_count)
+    driver.set_colors(colors, 0)
+    benchmark(driver._render)
+
+
+def test_render_brightness(colors, pixel_count, benchmark):
+    driver = DriverBase(num=pixel_count)
+    driver.set_colors(colors, 0)
+    driver._brightness = 128
+    benchmark(driver._render)
+
+
+def test_render_float(pixel_count, benchmark):
+    driver = DriverBase(num=pixel_count)
+    colors = [(i % 256 + 0.5, 0.25, 0.75) for i in range(pixel_count)]
+    driver.set_colors(colors, 0)
+    benchmark(driver._render)
@@ -0,0 +1,15 @@
+import pytest
+
+from bibliopixel import font
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.layout import Matrix
+
+WHITE = (255, 255, 255)
+
+
+@pytest.mark.parametrize('font_scale', [1, 4])
+@pytest.mark.parametrize('font_name', sorted(font.fonts))
+def test_draw_text(font_name, font_scale, benchmark):
+    matrix = Matrix(DriverBase(num=128 * 64), width=128, height=64)
+    benchmark(matrix.drawText, 'BiblioPixel!', color=WHITE,
+              font=font_name, font_scale=font_scale)
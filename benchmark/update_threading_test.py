@@ -0,0 +1,29 @@
+import pytest
+
+from bibliopixel import data_maker
+from bibliopixel.drivers.SPI import SPI, SPI_INTERFACES
+from bibliopixel.layout import Strip
+
+MODES = False, True, 1, 'process'
+DRIVER_COUNT = 4
+
+
+@pytest.mark.parametrize('threadedUpdate', MODES, ids=str)
+def test_update(threadedUpdate, pixel_count, benchmark):
+    maker = data_maker.Maker(shared_memory=threadedUpdate == 'process')
+    count = pixel_count // DRIVER_COUNT
+    drivers = [SPI(ledtype='APA102', num=count, maker=maker,
+                   interface=SPI_INTERFACES.DUMMY)
+               for i in range(DRIVER_COUNT)]
+    strip = Strip(drivers, threadedUpdate=threadedUpdate, maker=maker)
+    strip.fill((255, 128, 64))
+
+    def update():
+        strip.set_dirty()
+        strip.push_to_driver()
+        strip.threading.wait_for_update()
+
+    try:
+        benchmark(update)
+    finally:
+        strip.threading.stop()
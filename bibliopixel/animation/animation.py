@@ -1,7 +1,9 @@
 import contextlib, threading, time
 from . runner import Runner
 from .. import log
+from .. threads import scheduler
 from .. threads.animation_threading import AnimationThreading
+from .. util import metrics
 
 
 class BaseAnimation(object):
@@ -10,6 +12,7 @@ class BaseAnimation(object):
     def __init__(self, layout):
         self.layout = layout
         self.internal_delay = None
+        self.metrics = metrics.Metrics('animation', type(self).__name__)
 
     @property
     def _led(self):
@@ -47,7 +50,7 @@ class BaseAnimation(object):
 
         stamp()
 
-        self.step(self.runner.amt)
+        self.step(self.runner.amt * self._frames_to_step)
 
         stamp()
 
@@ -66,7 +69,18 @@ class BaseAnimation(object):
 
         stamp()
 
-        self.threading.wait(self.sleep_time, timestamps)
+        m = self.metrics
+        m.record('step', timestamps[1] - timestamps[0])
+        m.record('update', timestamps[2] - timestamps[1])
+
+        with m.timer('sleep'):
+            frames = self.threading.wait()
+
+        # Only frames that step the animation count towards max_steps: under
+        # 'drop', the next step also covers the frames that were skipped.
+        if self.runner.frame_policy == scheduler.DROP:
+            self._frames_to_step = frames
+            self.cur_step += frames - 1
 
     @contextlib.contextmanager
     def run_context(self):
@@ -74,6 +88,7 @@ class BaseAnimation(object):
         self._step = 0
         self.cur_step = 0
         self.cycle_count = 0
+        self._frames_to_step = 1
 
         if self.free_run:
             self.sleep_time = None
@@ -84,6 +99,7 @@ class BaseAnimation(object):
         self.layout.animation_sleep_time = self.sleep_time or 0
 
         self.preRun(self.runner.amt)
+        self.threading.start_schedule(self.sleep_time, self.metrics)
         try:
             yield
         finally:
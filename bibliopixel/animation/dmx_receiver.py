@@ -0,0 +1,209 @@
+import socket, struct, threading, time
+
+from . receiver import BaseReceiver
+from .. import log
+from .. drivers import artnet, e131
+from .. drivers.dmx import UNIVERSE_PIXELS
+
+# Large enough for any E1.31 or Art-Net packet.
+MAX_PACKET_SIZE = 1024
+
+# How often the receive thread checks whether it has been stopped.
+POLL_TIME = 0.1
+
+# What _parse() returns for a sync packet.
+SYNC = 'sync'
+
+
+class UniverseReceiver(BaseReceiver):
+    """
+    Base class for animations that receive pixels as DMX512 universes, and
+    display them on the layout.
+
+    The layout's pixels are split into universes of `pixels_per_universe`
+    pixels each, numbered up from `universe`, and a table mapping each
+    universe to its range of bytes in the frame is computed once.  All the
+    universes are received on one socket.
+
+    A frame is only displayed once it is complete: when a sync packet
+    arrives, or if the sender doesn't send sync packets, when every universe
+    has arrived.
+
+    Subclasses implement _parse().
+    """
+
+    def __init__(self, layout, universe=1, pixels_per_universe=UNIVERSE_PIXELS,
+                 interface='0.0.0.0', port=None):
+        super().__init__(layout)
+        size = 3 * len(self.layout._colors)
+        step = 3 * pixels_per_universe
+        self._table = {universe + i: (start, min(start + step, size))
+                       for i, start in enumerate(range(0, size, step))}
+
+        self._pending = bytearray(size)
+        self._frame = bytearray(size)
+        self._received = set()
+        self._lock = threading.Lock()
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((interface, port))
+        self._sock.settimeout(POLL_TIME)
+        self.address = self._sock.getsockname()
+        self._recv_thread_obj = self._receive
+
+    def _parse(self, packet):
+        """
+        Return (universe, data, sync) for a packet holding DMX data, where
+        sync is True if the frame must wait for a sync packet, SYNC for a
+        sync packet, or None for any other packet.
+        """
+        raise NotImplementedError
+
+    def step(self, amt=1):
+        super().step(amt)
+        with self._lock:
+            self.layout.set_many(self._frame)
+
+    def thread_cleanup(self):
+        self._sock.close()
+
+    def _receive(self):
+        packet = bytearray(MAX_PACKET_SIZE)
+        view = memoryview(packet)
+        while not self._stop_event.is_set():
+            try:
+                size = self._sock.recv_into(packet)
+            except socket.timeout:
+                continue
+            except OSError:
+                if not self._stop_event.is_set():
+                    log.exception('Error receiving DMX universe')
+                return
+
+            result = self._parse(view[:size])
+            if result == SYNC:
+                self._present()
+            elif result:
+                self._receive_universe(*result)
+
+    def _receive_universe(self, universe, data, sync):
+        r = self._table.get(universe)
+        if not r:
+            return
+
+        start, end = r
+        end = min(end, start + len(data))
+        self._pending[start:end] = data[:end - start]
+        self._received.add(universe)
+        if not sync and len(self._received) == len(self._table):
+            self._present()
+
+    def _present(self):
+        if self._received:
+            self._received.clear()
+            with self._lock:
+                self._frame[:] = self._pending
+            self._hold_for_data.set()
+
+
+class E131Receiver(UniverseReceiver):
+    """
+    Receives E1.31 (streaming ACN, or sACN) universes.
+
+    If `multicast` is True, it joins the multicast group of every universe,
+    and of `sync_universe` if that is set.
+
+    Only synchronization packets for `sync_universe` present a frame.  If
+    `sync_universe` is not set, the sync universe named by the last data
+    packet is used instead.
+    """
+
+    def __init__(self, layout, universe=1, interface='0.0.0.0', port=e131.PORT,
+                 multicast=True, sync_universe=0, **kwds):
+        super().__init__(layout, universe=universe, interface=interface,
+                         port=port, **kwds)
+        self._sync_universe = sync_universe
+        self._sync_address = sync_universe
+        if multicast:
+            groups = list(self._table)
+            if sync_universe:
+                groups.append(sync_universe)
+            for u in groups:
+                self._join(e131.multicast_address(u), interface)
+
+    def _join(self, group, interface):
+        membership = socket.inet_aton(group) + socket.inet_aton(interface)
+        try:
+            self._sock.setsockopt(
+                socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        except OSError as e:
+            log.warning('Unable to join multicast group %s: %s', group, e)
+
+    def _parse(self, packet):
+        if (len(packet) < e131.ROOT_LAYER_SIZE or
+                packet[4:16] != e131.ACN_PACKET_IDENTIFIER):
+            return None
+
+        vector = struct.unpack_from('>I', packet, 18)[0]
+        if vector == e131.VECTOR_ROOT_E131_EXTENDED:
+            if len(packet) < e131.SYNC_PACKET.size:
+                return None
+            fields = e131.SYNC_PACKET.unpack_from(packet)
+            framing_vector, sync_address = fields[7], fields[9]
+            if framing_vector != e131.VECTOR_E131_EXTENDED_SYNCHRONIZATION:
+                return None
+            if sync_address and sync_address == self._sync_address:
+                return SYNC
+            return None
+
+        if (vector != e131.VECTOR_ROOT_E131_DATA or
+                len(packet) < e131.DATA_HEADER.size):
+            return None
+
+        fields = e131.DATA_HEADER.unpack_from(packet)
+        sync_address, options, universe = fields[10], fields[12], fields[13]
+        count, start_code = fields[19], fields[20]
+        if start_code or options & e131.PREVIEW_DATA:
+            return None
+        if not self._sync_universe:
+            self._sync_address = sync_address
+
+        begin = e131.DATA_HEADER.size
+        return universe, packet[begin:begin + count - 1], bool(sync_address)
+
+
+class ArtNetReceiver(UniverseReceiver):
+    """
+    Receives Art-Net universes.
+
+    After an ArtSync packet arrives, frames are only displayed on ArtSync
+    packets, until none has arrived for ARTSYNC_TIMEOUT seconds.
+    """
+
+    ARTSYNC_TIMEOUT = 4
+
+    def __init__(self, layout, universe=0, interface='0.0.0.0',
+                 port=artnet.PORT, **kwds):
+        super().__init__(layout, universe=universe, interface=interface,
+                         port=port, **kwds)
+        self._last_sync = 0
+
+    def _parse(self, packet):
+        if packet[:8] != artnet.ID or len(packet) < 10:
+            return None
+
+        opcode = packet[8] | packet[9] << 8
+        if opcode == artnet.OP_SYNC:
+            self._last_sync = time.time()
+            return SYNC
+
+        if opcode != artnet.OP_DMX or len(packet) < artnet.DMX_HEADER.size:
+            return None
+
+        fields = artnet.DMX_HEADER.unpack_from(packet)
+        universe = fields[6] | fields[7] << 8
+        length = fields[8] << 8 | fields[9]
+        begin = artnet.DMX_HEADER.size
+        sync = time.time() - self._last_sync < self.ARTSYNC_TIMEOUT
+        return universe, packet[begin:begin + length], sync
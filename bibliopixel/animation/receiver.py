@@ -37,9 +37,9 @@ class BaseReceiver(BaseAnimation):
 
     def preRun(self, amt=1):
         self.layout.all_off()
-        self.start()
+        self.start_receiver()
 
-    def start(self):
+    def start_receiver(self):
         self._t = threading.Thread(target=self._recv_thread_obj)
         self._t.setDaemon(True)  # don't hang on exit
         self._t.start()
@@ -51,9 +51,14 @@ class BaseReceiver(BaseAnimation):
 
     def stop(self):
         self._stop_event.set()
+        self._hold_for_data.set()
         log.info("Stopping Receiver...")
         self.thread_cleanup()
 
+    def cleanup(self):
+        self.stop()
+        super().cleanup()
+
     def _exit(self, type, value, traceback):
         self.stop()
 
@@ -0,0 +1,61 @@
+import time
+
+from . animation import BaseAnimation
+from .. util import frame_file
+
+
+class Replay(BaseAnimation):
+    """
+    Plays back a frame file recorded by the Recorder driver.
+
+    The file is memory-mapped, and each frame goes straight into the layout
+    without being parsed.  Frames are played at `fps` frames a second if it
+    is set, otherwise at the rate stored in the file, otherwise at the times
+    they were recorded.
+    """
+
+    def __init__(self, layout, filename='frames.bpx', fps=None):
+        super().__init__(layout)
+        self.file = frame_file.FrameFile(filename)
+        if not self.file:
+            self.file.close()
+            raise ValueError('%s has no frames' % filename)
+
+        fps = fps or self.file.fps
+        if fps:
+            self.internal_delay = 1 / fps
+        else:
+            # step() waits for each frame's timestamp itself.
+            self.free_run = True
+
+        self.index = 0
+        self._start_time = None
+
+    def preRun(self, amt=1):
+        super().preRun(amt)
+        self.index = 0
+        self._start_time = None
+
+    def step(self, amt=1):
+        if self.free_run:
+            self._wait_for_frame()
+        self.layout.set_many(self.file.frame(self.index))
+        self.index += amt
+        if self.index >= len(self.file):
+            self.index %= len(self.file)
+            self.completed = True
+            self._start_time = None
+
+    def cleanup(self):
+        super().cleanup()
+        self.file.close()
+
+    def _wait_for_frame(self):
+        """Wait until the current frame is due, relative to when the first
+        frame played."""
+        timestamp, now = self.file.timestamp(self.index), time.time()
+        if self._start_time is None:
+            self._start_time = now - timestamp
+        delay = self._start_time + timestamp - now
+        if delay > 0:
+            self.threading.sleep(delay)
@@ -2,7 +2,8 @@ class Runner(object):
 
     def __init__(self, amt=1, fps=None, sleep_time=0, max_steps=0,
                  until_complete=False, max_cycles=0, seconds=None,
-                 threaded=False, join_thread=False):
+                 threaded=False, join_thread=False, frame_policy='slip',
+                 sync_time=None):
         assert max_steps >= 0
         assert sleep_time >= 0
         assert max_cycles >= 0
@@ -21,3 +22,5 @@ class Runner(object):
         self.seconds = seconds
         self.threaded = threaded
         self.join_thread = join_thread
+        self.frame_policy = frame_policy
+        self.sync_time = sync_time
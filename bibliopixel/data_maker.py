@@ -1,10 +1,23 @@
 import ctypes
 from multiprocessing.sharedctypes import RawArray
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Note https://stackoverflow.com/questions/37705974/
 
 BYTE, FLOAT = ctypes.c_uint8, ctypes.c_float
 
+NUMPY_TYPES = {BYTE: 'uint8', FLOAT: 'float32'}
+
+CANT_IMPORT_NUMPY_ERROR = """
+Unable to import numpy. Please install:
+
+    pip install numpy
+"""
+
 
 def shared_list_maker(type):
     return lambda size: RawArray(type, size)
@@ -14,11 +27,35 @@ def list_maker(size):
     return [(0, 0, 0)] * size
 
 
+def numpy_list_maker(type, shared_memory=False):
+    """Return a function making a contiguous (size, 3) numpy array of colors.
+
+    If shared_memory is True, the array is a view on a RawArray so that it
+    can be shared with other processes.
+    """
+    if shared_memory:
+        def maker(size):
+            raw = RawArray(type, 3 * size)
+            return numpy.ctypeslib.as_array(raw).reshape(size, 3)
+        return maker
+
+    return lambda size: numpy.zeros((size, 3), dtype=NUMPY_TYPES[type])
+
+
 class Maker(object):
-    def __init__(self, integer=False, shared_memory=False):
-        if shared_memory:
+    def __init__(self, integer=False, shared_memory=False, use_numpy=False):
+        self.use_numpy = use_numpy
+        number_type = BYTE if integer else FLOAT
+
+        if use_numpy:
+            if not numpy:
+                raise ImportError(CANT_IMPORT_NUMPY_ERROR)
+            self.make_packet = (
+                shared_list_maker(BYTE) if shared_memory else bytearray)
+            self.color_list = numpy_list_maker(number_type, shared_memory)
+
+        elif shared_memory:
             self.make_packet = shared_list_maker(BYTE)
-            number_type = BYTE if integer else FLOAT
             self.color_list = shared_list_maker(3 * number_type)
 
         else:
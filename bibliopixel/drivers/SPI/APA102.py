@@ -1,6 +1,5 @@
 from ... import gamma
 from .. channel_order import ChannelOrder
-from ... import data_maker
 from . base import SPIBase
 
 
@@ -21,6 +20,11 @@ class APA102(SPIBase):
         self._packet = self.maker.make_packet(self._start_frame + self._pixel_bytes +
                                               self._reset_frame + self._end_frame)
 
+        # Render [r, g, b] straight into each pixel's frame, after the
+        # brightness byte.
+        self._packet_layout = self._start_frame + 1, 4
+        self._chipset_brightness = None
+
         self.set_device_brightness(0xFF)  # required to setup _packet
 
     def set_device_brightness(self, val):
@@ -31,12 +35,9 @@ class APA102(SPIBase):
         Because of this SK9822 will have much less flicker at lower levels.
         Either way, this option is better and faster than scaling in BiblioPixel
         """
-        self._chipset_brightness = (val >> 3)  # bitshift to scale from 8 bit to 5
-        self._brightness_list = [0xE0 + self._chipset_brightness] * self.numLEDs
-        self._packet[self._start_frame + 0:self._pixel_stop:4] = self._brightness_list
-
-    def _compute_packet(self):
-        self._render()
-        self._packet[self._start_frame + 1:self._pixel_stop:4] = self._buf[0::3]
-        self._packet[self._start_frame + 2:self._pixel_stop:4] = self._buf[1::3]
-        self._packet[self._start_frame + 3:self._pixel_stop:4] = self._buf[2::3]
+        brightness = (val >> 3)  # bitshift to scale from 8 bit to 5
+        if brightness != self._chipset_brightness:
+            self._chipset_brightness = brightness
+            frame_byte = bytes((0xE0 + brightness,))
+            self._packet[self._start_frame:self._pixel_stop:4] = (
+                frame_byte * self.numLEDs)
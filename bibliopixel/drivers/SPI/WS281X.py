@@ -1,48 +1,67 @@
 from .. channel_order import ChannelOrder
 from . base import SPIBase
-from ... import gamma as _gamma
+from ... import data_maker, gamma as _gamma
 from . import interfaces
 
+numpy = data_maker.numpy
 
+
+# The smallest default limit on the number of pixels.  Each pixel takes 9
+# bytes on the wire, and 455 pixels is the most that fits into spidev's default
+# buffer size of 4096 bytes.  If spidev's bufsiz parameter has been raised,
+# the default limit is raised to match.
 MAX_PIXELS = 455
 
 
+def _encode(byte):
+    """Encode one data byte as three SPI bytes, most significant bit first.
+
+    As an hack to emulate PWM we use 3 bit on an SPI interface.
+    data -> spi
+    0b0  -> 0b100
+    0b1  -> 0b110
+    """
+    tmp = 0
+    for i in range(8):
+        tmp |= (0b100 | (0b10 if (byte & 1 << i) > 0 else 0)) << (i * 3)
+    return bytes((tmp >> 16 & 0xff, tmp >> 8 & 0xff, tmp & 0xff))
+
+
+ENCODING = [_encode(i) for i in range(256)]
+NUMPY_ENCODING = numpy and numpy.array(
+    [list(e) for e in ENCODING], dtype=numpy.uint8)
+
+
 class WS281X(SPIBase):
     """
     SPI driver for WS2812(b) based LED strips on devices like
     Raspberry Pi, OrangePi, BeagleBone,..
     """
 
-    def __init__(self, num, gamma=_gamma.WS2812, spi_speed=3.2, **kwargs):
+    def __init__(self, num, gamma=_gamma.WS2812, spi_speed=3.2,
+                 max_pixels=None, **kwargs):
         # WS281x need a base clock of ~1MHz with the encoding we need 3 times this clock
         # After testing 3.0 to 3.2 looks like a good value
         super().__init__(num, gamma=gamma, spi_speed=spi_speed, **kwargs)
         if isinstance(self._interface, interfaces.SpiFileInterface):
             raise ValueError('SPI File interface is unsupported by WS281X')
-        if num > MAX_PIXELS:
-            raise ValueError('WS2812X SPI driver only supports {} pixels max.'.format(MAX_PIXELS))
+        if max_pixels is None:
+            bufsiz = interfaces.spidev_bufsiz(0)
+            max_pixels = max(MAX_PIXELS, (bufsiz - 1) // 9)
+        if max_pixels and num > max_pixels:
+            raise ValueError('WS2812X SPI driver only supports {} pixels max.'.format(max_pixels))
+
+        # [0] fixes, first led show green when should be off
+        self._packet = self.maker.make_packet(1 + 3 * len(self._buf))
 
     # WS2812 requires gamma correction so we run it through gamma as the
-    # channels are ordered
-    # As an hack to emulate PWM we use 3 bit on an SPI interface.
-    # data -> spi
-    # 0b0  -> 0b100
-    # 0b1  -> 0b110
+    # channels are ordered, then encode each byte with ENCODING.
     def _compute_packet(self):
-        # self._render()
-        super()._compute_packet()
-
-        # buffer for result
-        # [0] fixes, first led show green when should be off
-        buf2 = bytearray([0])
-        for byte in self._buf:
-            # save each byte in an int var
-            tmp = 0
-            for i in range(8):
-                tmp |= (0b100 | (0b10 if (byte & 1 << i) > 0 else 0)) << (i * 3)
-            # save each byte in little endian
-            buf2.append(tmp >> 16 & 0xff)
-            buf2.append(tmp >> 8 & 0xff)
-            buf2.append(tmp & 0xff)
-
-        self._packet = buf2
+        self._render()
+        if numpy:
+            data = numpy.frombuffer(self._buf, dtype=numpy.uint8)
+            out = numpy.frombuffer(self._packet, dtype=numpy.uint8)
+            numpy.take(NUMPY_ENCODING, data, axis=0,
+                       out=out[1:].reshape(-1, 3))
+        else:
+            self._packet[1:] = b''.join(map(ENCODING.__getitem__, self._buf))
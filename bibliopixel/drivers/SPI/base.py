@@ -7,9 +7,18 @@ from . import interfaces
 
 class SPIBase(DriverBase):
     """Base driver for controling SPI devices on systems like the Raspberry Pi and BeagleBone"""
+
+    # Drivers which render straight into self._packet set this to the
+    # (offset, stride) of the pixel data within the packet.
+    _packet_layout = None
+
     def __init__(self, num, dev='/dev/spidev0.0',
-                 interface='FILE', spi_speed=1,
+                 interface='FILE', spi_speed=1, chunk_size=None,
                  **kwargs):
+        """
+        chunk_size - the largest number of bytes sent in one SPI transfer.
+            If not set, it is read from spidev's bufsiz module parameter.
+        """
 
         super().__init__(num, **kwargs)
 
@@ -17,11 +26,18 @@ class SPIBase(DriverBase):
         if iface >= len(interfaces._SPI_INTERFACES):
             raise ValueError('{} is not a valid interface.'.format(interface))
 
-        self._interface = interfaces._SPI_INTERFACES[iface](dev=dev, spi_speed=spi_speed)
+        self._interface = interfaces._SPI_INTERFACES[iface](
+            dev=dev, spi_speed=spi_speed, chunk_size=chunk_size)
 
     def _send_packet(self):
         self._interface.send_packet(self._packet)
 
+    def _render_target(self):
+        if self._packet_layout:
+            return (self._packet,) + tuple(self._packet_layout)
+        return super()._render_target()
+
     def _compute_packet(self):
         self._render()
-        self._packet = self._interface.compute_packet(self._buf)
+        if not self._packet_layout:
+            self._packet = self._interface.compute_packet(self._buf)
@@ -1,16 +1,33 @@
 import os
-import math
 from enum import IntEnum
 from . import errors
 from ... import log
 
+# spidev's maximum transfer size is a module parameter, readable here.
+SPIDEV_BUFSIZ_FILE = '/sys/module/spidev/parameters/bufsiz'
+
+# Used if SPIDEV_BUFSIZ_FILE can't be read:  a bit smaller than spidev's
+# default of 4096 because of headers.
+DEFAULT_CHUNK_SIZE = 4032
+
+
+def spidev_bufsiz(default=DEFAULT_CHUNK_SIZE):
+    """Return spidev's maximum transfer size in bytes, or default if it can't
+    be read."""
+    try:
+        with open(SPIDEV_BUFSIZ_FILE) as fp:
+            return int(fp.read()) or default
+    except (IOError, ValueError):
+        return default
+
 
 class SpiBaseInterface(object):
     """ abstract class for different spi backends"""
 
-    def __init__(self, dev, spi_speed):
+    def __init__(self, dev, spi_speed, chunk_size=None):
         self._dev = dev
         self._spi_speed = spi_speed
+        self.chunk_size = chunk_size or spidev_bufsiz()
 
     def send_packet(self, data):
         raise NotImplementedError
@@ -18,6 +35,12 @@ class SpiBaseInterface(object):
     def compute_packet(self, data):
         return data
 
+    def chunks(self, data):
+        """Yield chunk_size pieces of data as memoryviews, without copying."""
+        view = memoryview(data).cast('B')
+        for i in range(0, len(view), self.chunk_size):
+            yield view[i:i + self.chunk_size]
+
     def error(self, text):
         msg = 'Error with dev: {}, spi_speed: {} - {}'.format(self._dev, self._spi_speed, text)
         log.error(msg)
@@ -32,17 +55,18 @@ class SpiFileInterface(SpiBaseInterface):
         if not os.path.exists(self._dev):
             self.error(errors.CANT_FIND_ERROR)
 
-        self._spi = open(self._dev, 'wb')
+        self._fd = os.open(self._dev, os.O_WRONLY)
 
         log.info('file io spi dev {:s}'.format(self._dev))
 
     def send_packet(self, data):
-        package_size = 4032  # bit smaller than 4096 because of headers
-        for i in range(int(math.ceil(len(data) / package_size))):
-            start = i * package_size
-            end = (i + 1) * package_size
-            self._spi.write(data[start:end])
-            self._spi.flush()
+        # spidev handles each piece of a writev as a separate transfer.
+        chunks = list(self.chunks(data))
+        if hasattr(os, 'writev') and len(chunks) > 1:
+            os.writev(self._fd, chunks)
+        else:
+            for chunk in chunks:
+                os.write(self._fd, chunk)
 
 
 class SpiPeripheryInterface(SpiBaseInterface):
@@ -63,11 +87,13 @@ class SpiPeripheryInterface(SpiBaseInterface):
             self._dev, self._spi.max_speed / 1e6))
 
     def send_packet(self, data):
-        package_size = 4032  # bit smaller than 4096 because of headers
-        for i in range(int(math.ceil(len(data) / package_size))):
-            start = i * package_size
-            end = (i + 1) * package_size
-            self._spi.transfer(data[start:end])
+        # periphery only accepts bytes, bytearray or list, so packets too
+        # large for one transfer have to be copied, chunk by chunk.
+        if len(data) <= self.chunk_size and isinstance(data, bytearray):
+            self._spi.transfer(data)
+        else:
+            for chunk in self.chunks(data):
+                self._spi.transfer(chunk.tobytes())
 
 
 class SpiPyDevInterface(SpiBaseInterface):
@@ -106,7 +132,15 @@ class SpiPyDevInterface(SpiBaseInterface):
             'py-spidev dev {:s} speed @ {:.2f} MHz'.format(self._dev, self._spi.max_speed_hz / 1e6))
 
     def send_packet(self, data):
-        self._spi.xfer2(list(data))
+        # writebytes2 and xfer3 appeared in py-spidev 3.4, and split large
+        # packets into transfers themselves.
+        if hasattr(self._spi, 'writebytes2'):
+            self._spi.writebytes2(data)
+        elif hasattr(self._spi, 'xfer3'):
+            self._spi.xfer3(data)
+        else:
+            for chunk in self.chunks(data):
+                self._spi.xfer2(chunk.tolist())
 
 
 class SpiDummyInterface(SpiBaseInterface):
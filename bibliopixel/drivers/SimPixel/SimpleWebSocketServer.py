@@ -21,6 +21,7 @@ import struct
 import ssl
 import errno
 import codecs
+import zlib
 from collections import deque
 from select import select
 
@@ -35,6 +36,45 @@ def _check_unicode(val):
         return isinstance(val, unicode)
 
 
+def deflate_offer(header):
+    """
+        Return the server_max_window_bits to compress with if the
+        Sec-WebSocket-Extensions header offers permessage-deflate in a form
+        we accept, or None.
+    """
+    for offer in (header or '').split(','):
+        params = [p.strip() for p in offer.split(';')]
+        if params[0].lower() != DEFLATE_EXTENSION:
+            continue
+
+        wbits = 15
+        for param in params[1:]:
+            name, _, value = param.partition('=')
+            name, value = name.strip().lower(), value.strip().strip('"')
+            if name == 'server_max_window_bits':
+                if not value.isdigit() or not 9 <= int(value) <= 15:
+                    break
+                wbits = int(value)
+            elif name not in ('server_no_context_takeover',
+                              'client_no_context_takeover',
+                              'client_max_window_bits'):
+                break
+        else:
+            return wbits
+
+    return None
+
+
+def deflate_message(data, wbits=15, level=zlib.Z_DEFAULT_COMPRESSION):
+    """
+        Compress one whole message for permessage-deflate, without any
+        context from earlier messages.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -wbits)
+    data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return data[:-len(DEFLATE_TAIL)]
+
+
 class HTTPRequest(BaseHTTPRequestHandler):
 
     def __init__(self, request_text):
@@ -55,8 +95,19 @@ HANDSHAKE_STR = (
     "HTTP/1.1 101 Switching Protocols\r\n"
     "Upgrade: WebSocket\r\n"
     "Connection: Upgrade\r\n"
-    "Sec-WebSocket-Accept: %(acceptstr)s\r\n\r\n"
+    "Sec-WebSocket-Accept: %(acceptstr)s\r\n"
+    "%(extensions)s\r\n"
+)
+
+# permessage-deflate (RFC 7692): each message is compressed on its own, so
+# the same compressed message can be sent to any client.
+DEFLATE_EXTENSION = 'permessage-deflate'
+DEFLATE_RESPONSE = (
+    "Sec-WebSocket-Extensions: permessage-deflate; "
+    "server_no_context_takeover%s\r\n"
 )
+DEFLATE_TAIL = b'\x00\x00\xff\xff'
+RSV1 = 0x40
 
 GUID_STR = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
 
@@ -80,6 +131,9 @@ MAXPAYLOAD = 33554432
 
 class WebSocket(object):
 
+    # Set to True to accept permessage-deflate from clients that offer it.
+    permessage_deflate = False
+
     def __init__(self, server, sock, address):
         self.server = server
         self.client = sock
@@ -108,6 +162,11 @@ class WebSocket(object):
         self.closed = False
         self.sendq = deque()
 
+        # permessage-deflate: set deflate_wbits if the client offers it.
+        self.deflate_wbits = None
+        self.inflater = None
+        self.compressed = False
+
         self.state = HEADERB1
 
         # restrict the size of header and payload for security reasons
@@ -136,7 +195,21 @@ class WebSocket(object):
         """
         pass
 
+    def _inflate(self):
+        if self.compressed and self.opcode in (STREAM, TEXT, BINARY):
+            data = bytes(self.data)
+            if self.fin:
+                data += DEFLATE_TAIL
+            self.data = bytearray(
+                self.inflater.decompress(data, self.maxpayload))
+            if self.inflater.unconsumed_tail:
+                raise Exception('payload exceeded allowable size')
+            if self.fin:
+                self.compressed = False
+
     def _handlePacket(self):
+        self._inflate()
+
         if self.opcode == CLOSE:
             pass
         elif self.opcode == STREAM:
@@ -269,7 +342,19 @@ class WebSocket(object):
                         k = key.encode('ascii') + GUID_STR.encode('ascii')
                         k_s = base64.b64encode(
                             hashlib.sha1(k).digest()).decode('ascii')
-                        hStr = HANDSHAKE_STR % {'acceptstr': k_s}
+                        extensions = ''
+                        if self.permessage_deflate:
+                            self.deflate_wbits = deflate_offer(
+                                self.request.headers.get(
+                                    'Sec-WebSocket-Extensions'))
+                        if self.deflate_wbits is not None:
+                            self.inflater = zlib.decompressobj(-15)
+                            extensions = DEFLATE_RESPONSE % (
+                                '' if self.deflate_wbits == 15 else
+                                '; server_max_window_bits=%d' %
+                                self.deflate_wbits)
+                        hStr = HANDSHAKE_STR % {'acceptstr': k_s,
+                                                'extensions': extensions}
                         self.sendq.append((BINARY, hStr.encode('ascii')))
                         self.handshaked = True
                         self.handleConnected()
@@ -393,6 +478,12 @@ class WebSocket(object):
         if _check_unicode(data):
             data = data.encode('utf-8')
 
+        # Only whole, unfragmented messages are compressed.
+        if (self.deflate_wbits is not None and fin is False and
+                opcode in (TEXT, BINARY)):
+            data = deflate_message(data, self.deflate_wbits)
+            b1 |= RSV1
+
         length = len(data)
         payload.append(b1)
 
@@ -429,7 +520,9 @@ class WebSocket(object):
             self.data = bytearray()
 
             rsv = byte & 0x70
-            if rsv != 0:
+            if rsv == RSV1 and self.inflater and self.opcode in (TEXT, BINARY):
+                self.compressed = True
+            elif rsv != 0:
                 raise Exception('RSV bit must be 0')
 
         elif self.state == HEADERB2:
@@ -1,4 +1,4 @@
-import errno, struct, threading, uuid
+import errno, itertools, struct, threading, uuid
 from ... import log
 from .. driver_base import DriverBase
 from . import websocket
@@ -12,16 +12,21 @@ Perhaps BiblioPixel is already running on your machine?
 
 class SimPixel(DriverBase):
 
-    def __init__(self, num, port=1337, pixel_positions=None, **kwds):
+    def __init__(self, num, port=1337, pixel_positions=None, max_fps=0,
+                 **kwds):
         """
         Args:
             num:  number of LEDs being visualizer.
             port:  the port on which the SimPixel server is running.
             pixel_positions:  the positions of the LEDs in 3-d space.
+            max_fps:  if non-zero, send each client at most this many
+                frames a second.  Clients can ask for fewer.
             **kwds:  keywords passed to DriverBase.
         """
         super().__init__(num, **kwds)
         self.port = port
+        self.max_fps = max_fps
+        self._frame_numbers = itertools.count(1)
         self.pixel_positions = self.server = self.thread = None
         self.websocks = {}
 
@@ -30,9 +35,8 @@ class SimPixel(DriverBase):
 
     def __start_server(self):
         log.debug('Starting server...')
-        desc = dict(driver=self,
-                    pixel_positions=self.pixel_positions,
-                    selectInterval=0.001)
+        desc = dict(driver=self, pixel_positions=self.pixel_positions,
+                    max_fps=self.max_fps)
         try:
             self.server = websocket.Server(
                 '', self.port, websocket.Client, **desc)
@@ -59,8 +63,10 @@ class SimPixel(DriverBase):
             self.pixel_positions = bytearray(struct.pack('<%sh' % len(pl), *pl))
             self.__start_server()
 
-    def add_websock(self, oid, send_pixels):
-        self.websocks[oid] = send_pixels
+    def add_websock(self, oid, send_frame):
+        self.websocks[oid] = send_frame
+        # Make sure the new client gets a frame even if nothing changes.
+        self.set_dirty(0, self.numLEDs)
 
     def remove_websock(self, oid):
         try:
@@ -75,8 +81,15 @@ class SimPixel(DriverBase):
         self._render()
 
     def _send_packet(self):
-        for ws in self.websocks.values():
-            ws(self._buf)
+        # The same frame is queued for every client, and the server thread
+        # encodes it once for each encoding that clients need.  Queueing
+        # never blocks, so a slow client can't hold up the LEDs.
+        if self.websocks:
+            number = next(self._frame_numbers) & 0xFFFFFFFF
+            frame = websocket.Frame(number, bytes(self._buf))
+            for send_frame in list(self.websocks.values()):
+                send_frame(frame)
+            self.server.wake()
 
 
 # This is DEPRECATED.
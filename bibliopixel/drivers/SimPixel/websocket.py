@@ -1,26 +1,188 @@
+"""
+The SimPixel WebSocket protocol.
+
+Every binary message from the server starts with two bytes saying what it
+holds:
+
+    POSITIONS - the x, y, z position of each pixel, as int16s
+    PIXELS    - the RGB bytes of every pixel
+    KEYFRAME  - a uint32 frame number, then the RGB bytes of every pixel
+    RUNS      - a uint32 frame number and the uint32 number of its base
+                frame, then runs of changed pixels: each is a uint32 first
+                pixel and uint16 count, then count RGB triples
+    XOR       - a uint32 frame number and the uint32 number of its base
+                frame, then the RGB bytes of every pixel, XORed with the
+                same bytes of the base frame
+
+All numbers are little-endian.
+
+Clients which send nothing get a PIXELS message for every frame.  A client
+can instead send a JSON text message
+
+    {"encodings": ["xor", "runs"], "fps": 10}
+
+to ask for the first of those encodings which the server knows, and for at
+most `fps` frames a second.  The server answers with the JSON text message
+{"encoding": ..., "fps": ...} that it will use.
+
+With "runs" or "xor", the client acknowledges each frame it decodes with
+{"ack": frame_number}, and each later frame is sent as the difference from
+the last frame acknowledged - or as a KEYFRAME until one is.  Since an
+acknowledgement may cross a frame in flight, a client should keep the
+frames it has acknowledged until it receives a frame based on a later one.
+
+Clients which offer permessage-deflate get every message compressed.
+"""
+
+import collections, json, re, selectors, socket, struct, threading, time
 import uuid
 from ... import log
-from . SimpleWebSocketServer import WebSocket, SimpleWebSocketServer
+from . SimpleWebSocketServer import (
+    WebSocket, SimpleWebSocketServer, BINARY, CLOSE, RSV1, deflate_message)
+
+# The first two bytes of each message say what it holds.
+POSITIONS = bytes((0x00, 0x00))
+PIXELS = bytes((0x00, 0x01))
+KEYFRAME = bytes((0x00, 0x02))
+RUNS = bytes((0x00, 0x03))
+XOR = bytes((0x00, 0x04))
+
+FRAME_NUMBER = struct.Struct('<I')
+DELTA_HEADER = struct.Struct('<II')
+RUN_HEADER = struct.Struct('<IH')
+
+ENCODINGS = 'pixels', 'runs', 'xor'
+
+# How many pixel frames can wait to be sent to one client.  When a client
+# falls further behind than this, its oldest waiting frame is dropped.
+MAX_QUEUED_FRAMES = 2
+
+# How many sent frames are remembered while waiting for acknowledgement.
+MAX_UNACKNOWLEDGED_FRAMES = 64
+
+# Runs of changed pixels closer together than this are sent as one run,
+# because a run's header costs as much as two pixels.
+RUN_GAP = 2
+
+_CHANGED = re.compile(b'[^\x00]+')
+
 
-Server = SimpleWebSocketServer
+def binary_frame(*parts, compressed=False):
+    """Return a complete, unmasked binary WebSocket frame holding parts, so
+    that one frame can be sent unchanged to any number of clients."""
+    length = sum(len(p) for p in parts)
+    b1 = 0x80 | BINARY | (RSV1 if compressed else 0)
+    if length <= 125:
+        header = struct.pack('!BB', b1, length)
+    elif length <= 0xFFFF:
+        header = struct.pack('!BBH', b1, 126, length)
+    else:
+        header = struct.pack('!BBQ', b1, 127, length)
+    return b''.join((header,) + parts)
+
+
+def xor(a, b):
+    x = int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')
+    return x.to_bytes(len(b), 'little')
+
+
+def runs(base, pixels):
+    """Return the RUNS payload which turns base into pixels."""
+    result, run = [], None
+    for m in _CHANGED.finditer(xor(base, pixels)):
+        begin, end = m.start() // 3, -(-m.end() // 3)
+        if run and begin - run[1] <= RUN_GAP:
+            run[1] = end
+        else:
+            run = [begin, end]
+            result.append(run)
+
+    parts = []
+    for begin, end in result:
+        while begin < end:
+            count = min(end - begin, 0xFFFF)
+            parts.append(RUN_HEADER.pack(begin, count))
+            parts.append(pixels[3 * begin:3 * (begin + count)])
+            begin += count
+    return b''.join(parts)
+
+
+class Frame(object):
+    """
+    One frame of pixels to send to clients.
+
+    Each message is encoded only once, the first time a client needs it, so
+    clients which use the same encoding and base frame share the same bytes,
+    and frames which are dropped are never encoded at all.
+    """
+
+    def __init__(self, number, pixels):
+        self.number = number
+        self.pixels = pixels
+        self.messages = {}
+
+    def message(self, encoding='pixels', base=None, wbits=None):
+        """Return a WebSocket frame holding this frame, encoded against base,
+        an (number, pixels) pair, and compressed if wbits is set."""
+        key = encoding, base[0] if base else None, wbits
+        message = self.messages.get(key)
+        if message is None:
+            message = self._encode(encoding, base)
+            if wbits is not None:
+                message = deflate_message(message, wbits)
+            message = self.messages[key] = binary_frame(
+                message, compressed=wbits is not None)
+        return message
+
+    def _encode(self, encoding, base):
+        if encoding == 'pixels':
+            return PIXELS + self.pixels
+
+        if not base:
+            return KEYFRAME + FRAME_NUMBER.pack(self.number) + self.pixels
+
+        header = DELTA_HEADER.pack(self.number, base[0])
+        if encoding == 'xor':
+            return XOR + header + xor(base[1], self.pixels)
+
+        changes = runs(base[1], self.pixels)
+        if len(changes) < len(self.pixels):
+            return RUNS + header + changes
+        return KEYFRAME + FRAME_NUMBER.pack(self.number) + self.pixels
 
 
 class Client(WebSocket):
 
-    def __init__(self, *args, driver, pixel_positions):
+    permessage_deflate = True
+
+    def __init__(self, *args, driver, pixel_positions, max_fps=0):
         super().__init__(*args)
         self.driver = driver
         self.connected = False
         self.pixel_positions = pixel_positions
         self.oid = None
+
+        # Frames waiting to be sent, and the (opcode, data) being sent.
+        self.frames = collections.deque(maxlen=MAX_QUEUED_FRAMES)
+        self.sending = None
+        self.dropped_frames = 0
+        self.events = 0
+
+        self.encoding = 'pixels'
+        self.max_fps = self.fps = max_fps
+        self.next_frame_time = 0
+
+        # The last frame acknowledged, and the frames sent since then.
+        self.base = None
+        self.unacknowledged = collections.OrderedDict()
         log.debug('Server started...')
 
     def handleConnected(self):
         log.debug('Connected:{}'.format(self.address))
         self.connected = True
         self.oid = uuid.uuid1()
-        self.driver.add_websock(self.oid, self.send_pixels)
-        self.sendMessage(bytearray([0x00, 0x00]) + self.pixel_positions)
+        self.driver.add_websock(self.oid, self.send_frame)
+        self.sendMessage(POSITIONS + self.pixel_positions)
 
     def handleClose(self):
         self.driver.remove_websock(self.oid)
@@ -28,8 +190,233 @@ class Client(WebSocket):
         log.debug('Closed:{}'.format(self.address))
 
     def handleMessage(self):
-        pass
+        if not isinstance(self.data, str):
+            return
+        try:
+            message = json.loads(self.data)
+            if 'ack' in message:
+                self.acknowledge(int(message['ack']))
+            if 'encodings' in message or 'fps' in message:
+                self.negotiate(message.get('encodings', ()),
+                               message.get('fps', 0))
+        except (ValueError, TypeError, AttributeError):
+            log.error('Bad message from %s: %s', self.address, self.data)
 
-    def send_pixels(self, pixels):
+    def negotiate(self, encodings, fps):
+        """Choose the first of encodings that we know, and cap the frame rate
+        at fps, if that is lower than max_fps."""
+        self.encoding = next((e for e in encodings if e in ENCODINGS),
+                             'pixels')
+        fps = float(fps or 0)
+        if self.max_fps:
+            fps = min(fps or self.max_fps, self.max_fps)
+        self.fps = fps
+        self.base = None
+        self.unacknowledged.clear()
+        self.sendMessage(json.dumps({'encoding': self.encoding,
+                                     'fps': self.fps}))
+
+    def acknowledge(self, number):
+        pixels = self.unacknowledged.get(number)
+        if pixels is not None:
+            self.base = number, pixels
+            while self.unacknowledged:
+                n, _ = self.unacknowledged.popitem(last=False)
+                if n == number:
+                    break
+
+    def send_frame(self, frame):
+        """
+        Queue a Frame to be sent by the server thread.
+
+        This never blocks: if the client already has MAX_QUEUED_FRAMES
+        waiting, the oldest is dropped, so a slow client sees fewer frames
+        instead of slowing down the LEDs or everyone else.
+        """
         if self.connected:
-            self.sendMessage(bytearray([0x00, 0x01]) + pixels)
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped_frames += 1
+            self.frames.append(frame)
+
+    def send_pixels(self, pixels):
+        self.send_frame(Frame(0, bytes(pixels)))
+
+    def frame_delay(self, now):
+        """Return how many seconds to wait before sending the next frame."""
+        return max(0, self.next_frame_time - now) if self.frames else 0
+
+    def has_output(self, now):
+        return bool(self.sending or self.sendq or (
+            self.frames and now >= self.next_frame_time))
+
+    def write(self):
+        """Send as much waiting data as the socket will take without
+        blocking.  Raise an exception if the connection should be closed."""
+        while True:
+            if not self.sending:
+                # Handshakes and control messages go before any pixels.
+                if self.sendq:
+                    opcode, data = self.sendq.popleft()
+                elif self.frames and time.time() >= self.next_frame_time:
+                    opcode, data = BINARY, self._next_message()
+                else:
+                    return
+                self.sending = opcode, memoryview(data)
+
+            opcode, data = self.sending
+            try:
+                sent = self.client.send(data)
+            except (BlockingIOError, InterruptedError):
+                return
+            if not sent:
+                raise RuntimeError('socket connection broken')
+
+            if sent < len(data):
+                self.sending = opcode, data[sent:]
+            else:
+                self.sending = None
+                if opcode == CLOSE:
+                    raise Exception('received client close')
+
+    def _next_message(self):
+        if self.fps:
+            # Only the newest frame is worth sending.
+            while len(self.frames) > 1:
+                self.frames.popleft()
+            self.next_frame_time = time.time() + 1 / self.fps
+
+        frame = self.frames.popleft()
+        if self.encoding != 'pixels':
+            self.unacknowledged[frame.number] = frame.pixels
+            if len(self.unacknowledged) > MAX_UNACKNOWLEDGED_FRAMES:
+                self.unacknowledged.popitem(last=False)
+        return frame.message(self.encoding, self.base, self.deflate_wbits)
+
+
+class Server(SimpleWebSocketServer):
+    """
+    A SimpleWebSocketServer which waits on a selector (epoll on Linux)
+    instead of polling, and only waits to write to clients which have
+    data waiting.
+
+    Other threads queue frames on clients and then call wake().
+    """
+
+    def __init__(self, host, port, websocketclass, **kwargs):
+        kwargs.pop('selectInterval', None)
+        super().__init__(host, port, websocketclass, **kwargs)
+        self.serversocket.setblocking(False)
+        self.listeners = []
+
+        self._waker, self._wake_socket = socket.socketpair()
+        self._waker.setblocking(False)
+        self._wake_socket.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.serversocket, selectors.EVENT_READ)
+        self.selector.register(self._waker, selectors.EVENT_READ)
+
+        self.closing = False
+        self.stopped = threading.Event()
+        self.stopped.set()
+
+    def wake(self):
+        """Make serveforever() look again at which clients have data."""
+        try:
+            self._wake_socket.send(b'\0')
+        except OSError:
+            pass  # Its buffer is full, so it is already awake, or closed.
+
+    def close(self, timeout=1):
+        """Stop serveforever() and close every connection."""
+        self.closing = True
+        if self.stopped.is_set():
+            self._close_all()
+        else:
+            self.wake()
+            self.stopped.wait(timeout)
+
+    def serveforever(self):
+        self.stopped.clear()
+        try:
+            while not self.closing:
+                timeout = self._update_events()
+                for key, events in self.selector.select(timeout):
+                    if key.fileobj is self.serversocket:
+                        self._accept()
+                    elif key.fileobj is self._waker:
+                        self._drain_waker()
+                    else:
+                        self._handle(key.data, events)
+        finally:
+            self._close_all()
+            self.stopped.set()
+
+    def _update_events(self):
+        """Register each client for the events it is waiting on, and return
+        how long until a client with a capped frame rate can send again, or
+        None if no client is waiting for that."""
+        now, timeout = time.time(), None
+        for client in list(self.connections.values()):
+            events = selectors.EVENT_READ
+            if client.has_output(now):
+                events |= selectors.EVENT_WRITE
+            else:
+                delay = client.frame_delay(now)
+                if delay:
+                    timeout = delay if timeout is None else min(timeout, delay)
+
+            if events != client.events:
+                self.selector.modify(client.client, events, client)
+                client.events = events
+        return timeout
+
+    def _accept(self):
+        try:
+            sock, address = self.serversocket.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+
+        try:
+            sock = self._decorateSocket(sock)
+            sock.setblocking(False)
+            client = self._constructWebSocket(sock, address)
+            client.events = selectors.EVENT_READ
+            self.selector.register(sock, client.events, client)
+            self.connections[sock.fileno()] = client
+        except Exception:
+            sock.close()
+
+    def _drain_waker(self):
+        try:
+            while self._waker.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _handle(self, client, events):
+        try:
+            if events & selectors.EVENT_READ:
+                client._handleData()
+            if events & selectors.EVENT_WRITE:
+                client.write()
+        except Exception:
+            self._drop(client)
+
+    def _drop(self, client):
+        self.connections.pop(client.client.fileno(), None)
+        try:
+            self.selector.unregister(client.client)
+        except (KeyError, ValueError):
+            pass
+        client.client.close()
+        client.handleClose()
+
+    def _close_all(self):
+        for client in list(self.connections.values()):
+            self._drop(client)
+        if self.serversocket.fileno() >= 0:
+            self.selector.close()
+            self.serversocket.close()
+            self._waker.close()
+            self._wake_socket.close()
@@ -0,0 +1,63 @@
+import socket, struct
+
+from . dmx import UniverseDriver
+
+PORT = 6454
+ID = b'Art-Net\0'
+PROTOCOL_VERSION = 14
+
+OP_DMX = 0x5000
+OP_SYNC = 0x5200
+
+# The OpCode is little-endian, while ProtVer and Length are sent high byte
+# first, so they are packed as separate bytes.
+#   ID, OpCode, ProtVerHi, ProtVerLo, Sequence, Physical, SubUni, Net,
+#   LengthHi, LengthLo
+DMX_HEADER = struct.Struct('<8sHBBBBBBBB')
+
+#   ID, OpCode, ProtVerHi, ProtVerLo, Aux1, Aux2
+SYNC_PACKET = struct.Struct('<8sHBBBB')
+
+
+class ArtNet(UniverseDriver):
+    """
+    Driver for Art-Net pixel controllers.
+
+    Universes are numbered by their 15-bit Art-Net port-address, starting
+    from `universe`.  They are sent to `host`, which may be a broadcast
+    address.
+
+    If `sync` is True, an ArtSync packet is sent from sync() once every
+    universe has been sent, so that controllers show them all at once.
+    """
+
+    SEQUENCE_OFFSET = 12
+
+    def __init__(self, num=0, width=0, height=0, host='255.255.255.255',
+                 port=PORT, universe=0, sync=False, **kwds):
+        self._host = host
+        self._port = port
+
+        super().__init__(num, width, height, universe=universe, **kwds)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        if sync:
+            packet = SYNC_PACKET.pack(ID, OP_SYNC, 0, PROTOCOL_VERSION, 0, 0)
+            self._sync_packet = bytearray(packet), (host, port)
+
+    def _make_header(self, universe, size):
+        # The data length must be even.
+        size += size % 2
+        return bytearray(DMX_HEADER.pack(
+            ID, OP_DMX, 0, PROTOCOL_VERSION, 0, 0, universe & 0xFF,
+            (universe >> 8) & 0x7F, size >> 8, size & 0xFF))
+
+    def _padding(self, size):
+        return bytes(size % 2)
+
+    def _address(self, universe):
+        return self._host, self._port
+
+    def _next_sequence(self, sequence):
+        # Sequence 0 would tell the controller not to check the order.
+        return sequence % 255 + 1
@@ -0,0 +1,195 @@
+import asyncio, socket, threading
+from . import network_protocol
+from . network_protocol import CMDTYPE
+from .. import log
+from .. return_codes import RETURN_CODES
+from .. util import metrics
+
+
+class LatestFrame(object):
+    """
+    Holds the newest pixel data waiting to be displayed.
+
+    Frames are written into a preallocated buffer as they arrive.  A frame
+    that arrives before the last one was displayed simply overwrites it, so
+    the display never falls behind a burst of frames.
+    """
+
+    def __init__(self, size):
+        self.pending = bytearray(size)
+        self.frame = bytearray(size)
+        self.dirty = None
+        self.stopped = False
+        self.changed = threading.Condition()
+
+    def put(self, data, offset=0):
+        """Write RGB data for pixels from offset on.  Return True if this
+        replaced a frame which hadn't been displayed yet."""
+        start = min(3 * offset, len(self.pending))
+        end = min(start + len(data), len(self.pending))
+        with self.changed:
+            self.pending[start:end] = data[:end - start]
+            replaced = self.dirty is not None
+            if replaced:
+                start, end = min(start, self.dirty[0]), max(end, self.dirty[1])
+            self.dirty = start, end
+            self.changed.notify()
+        return replaced
+
+    def take(self):
+        """
+        Wait for new data, and return (data, offset) with the pixels that
+        changed since the last call.  Return None once stop() is called.
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: self.dirty or self.stopped)
+            if self.stopped:
+                return None
+            start, end = self.dirty
+            self.dirty = None
+            self.frame[start:end] = self.pending[start:end]
+
+        return memoryview(self.frame)[start:end], start // 3
+
+    def stop(self):
+        with self.changed:
+            self.stopped = True
+            self.changed.notify()
+
+
+class AsyncNetworkReceiver(object):
+    """
+    Receives frames from Network drivers, like NetworkReceiver, but serves
+    every connection from one asyncio event loop.
+
+    Each frame is acknowledged as soon as it has been read.  A separate
+    display thread shows only the newest frame - see LatestFrame - and
+    self.metrics counts the frames received, displayed and dropped.
+    """
+
+    def __init__(self, layout, port=3142, interface='0.0.0.0'):
+        self.layout = layout
+        self.metrics = metrics.Metrics('receiver', type(self).__name__)
+        self.latest = LatestFrame(3 * len(layout._colors))
+
+        self._loop = asyncio.new_event_loop()
+        self._connections = set()
+        self._server = self._loop.run_until_complete(asyncio.start_server(
+            self._connect, interface, port, reuse_address=True))
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._threads = []
+
+    def start(self, join=False):
+        self._threads = [
+            threading.Thread(target=self._loop.run_forever, daemon=True),
+            threading.Thread(target=self._display, daemon=True)]
+        for t in self._threads:
+            t.start()
+
+        log.info("Listening on %s", self.address)
+        if join:
+            self._threads[0].join()
+
+    def stop(self):
+        log.info("Closing server...")
+        self.latest.stop()
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(
+                self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for t in self._threads:
+            t.join()
+        self._loop.close()
+
+    def update(self, data, offset=0):
+        if self.latest.put(data, offset):
+            self.metrics.increment('dropped_frames')
+        self.metrics.increment('frames')
+
+    def set_brightness(self, brightness):
+        self.layout.set_brightness(brightness)
+        return True
+
+    def _display(self):
+        while True:
+            frame = self.latest.take()
+            if not frame:
+                return
+            try:
+                self.layout.set_many(*frame)
+                self.layout.push_to_driver()
+                self.metrics.increment('displayed_frames')
+            except Exception:
+                log.exception('Error displaying frame')
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = list(self._connections)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _connect(self, reader, writer):
+        task = self._loop.create_task(self._serve(reader, writer))
+        self._connections.add(task)
+        task.add_done_callback(self._connections.discard)
+
+    async def _serve(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        decoder = network_protocol.FrameDecoder()
+        try:
+            while True:
+                result = await self._read_command(reader, decoder)
+                writer.write(bytes((result,)))
+                await writer.drain()
+
+        except asyncio.IncompleteReadError:
+            pass  # The sender closed the connection.
+        except Exception as e:
+            log.exception(e)
+        finally:
+            writer.close()
+
+    async def _read_command(self, reader, decoder):
+        """Read and handle one command, and return its return code."""
+        cmd = (await reader.readexactly(1))[0]
+        if cmd == CMDTYPE.PIXEL_DATA_V2:
+            header = network_protocol.HEADER
+            data = await reader.readexactly(header.size - 1)
+            _, flags, sequence, offset, length = header.unpack(
+                bytes((cmd,)) + data)
+            if length > network_protocol.MAX_FRAME_BYTES:
+                raise ValueError('Frame of %s bytes is too large' % length)
+
+            payload = await reader.readexactly(length)
+            try:
+                data = decoder.decode(flags, sequence, offset, payload)
+            except ValueError as e:
+                log.error('Unable to decode frame: %s', e)
+                return RETURN_CODES.ERROR
+
+            self.update(data, offset)
+            return RETURN_CODES.SUCCESS
+
+        size = int.from_bytes(await reader.readexactly(2), 'little')
+        data = await reader.readexactly(size)
+
+        if cmd == CMDTYPE.PIXEL_DATA:
+            self.update(data)
+            return RETURN_CODES.SUCCESS
+
+        if cmd == CMDTYPE.BRIGHTNESS:
+            if size == 1 and self.set_brightness(data[0]):
+                return RETURN_CODES.SUCCESS
+            return RETURN_CODES.ERROR_UNSUPPORTED
+
+        if cmd == CMDTYPE.PROTOCOL_VERSION:
+            if size == 1 and data[0] <= network_protocol.VERSION:
+                return RETURN_CODES.SUCCESS
+            return RETURN_CODES.ERROR_UNSUPPORTED
+
+        return RETURN_CODES.ERROR_BAD_CMD
@@ -0,0 +1,125 @@
+import socket, time
+
+from . driver_base import DriverBase
+from .. import log
+
+# A DMX512 universe has 512 channels, which hold 170 RGB pixels.
+UNIVERSE_CHANNELS = 512
+UNIVERSE_PIXELS = UNIVERSE_CHANNELS // 3
+
+# Receivers give up on a source after 2.5 seconds of silence, so unchanged
+# frames are still resent this often.
+DEFAULT_KEEPALIVE = 1
+
+
+class UniverseDriver(DriverBase):
+    """
+    Base class for drivers that send pixels over UDP as DMX512 universes.
+
+    The pixels are split into universes of `pixels_per_universe` pixels each,
+    numbered up from `universe`.  Every universe is sent through the same
+    socket, and its header is computed once, so sending a frame just writes
+    the sequence number into each header and sends it with a slice of the
+    rendered buffer, which is never copied.
+
+    Frames where nothing changed are skipped, except that every universe is
+    resent at least once every `keepalive` seconds, because DMX receivers
+    drop a source that goes quiet.  If keepalive is 0, every frame is sent.
+
+    Subclasses set SEQUENCE_OFFSET, the position of the sequence number in
+    a header, and implement _make_header(), _address() and _next_sequence().
+    To send a sync packet after each frame, they set self._sync_packet to
+    (packet, address), and SYNC_SEQUENCE_OFFSET if it has a sequence number.
+    """
+
+    SEQUENCE_OFFSET = None
+    SYNC_SEQUENCE_OFFSET = None
+
+    def __init__(self, num=0, width=0, height=0, universe=1,
+                 pixels_per_universe=UNIVERSE_PIXELS,
+                 keepalive=DEFAULT_KEEPALIVE, **kwds):
+        super().__init__(num, width, height, **kwds)
+        if not 0 < pixels_per_universe <= UNIVERSE_PIXELS:
+            raise ValueError('pixels_per_universe must be between 1 and %d' %
+                             UNIVERSE_PIXELS)
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sequence = 0
+        self._sync_sequence = 0
+        self._sync_packet = None
+        self._keepalive = keepalive
+        self._last_frame = 0
+
+        # (header, start, end, padding, address) for each universe, where
+        # start and end are byte offsets into self._buf.
+        self._universes = []
+        size = 3 * pixels_per_universe
+        for i, start in enumerate(range(0, self.bufByteCount(), size)):
+            end = min(start + size, self.bufByteCount())
+            header = self._make_header(universe + i, end - start)
+            self._universes.append((header, start, end, self._padding(
+                end - start), self._address(universe + i)))
+
+    def _make_header(self, universe, size):
+        """Return a bytearray with the header for size bytes of DMX data."""
+        raise NotImplementedError
+
+    def _padding(self, size):
+        """Return the bytes to send after size bytes of DMX data."""
+        return b''
+
+    def _address(self, universe):
+        """Return the (host, port) to send a universe to."""
+        raise NotImplementedError
+
+    def _next_sequence(self, sequence):
+        raise NotImplementedError
+
+    def _begin_frame(self, flush=None):
+        now = time.time()
+        if super()._begin_frame(flush):
+            self._last_frame = now
+            return True
+
+        if now - self._last_frame < self._keepalive:
+            return False
+
+        # Resend the last frame without rendering anything.
+        self._last_frame = now
+        self._dirty = 0, 0
+        return True
+
+    def _compute_packet(self):
+        self._render()
+        self._sequence = self._next_sequence(self._sequence)
+
+    def _send_packet(self):
+        buf, sequence = memoryview(self._buf), self._sequence
+        try:
+            for header, start, end, padding, address in self._universes:
+                header[self.SEQUENCE_OFFSET] = sequence
+                self._send((header, buf[start:end], padding), address)
+
+        except OSError as e:
+            log.exception(e)
+            error = 'Problem sending %s universes!' % type(self).__name__
+            log.error(error)
+            raise IOError(error)
+
+    def sync(self):
+        if self._sync_packet:
+            packet, address = self._sync_packet
+            if self.SYNC_SEQUENCE_OFFSET is not None:
+                self._sync_sequence = self._next_sequence(self._sync_sequence)
+                packet[self.SYNC_SEQUENCE_OFFSET] = self._sync_sequence
+            self._send((packet,), address)
+
+    def cleanup(self):
+        self._sock.close()
+
+    if hasattr(socket.socket, 'sendmsg'):
+        def _send(self, buffers, address):
+            self._sock.sendmsg(buffers, (), 0, address)
+    else:
+        def _send(self, buffers, address):
+            self._sock.sendto(b''.join(buffers), address)
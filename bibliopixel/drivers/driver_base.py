@@ -1,7 +1,10 @@
 from . channel_order import ChannelOrder
 from .. import gamma as _gamma
 from .. import data_maker
-import threading, time
+from .. util import metrics as _metrics
+import copy, itertools, threading, time
+
+numpy = data_maker.numpy
 
 
 class DriverBase(object):
@@ -39,11 +42,23 @@ class DriverBase(object):
         self.height = height
         self._buf = maker.make_packet(self.bufByteCount())
 
+        # The render lookup table, which is recomputed only if the brightness
+        # level or the gamma changes.
+        self._render_table = None
+        self._render_key = None
+
         self.lastUpdate = 0
+        self.metrics = _metrics.Metrics('driver', type(self).__name__)
         self.brightness_lock = threading.Lock()
         self._brightness = 255
         self._waiting_brightness = None
 
+        # The range of pixels that changed since the last update, as a
+        # (start, end) pair relative to this driver. None means "all of them".
+        self._dirty = None
+        self._waiting_dirty = None
+        self._dirty_reported = False
+
     def set_pixel_positions(self, pixel_positions):
         pass
 
@@ -72,45 +87,206 @@ class DriverBase(object):
     def _compute_packet(self):
         """Compute the packet from the colors and position.
 
-        Eventually, this will run on the compute thread.
+        With threaded updates, this runs on the driver's compute thread.
         """
         pass
 
     def _send_packet(self):
         """Send the packet to the driver.
 
-        Eventually, this will run on an I/O thread.
+        With threaded updates, this runs on the driver's I/O thread, on a
+        copy of the driver made by _copy_for_send().  Attributes that it
+        assigns are set on that copy and lost after the frame is sent, so
+        state that must carry over from one frame to the next has to be
+        kept in an object that the copies share, like a list or a socket,
+        or computed in _compute_packet() instead.
         """
         pass
 
     def update_colors(self):
         start = time.time()
 
-        with self.brightness_lock:
-            # Swap in a new brightness.
-            brightness, self._waiting_brightness = (
-                self._waiting_brightness, None)
+        if self._begin_frame():
+            self._compute_frame()
+            self._send_frame()
+
+        self.lastUpdate = time.time() - start
+
+    def _compute_frame(self):
+        with self.metrics.timer('compute_packet'):
+            self._compute_packet()
+        self._dirty = None
+
+    def _send_frame(self):
+        with self.metrics.timer('send_packet'):
+            self._send_packet()
+
+    def _sync_frame(self):
+        with self.metrics.timer('sync'):
+            self.sync()
+
+    def _begin_frame(self, flush=None):
+        """Swap in any new brightness and dirty range.  Return False if nothing
+        in this driver has changed, so the frame can be skipped.
+
+        If flush is set, it is called before the device brightness is set,
+        so that a pipeline can finish sending the packets already computed.
+        """
+        brightness, dirty, dirty_reported = self._take_waiting()
 
         if brightness is not None:
             self._brightness = brightness
             if self.set_device_brightness:
+                flush and flush()
                 self.set_device_brightness(brightness)
+            dirty = None
 
-        self._compute_packet()
-        self._send_packet()
+        elif dirty_reported and not dirty:
+            self.metrics.increment('skipped_frames')
+            return False
 
-        self.lastUpdate = time.time() - start
+        self._dirty = dirty
+        return True
+
+    def _take_waiting(self):
+        """Swap out and return the waiting brightness, dirty range and whether
+        a dirty range was reported."""
+        with self.brightness_lock:
+            brightness, self._waiting_brightness = (
+                self._waiting_brightness, None)
+            dirty, self._waiting_dirty = self._waiting_dirty, None
+            dirty_reported, self._dirty_reported = self._dirty_reported, False
+
+        return brightness, dirty, dirty_reported
+
+    def _set_waiting(self, brightness, dirty, dirty_reported):
+        """The inverse of _take_waiting()."""
+        with self.brightness_lock:
+            self._waiting_brightness = brightness
+            self._waiting_dirty = dirty
+            self._dirty_reported = dirty_reported
+
+    def _copy_for_send(self):
+        """Return a shallow copy of this driver with its own snapshot of the
+        packet and buffer, so that the copy's _send_packet() can run on an I/O
+        thread while this driver computes the next packet.
+
+        Only _buf and _packet are copied: every other attribute of the copy
+        refers to the same object as this driver's."""
+        sender = copy.copy(self)
+        for name in '_buf', '_packet':
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                setattr(sender, name, list(value))
+            elif value is not None:
+                setattr(sender, name, bytearray(value))
+        return sender
 
     def set_brightness(self, brightness):
         with self.brightness_lock:
             self._waiting_brightness = brightness
 
+    def set_dirty(self, start, end):
+        """Report that the pixels between start and end (relative to this
+        driver) have changed since the last report.
+
+        Once a layout has reported dirty ranges to a driver, update_colors
+        skips frames where nothing has changed.  Drivers that are never told
+        about dirty ranges render and send every frame.
+        """
+        with self.brightness_lock:
+            self._dirty_reported = True
+            if start < end:
+                if self._waiting_dirty:
+                    s, e = self._waiting_dirty
+                    start, end = min(start, s), max(end, e)
+                self._waiting_dirty = start, end
+
+    def _render_target(self):
+        """Return (buffer, offset, stride): _render() writes pixel i's three
+        bytes into buffer starting at offset + i * stride.
+
+        Drivers whose wire format interleaves other bytes with the pixel data
+        can override this to render straight into their packet."""
+        return self._buf, 0, 3
+
     def _render(self):
+        """Render self._colors into the render target, applying brightness,
+        gamma and channel order."""
+        render_start = time.time()
         if self.set_device_brightness:
             level = 1.0
         else:
             level = self._brightness / 255.0
+
+        start, end = self._dirty or (0, self.numLEDs)
+
+        key = level, self.gamma
+        if key != self._render_key:
+            self._render_key = key
+            self._render_table = _render_table(level, self.gamma)
+            start, end = 0, self.numLEDs
+
+        target = self._render_target()
+        if numpy and isinstance(self._colors, numpy.ndarray):
+            self._render_numpy(level, start, end, *target)
+        elif not self._render_bytes(start, end, *target):
+            self._render_slow(level, start, end, *target)
+
+        self.metrics.record('render', time.time() - render_start)
+
+    def _render_numpy(self, level, start, end, buf, offset, stride):
+        colors = self._colors[self._pos + start:self._pos + end]
+        colors = colors[:, self.c_order]
+        if colors.dtype == numpy.uint8:
+            result = self._render_table[1][colors]
+        else:
+            # Fractional colors need to be scaled before they are truncated.
+            index = numpy.multiply(colors, level, dtype=float)
+            index = index.astype(int).clip(0, 255)
+            result = self._render_table[0][index]
+
+        begin = offset + stride * start
+        if stride == 3:
+            buf[begin:begin + 3 * (end - start)] = result.tobytes()
+        else:
+            view = numpy.frombuffer(buf, dtype=numpy.uint8)
+            pixels = view[begin:begin + stride * (end - start)]
+            pixels.reshape(-1, stride)[:, :3] = result
+
+    def _render_bytes(self, start, end, buf, offset, stride):
+        """Render using bytes.translate.  Return False if self._colors
+        contains anything that isn't an integer between 0 and 255."""
+        colors = self._colors[self._pos + start:self._pos + end]
+        try:
+            raw = bytes(itertools.chain.from_iterable(colors))
+        except (TypeError, ValueError):
+            return False
+
+        # raw is in RGB order: translate it, then permute into the buffer.
+        raw = raw.translate(self._render_table[1])
+        begin, stop = offset + stride * start, offset + stride * end
+        r, g, b = self.c_order
+        buf[begin + 0:stop:stride] = raw[r::3]
+        buf[begin + 1:stop:stride] = raw[g::3]
+        buf[begin + 2:stop:stride] = raw[b::3]
+        return True
+
+    def _render_slow(self, level, start, end, buf, offset, stride):
         gam, (r, g, b) = self.gamma.get, self.c_order
-        for i in range(self.numLEDs):
+        for i in range(start, end):
             c = [int(level * x) for x in self._colors[i + self._pos]]
-            self._buf[i * 3:(i + 1) * 3] = gam(c[r]), gam(c[g]), gam(c[b])
+            j = offset + i * stride
+            buf[j:j + 3] = gam(c[r]), gam(c[g]), gam(c[b])
+
+
+def _render_table(level, gamma):
+    """Return a pair of lookup tables from color values to output bytes.
+
+    The first table is indexed by the already scaled value and is just the
+    gamma table; the second folds the brightness level into it as well.
+    """
+    scaled = bytes(gamma.get(level * i) for i in range(256))
+    if numpy:
+        return numpy.array([gamma.table, tuple(scaled)], dtype=numpy.uint8)
+    return bytes(gamma.table), scaled
@@ -0,0 +1,94 @@
+import socket, struct, uuid
+
+from . dmx import UniverseDriver
+
+PORT = 5568
+ACN_PACKET_IDENTIFIER = b'ASC-E1.17\0\0\0'
+
+VECTOR_ROOT_E131_DATA = 0x4
+VECTOR_ROOT_E131_EXTENDED = 0x8
+VECTOR_E131_DATA_PACKET = 0x2
+VECTOR_E131_EXTENDED_SYNCHRONIZATION = 0x1
+VECTOR_DMP_SET_PROPERTY = 0x2
+
+# An option bit for data that is meant for visualizers, not for lights.
+PREVIEW_DATA = 0x80
+
+# The root, framing and DMP layers of a data packet, up to the DMX start code.
+DATA_HEADER = struct.Struct('>HH12sHI16s' 'HI64sBHBBH' 'HBBHHHB')
+
+# The root and framing layers of a synchronization packet.
+SYNC_PACKET = struct.Struct('>HH12sHI16s' 'HIBHH')
+
+ROOT_LAYER_SIZE = 38
+FRAMING_LAYER_END = 115
+
+
+def multicast_address(universe):
+    """Return the multicast group that E1.31 sends a universe to."""
+    return '239.255.%d.%d' % (universe >> 8, universe & 0xFF)
+
+
+def _flags_and_length(length):
+    return 0x7000 | length
+
+
+class E131(UniverseDriver):
+    """
+    Driver for E1.31 (streaming ACN, or sACN) pixel controllers.
+
+    Universes are sent to their multicast groups or, if `host` is set,
+    directly to that host.
+
+    If `sync_universe` is set, controllers hold each frame until a
+    synchronization packet arrives on that universe, which is sent from
+    sync() once every universe has been sent, so that frames split across
+    many universes or drivers appear all at once.
+    """
+
+    SEQUENCE_OFFSET = 111
+    SYNC_SEQUENCE_OFFSET = 44
+
+    def __init__(self, num=0, width=0, height=0, host=None, port=PORT,
+                 universe=1, source_name='BiblioPixel', priority=100,
+                 sync_universe=0, cid=None, multicast_ttl=1, **kwds):
+        self._host = host
+        self._port = port
+        self._source_name = source_name.encode()[:63]
+        self._priority = priority
+        self._sync_universe = sync_universe
+        self._cid = cid or uuid.uuid4().bytes
+
+        super().__init__(num, width, height, universe=universe, **kwds)
+        if not host:
+            self._sock.setsockopt(
+                socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, multicast_ttl)
+
+        if sync_universe:
+            packet = SYNC_PACKET.pack(
+                0x10, 0, ACN_PACKET_IDENTIFIER,
+                _flags_and_length(SYNC_PACKET.size - 16),
+                VECTOR_ROOT_E131_EXTENDED, self._cid,
+                _flags_and_length(SYNC_PACKET.size - ROOT_LAYER_SIZE),
+                VECTOR_E131_EXTENDED_SYNCHRONIZATION, 0, sync_universe, 0)
+            self._sync_packet = bytearray(packet), self._address(sync_universe)
+
+    def _make_header(self, universe, size):
+        length = DATA_HEADER.size + size
+        return bytearray(DATA_HEADER.pack(
+            # Root layer
+            0x10, 0, ACN_PACKET_IDENTIFIER, _flags_and_length(length - 16),
+            VECTOR_ROOT_E131_DATA, self._cid,
+            # Framing layer
+            _flags_and_length(length - ROOT_LAYER_SIZE),
+            VECTOR_E131_DATA_PACKET, self._source_name, self._priority,
+            self._sync_universe, 0, 0, universe,
+            # DMP layer
+            _flags_and_length(length - FRAMING_LAYER_END),
+            VECTOR_DMP_SET_PROPERTY, 0xa1, 0, 1, size + 1, 0))
+
+    def _address(self, universe):
+        return self._host or multicast_address(universe), self._port
+
+    def _next_sequence(self, sequence):
+        return (sequence + 1) & 0xFF
@@ -1,5 +1,7 @@
+import concurrent.futures, itertools, queue
 from . driver_base import DriverBase
 from .. import log
+from .. threads.token_bucket import TokenBucket
 
 try:
     from phue import Bridge
@@ -10,6 +12,18 @@ except:
 
 import colorsys
 
+# The Hue bridge handles about ten light commands and one group command a
+# second.
+LIGHT_RATE = 10
+GROUP_RATE = 1
+
+# Group 0 always holds every light on the bridge.
+ALL_LIGHTS_GROUP = 0
+
+# A group command is only used when at least this many lights in the group
+# change to the same state.
+MIN_GROUP_CHANGES = 3
+
 
 class Hue(DriverBase):
 
@@ -70,5 +84,135 @@ class Hue(DriverBase):
             self._bridge.set_light(self._ids[i], cmd)
 
 
+class AsyncHue(Hue):
+    """
+    A Hue driver that only sends the lights whose state changed, and sends
+    them concurrently from a pool of `workers` threads, without going over
+    the bridge's request rates.
+
+    `groups` maps Hue group ids to the ids of the lights in each group.  When
+    several lights in a group change to the same color, one group command
+    replaces all their light commands.  If this driver controls every light
+    on the bridge, group 0 is added automatically.
+    """
+
+    def __init__(self, num, ip, nameMap=None, groups=None, workers=4,
+                 light_rate=LIGHT_RATE, group_rate=GROUP_RATE, **kwds):
+        super().__init__(num, ip, nameMap, **kwds)
+        if nameMap:
+            self._light_ids = [self._lights[n].light_id for n in nameMap]
+        else:
+            self._light_ids = self._ids[:self.numLEDs]
+
+        self._groups = {
+            int(g): list(ids) for g, ids in (groups or {}).items()}
+        for group, lights in self._groups.items():
+            if not lights or not set(lights) <= set(self._light_ids):
+                raise ValueError('Hue group %s has lights which are not in '
+                                 'this driver' % group)
+
+        all_ids = set(light.light_id for light in self._lights.values())
+        if set(self._light_ids) == all_ids:
+            self._groups.setdefault(ALL_LIGHTS_GROUP, self._light_ids)
+
+        # The last color computed, and the resulting state, for each light.
+        self._last_colors = [None] * self.numLEDs
+        self._states = [None] * self.numLEDs
+        self._last_brightness = None
+
+        # The pool threads put the index of each light whose command failed
+        # here, so that the next _compute_packet() sends it again.  Only the
+        # compute thread touches _last_colors and _states.
+        self._failures = queue.Queue()
+        self._index = {light: i for i, light in enumerate(self._light_ids)}
+
+        self._light_bucket = TokenBucket(light_rate)
+        self._group_bucket = TokenBucket(group_rate)
+        self._pool = concurrent.futures.ThreadPoolExecutor(workers)
+        self._packet = []
+
+    def _light_state(self, color):
+        """Return (on, bri, hue, sat) for an RGB color."""
+        h, s = self._rgb2hs(color)
+        if s == 0:
+            return False, 0, 0, 0
+        return True, min(254, self._brightness), h, s
+
+    def _begin_frame(self, flush=None):
+        if super()._begin_frame(flush):
+            return True
+        if self._failures.empty():
+            return False
+        # Nothing changed, but some lights still need to be sent again.
+        self._dirty = 0, 0
+        return True
+
+    def _compute_packet(self):
+        start, end = self._dirty or (0, self.numLEDs)
+        if self._brightness != self._last_brightness:
+            self._last_brightness = self._brightness
+            start, end = 0, self.numLEDs
+
+        retry = set()
+        while not self._failures.empty():
+            i = self._failures.get_nowait()
+            self._last_colors[i] = self._states[i] = None
+            retry.add(i)
+
+        changed = {}
+        for i in itertools.chain(range(start, end), retry):
+            color = tuple(self._colors[i + self._pos])
+            if color != self._last_colors[i]:
+                self._last_colors[i] = color
+                state = self._light_state(color)
+                if state != self._states[i]:
+                    self._states[i] = state
+                    changed[self._light_ids[i]] = state
+
+        # A list of (group, id, state, light ids) for each command.
+        self._packet = []
+        for group, lights in self._groups.items():
+            state = self._states[self._index[lights[0]]]
+            same = all(self._states[self._index[light]] == state
+                       for light in lights)
+            count = sum(light in changed for light in lights)
+            if same and count >= MIN_GROUP_CHANGES:
+                self._packet.append((True, group, state, lights))
+                for light in lights:
+                    changed.pop(light, None)
+
+        self._packet.extend(
+            (False, light, state, (light,)) for light, state in changed.items())
+
+    def _send_packet(self):
+        futures = []
+        for command in self._packet:
+            is_group = command[0]
+            bucket = self._group_bucket if is_group else self._light_bucket
+            bucket.take()
+            futures.append(self._pool.submit(self._send_command, *command))
+        concurrent.futures.wait(futures)
+
+    def _send_command(self, is_group, id, state, lights):
+        on, bri, hue, sat = state
+        cmd = {'on': on, 'transitiontime': self._transitionTime}
+        if on:
+            cmd.update(bri=bri, hue=hue, sat=sat)
+
+        try:
+            if is_group:
+                self._bridge.set_group(id, cmd)
+            else:
+                self._bridge.set_light(id, cmd)
+        except Exception as e:
+            log.error('Unable to set Hue %s %s: %s',
+                      'group' if is_group else 'light', id, e)
+            for light in lights:
+                self._failures.put(self._index[light])
+
+    def cleanup(self):
+        self._pool.shutdown()
+
+
 # This is DEPRECATED.
 DriverHue = Hue
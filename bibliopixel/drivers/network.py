@@ -1,68 +1,201 @@
 import socket, sys, time, os
 
 from . driver_base import DriverBase
+from . network_protocol import CMDTYPE, FrameEncoder, VERSION, VERSION_REQUEST
 from .. import log, util
 from .. return_codes import RETURN_CODES
 
-
-class CMDTYPE:
-    SETUP_DATA = 1  # reserved for future use
-    PIXEL_DATA = 2
-    BRIGHTNESS = 3
+# After a connection fails, wait this long before trying again, doubling the
+# wait after each failure up to RETRY_DELAY_MAX.
+RETRY_DELAY_MIN = 0.1
+RETRY_DELAY_MAX = 5.0
+
+
+class Connection(object):
+    """
+    A long-lived TCP connection to a network receiver, which reconnects when
+    it fails, waiting longer after each failure.  Up to max_in_flight
+    packets can be sent before the receiver has acknowledged them.
+
+    On connecting, it asks for the highest frame protocol version up to
+    `protocol` that the receiver supports - see network_protocol.
+    """
+
+    def __init__(self, host, port, max_in_flight=2, timeout=5,
+                 protocol=VERSION, encoder=None):
+        self.host = host
+        self.port = port
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.protocol = protocol
+        self.encoder = encoder or FrameEncoder()
+
+        self.sock = None
+        self.version = None
+        self.resync = True
+        self.in_flight = 0
+        self.retry_time = 0
+        self.retry_delay = RETRY_DELAY_MIN
+
+    def send(self, packet, wait=False):
+        """
+        Send a packet, and if wait is True, return its acknowledgement.
+        Return None if the packet couldn't be sent.
+        """
+        return self._send(lambda: packet, wait)
+
+    def send_pixels(self, data, start, end):
+        """
+        Send a frame of RGB data for all the pixels, of which only the pixels
+        from start to end have changed since the last frame.
+        """
+        def packet():
+            if self.version >= 2:
+                if self.resync:
+                    # A new receiver needs every pixel.
+                    self.resync = False
+                    return self.encoder.encode(data)
+                return self.encoder.encode(
+                    memoryview(data)[3 * start:3 * end], start)
+            return util.generate_header(CMDTYPE.PIXEL_DATA, len(data)) + data
+
+        self._send(packet)
+
+    def _send(self, make_packet, wait=False):
+        try:
+            if not self._open():
+                return None
+
+            if self.in_flight >= self.max_in_flight:
+                self._read_acks(self.in_flight - self.max_in_flight + 1)
+
+            self.sock.sendall(make_packet())
+            self.in_flight += 1
+            if wait:
+                return self._read_acks(self.in_flight)
+
+        except (OSError, IOError) as e:
+            self._fail(e)
+
+    def close(self):
+        """Wait for any unacknowledged packets, then close the connection."""
+        if self.sock:
+            try:
+                self._read_acks(self.in_flight)
+            except Exception:
+                pass
+            self._close()
+
+    def _open(self):
+        """Return True if the connection is open, opening it if needed.
+        Return False if the last attempt failed too recently to try again."""
+        if self.sock:
+            return True
+        if time.time() < self.retry_time:
+            return False
+
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock, self.in_flight = sock, 0
+        self._negotiate()
+
+        if self.retry_delay > RETRY_DELAY_MIN:
+            log.info('Reconnected to %s:%s', self.host, self.port)
+            self.retry_delay = RETRY_DELAY_MIN
+        return True
+
+    def _negotiate(self):
+        self.version = 1
+        if self.protocol < 2:
+            return
+
+        self.sock.sendall(VERSION_REQUEST)
+        resp = self.sock.recv(1)
+        if not resp:
+            # Receivers from before version 2 close the connection.
+            self.protocol = 1
+            raise IOError('Receiver only supports protocol version 1')
+
+        if resp[0] == RETURN_CODES.SUCCESS:
+            self.version = 2
+            self.encoder.reset()
+            self.resync = True
+
+    def _close(self):
+        try:
+            self.sock and self.sock.close()
+        except OSError:
+            pass
+        self.sock, self.in_flight = None, 0
+
+    def _fail(self, error):
+        """Drop the connection, and wait before trying to reconnect."""
+        self._close()
+        logger = log.error if self.retry_delay == RETRY_DELAY_MIN else log.debug
+        logger('Problem communicating with network receiver %s:%s - %s',
+               self.host, self.port, error)
+        self.retry_time = time.time() + self.retry_delay
+        self.retry_delay = min(2 * self.retry_delay, RETRY_DELAY_MAX)
+
+    def _read_acks(self, count):
+        """Read count acknowledgements, and return the last one."""
+        resp = None
+        while count > 0:
+            data = self.sock.recv(count)
+            if not data:
+                raise IOError('Connection closed by receiver')
+            count -= len(data)
+            self.in_flight -= len(data)
+            for resp in data:
+                if resp != RETURN_CODES.SUCCESS:
+                    log.warning("Bytecount mismatch! %s", resp)
+        return resp
 
 
 class Network(DriverBase):
-    """Driver for communicating with another device on the network."""
+    """
+    Driver for communicating with another device on the network.
 
-    def __init__(self, num=0, width=0, height=0, host="localhost", port=3142, **kwds):
+    The driver keeps one TCP connection open to the receiver - see Connection.
+    While the receiver can't be reached, frames are dropped.
+
+    If the receiver supports version 2 of the frame protocol, only the pixels
+    that changed are sent, optionally compressed with zlib at level
+    `compress`, and optionally as a delta against the previous frame.
+    """
+
+    def __init__(self, num=0, width=0, height=0, host="localhost", port=3142,
+                 max_in_flight=2, timeout=5, protocol=VERSION, compress=0,
+                 delta=False, **kwds):
         super().__init__(num, width, height, **kwds)
 
         self._host = host
         self._port = port
+        self._connection = Connection(
+            host, port, max_in_flight, timeout, protocol,
+            FrameEncoder(compress, delta))
 
-    def _connect(self):
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect((self._host, self._port))
-            return s
-        except socket.gaierror:
-            error = "Unable to connect to or resolve host: {}".format(
-                self._host)
-            log.error(error)
-            raise IOError(error)
+        # The last color values sent, and the range of pixels that changed.
+        self._packet = bytearray(self.bufByteCount())
+        self._changed = 0, self.numLEDs
 
     def _compute_packet(self):
-        count = self.bufByteCount()
-        self._packet = util.generate_header(CMDTYPE.PIXEL_DATA, count)
-        indexes = range(self._pos, self._pos + self.numLEDs)
-        self._packet.extend(int(c) for i in indexes for c in self._colors[i])
+        start, end = self._changed = self._dirty or (0, self.numLEDs)
+        indexes = range(self._pos + start, self._pos + end)
+        self._packet[3 * start:3 * end] = bytes(
+            int(c) for i in indexes for c in self._colors[i])
 
     # Push new data to strand
     def _send_packet(self):
-        try:
-            s = self._connect()
-            s.sendall(self._packet)
-
-            resp = ord(s.recv(1))
-
-            s.close()
-
-            if resp != RETURN_CODES.SUCCESS:
-                log.warning("Bytecount mismatch! %s", resp)
-
-        except Exception as e:
-            log.exception(e)
-            error = "Problem communicating with network receiver!"
-            log.error(error)
-            raise IOError(error)
+        self._connection.send_pixels(self._packet, *self._changed)
 
     def set_device_brightness(self, brightness):
         packet = util.generate_header(CMDTYPE.BRIGHTNESS, 1)
         packet.append(self._brightness)
-        s = self._connect()
-        s.sendall(packet)
-        resp = ord(s.recv(1))
-        return resp == RETURN_CODES.SUCCESS
+        return self._connection.send(packet, wait=True) == RETURN_CODES.SUCCESS
+
+    def cleanup(self):
+        self._connection.close()
 
 
 # This is DEPRECATED.
@@ -0,0 +1,230 @@
+"""
+The frame protocol spoken by Network, NetworkUDP and NetworkReceiver.
+
+A version 1 packet is a command byte, a 16-bit little-endian size and that
+many bytes of data, so it can't hold more than 21845 RGB pixels.
+
+A version 2 pixel frame is a HEADER holding
+
+    cmd      - CMDTYPE.PIXEL_DATA_V2
+    flags    - COMPRESSED and/or DELTA
+    sequence - the number of the frame, counting up from 0
+    offset   - the index of the first pixel in the frame
+    length   - the number of bytes of payload that follow
+
+followed by the payload: RGB bytes for consecutive pixels starting at offset.
+If DELTA is set, each byte has been XORed with the same byte in the previous
+frame.  If COMPRESSED is set, the payload has then been compressed with zlib.
+
+A Network driver asks for version 2 by sending a PROTOCOL_VERSION command
+when it connects, and only uses it if the receiver answers SUCCESS.
+
+Over UDP, a packet too large for one datagram is split into fragments, each
+starting with a FRAGMENT_HEADER holding
+
+    cmd      - CMDTYPE.FRAGMENT
+    sequence - the number of the frame, counting up from 0
+    index    - the index of this fragment
+    count    - the number of fragments in the frame
+"""
+
+import math, struct, zlib
+from .. import log, util
+
+VERSION = 2
+
+
+class CMDTYPE:
+    SETUP_DATA = 1  # reserved for future use
+    PIXEL_DATA = 2
+    BRIGHTNESS = 3
+    PIXEL_DATA_V2 = 4
+    PROTOCOL_VERSION = 5
+    FRAGMENT = 6
+
+
+# Flags for version 2 pixel frames.
+COMPRESSED, DELTA = 1, 2
+
+HEADER = struct.Struct('<BBIII')
+
+FRAGMENT_HEADER = struct.Struct('<BIHH')
+
+# Refuse to decode any frame larger than this.
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# The largest UDP payload that fits in a 1500 byte Ethernet frame.
+DEFAULT_MTU = 1472
+
+# How many partly received frames a Reassembler holds on to.
+MAX_PENDING_FRAMES = 4
+
+VERSION_REQUEST = bytes(
+    util.generate_header(CMDTYPE.PROTOCOL_VERSION, 1) + bytes((VERSION,)))
+
+
+class FrameEncoder(object):
+    """Encode version 2 pixel frames."""
+
+    def __init__(self, compress=0, delta=False):
+        """
+        compress - a zlib compression level from 1 to 9, or 0 for none
+        delta - if True, encode each frame against the previous one
+        """
+        self.compress = compress
+        self.delta = delta
+        self.reset()
+
+    def reset(self):
+        """Start over, as if no frames had been sent."""
+        self.sequence = 0
+        self.previous = bytearray()
+
+    def encode(self, data, offset=0):
+        """Return a frame setting pixels from offset on to the RGB bytes in
+        data."""
+        flags, payload = 0, bytes(data)
+        if self.delta:
+            old = _previous(self.previous, 3 * offset, len(payload))
+            self.previous[3 * offset:3 * offset + len(payload)] = payload
+            payload = _xor(old, payload)
+            flags |= DELTA
+
+        if self.compress:
+            compressed = zlib.compress(payload, self.compress)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= COMPRESSED
+
+        header = HEADER.pack(CMDTYPE.PIXEL_DATA_V2, flags, self.sequence,
+                             offset, len(payload))
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        return header + payload
+
+
+class FrameDecoder(object):
+    """Decode version 2 pixel frames from one sender."""
+
+    def __init__(self):
+        self.sequence = None
+        self.previous = bytearray()
+
+    def decode(self, flags, sequence, offset, payload):
+        """Return the RGB bytes for the pixels from offset on.  Raise
+        ValueError if the frame can't be decoded."""
+        if flags & COMPRESSED:
+            decompressor = zlib.decompressobj()
+            try:
+                payload = decompressor.decompress(payload, MAX_FRAME_BYTES)
+            except zlib.error as e:
+                raise ValueError('Bad compressed frame: %s' % e)
+            if decompressor.unconsumed_tail:
+                raise ValueError('Frame is larger than %d bytes' %
+                                 MAX_FRAME_BYTES)
+
+        begin = 3 * offset
+        old = _previous(self.previous, begin, len(payload))
+        if flags & DELTA:
+            expected = self.sequence is None or (
+                sequence == (self.sequence + 1) & 0xFFFFFFFF)
+            if not expected:
+                raise ValueError('Delta frame %d does not follow frame %s' %
+                                 (sequence, self.sequence))
+            payload = _xor(old, payload)
+        else:
+            payload = bytes(payload)
+
+        self.previous[begin:begin + len(payload)] = payload
+
+        self.sequence = sequence
+        return payload
+
+
+class Reassembler(object):
+    """
+    Reassembles fragmented frames from one sender, and drops frames which
+    arrive after a later frame.
+
+    If metrics is set, it counts:
+        frames - frames accepted
+        lost_frames - frames which never arrived, or arrived incomplete
+        late_frames - frames or fragments which arrived too late
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.latest = None
+        self.pending = {}
+
+    def accept(self, sequence):
+        """Return True if the frame with this sequence number is the newest
+        yet, and should be used."""
+        if self.latest is not None:
+            ahead = self._ahead(sequence)
+            if not self._is_new(sequence):
+                self._count('late_frames')
+                return False
+            if ahead > 1:
+                self._count('lost_frames', ahead - 1)
+                log.debug('Lost frames %d to %d', self.latest + 1,
+                          sequence - 1)
+
+        self.latest = sequence
+        self._count('frames')
+        for s in [s for s in self.pending if not self._is_new(s)]:
+            del self.pending[s]
+        return True
+
+    def add_fragment(self, sequence, index, count, data):
+        """Add one fragment, and return the whole packet if it's complete."""
+        if not self._is_new(sequence):
+            self._count('late_frames')
+            return None
+
+        fragments = self.pending.setdefault(sequence, {})
+        fragments[index] = bytes(data)
+        if len(fragments) < count:
+            if len(self.pending) > MAX_PENDING_FRAMES:
+                del self.pending[min(self.pending, key=self._ahead)]
+            return None
+
+        del self.pending[sequence]
+        if self.accept(sequence):
+            return b''.join(fragments[i] for i in range(count))
+
+    def _ahead(self, sequence):
+        """Return how far sequence is ahead of the latest frame."""
+        return (sequence - (self.latest or 0)) & 0xFFFFFFFF
+
+    def _is_new(self, sequence):
+        return self.latest is None or 0 < self._ahead(sequence) <= 0x7FFFFFFF
+
+    def _count(self, name, amount=1):
+        if self.metrics:
+            self.metrics.increment(name, amount)
+
+
+def fragment(packet, sequence, mtu=DEFAULT_MTU):
+    """Return a list of datagrams of at most mtu bytes holding packet."""
+    size = mtu - FRAGMENT_HEADER.size
+    count = math.ceil(len(packet) / size)
+    if count > 0xFFFF:
+        raise ValueError('Packet of %d bytes needs too many fragments' %
+                         len(packet))
+
+    view = memoryview(packet)
+    return [FRAGMENT_HEADER.pack(CMDTYPE.FRAGMENT, sequence, i, count) +
+            view[i * size:(i + 1) * size] for i in range(count)]
+
+
+def _previous(previous, begin, size):
+    """Return size bytes of previous from begin, growing previous if needed."""
+    end = begin + size
+    if len(previous) < end:
+        previous.extend(bytes(end - len(previous)))
+    return previous[begin:end]
+
+
+def _xor(a, b):
+    x = int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')
+    return x.to_bytes(len(b), 'little')
@@ -1,4 +1,4 @@
-import threading
+import socket, threading
 import os
 
 try:
@@ -6,71 +6,189 @@ try:
 except:
     import socketserver as SocketServer
 from .. return_codes import RETURN_CODES
-from . network import CMDTYPE
+from . import network_protocol
+from . network_protocol import CMDTYPE
 
 os.sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from .. import log
+from .. util import metrics
 
 
 class ThreadedDataHandler(SocketServer.BaseRequestHandler):
+    """
+    Handles one connection from a Network driver, which can send any number
+    of commands.  Each command gets a one byte response.
+    """
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.decoder = network_protocol.FrameDecoder()
 
     def handle(self):
         try:
-            cmd = ord(self.request.recv(1))
-            r = bytes(self.request.recv(2))
-            size = (ord(r[1]) << 8) | ord(r[0])
-
-            if cmd == CMDTYPE.PIXEL_DATA:
-                data = bytearray()
-                emptyCount = 0
-                while len(data) < size:
-                    buf = self.request.recv(4096)
-                    if len(buf) == 0:
-                        emptyCount += 1
-                    if emptyCount >= 5:
-                        log.exception(
-                            "Failed to receive expected amount of data! Expected: %s bytes / Received: %s bytes", size, len(data))
-                        self.request.sendall(RETURN_CODES.ERROR_SIZE)
-                        return
-
-                    data.extend(buf)
-
-                if len(data) != size:
-                    log.exception(
-                        "Received data size incorrect! "
-                        "Expected: %s bytes / Received: {%s bytes",
-                        size, len(data))
-                    return
-
-                self.server.update(data)
-
-                if self.server.hasFrame:
-                    while self.server.hasFrame():
-                        pass
-
-                packet = bytearray()
-                packet.append(RETURN_CODES.SUCCESS)
-                self.request.sendall(packet)
-
-            elif cmd == CMDTYPE.BRIGHTNESS:
-                res = self.request.recv(1)
-                bright = ord(res)
-                result = RETURN_CODES.ERROR_UNSUPPORTED
-                if self.server.set_brightness:
-                    if self.server.set_brightness(bright):
-                        result = RETURN_CODES.SUCCESS
-                    else:
-                        # Try again.
-                        self.server.set_brightness(bright)
-
-                packet = bytearray()
-                packet.append(result)
-                self.request.sendall(packet)
-
+            while self.handle_command():
+                pass
         except Exception as e:
             log.exception(e)
             pass  # if there's a comm error, just move on
-        return
+
+    def handle_command(self):
+        """Handle one command.  Return False if the connection was closed."""
+        cmd = self.read(1)
+        if cmd is None:
+            return False
+
+        cmd = cmd[0]
+        if cmd == CMDTYPE.PIXEL_DATA_V2:
+            return self.handle_frame()
+
+        header = self.read(2)
+        if header is None:
+            return False
+
+        size = header[0] | (header[1] << 8)
+        data = self.read(size)
+        if data is None:
+            log.error('Failed to receive expected amount of data! '
+                      'Expected: %s bytes', size)
+            self.respond(RETURN_CODES.ERROR_SIZE)
+            return False
+
+        if cmd == CMDTYPE.PIXEL_DATA:
+            self.update(data)
+
+        elif cmd == CMDTYPE.BRIGHTNESS:
+            result = RETURN_CODES.ERROR_UNSUPPORTED
+            if self.server.set_brightness and size == 1:
+                bright = data[0]
+                if self.server.set_brightness(bright):
+                    result = RETURN_CODES.SUCCESS
+                else:
+                    # Try again.
+                    self.server.set_brightness(bright)
+            self.respond(result)
+
+        elif cmd == CMDTYPE.PROTOCOL_VERSION:
+            supported = size == 1 and data[0] <= network_protocol.VERSION
+            self.respond(RETURN_CODES.SUCCESS if supported else
+                         RETURN_CODES.ERROR_UNSUPPORTED)
+
+        else:
+            self.respond(RETURN_CODES.ERROR_BAD_CMD)
+
+        return True
+
+    def handle_frame(self):
+        """Handle a version 2 pixel frame."""
+        header = self.read(network_protocol.HEADER.size - 1)
+        if header is None:
+            return False
+
+        _, flags, sequence, offset, length = network_protocol.HEADER.unpack(
+            bytes((CMDTYPE.PIXEL_DATA_V2,)) + header)
+        if length > network_protocol.MAX_FRAME_BYTES:
+            log.error('Frame of %s bytes is too large', length)
+            self.respond(RETURN_CODES.ERROR_SIZE)
+            return False
+
+        payload = self.read(length)
+        if payload is None:
+            return False
+
+        try:
+            data = self.decoder.decode(flags, sequence, offset, payload)
+        except ValueError as e:
+            log.error('Unable to decode frame: %s', e)
+            self.respond(RETURN_CODES.ERROR)
+            return True
+
+        self.update(data, offset)
+        return True
+
+    def update(self, data, offset=0):
+        self.server.update(data, offset)
+
+        if self.server.hasFrame:
+            while self.server.hasFrame():
+                pass
+
+        self.respond(RETURN_CODES.SUCCESS)
+
+    def read(self, size):
+        """Read exactly size bytes, or return None if the connection closed
+        first."""
+        data = bytearray(size)
+        view = memoryview(data)
+        while view:
+            received = self.request.recv_into(view)
+            if not received:
+                return None
+            view = view[received:]
+        return data
+
+    def respond(self, code):
+        self.request.sendall(bytes((code,)))
+
+
+class UDPSource(object):
+    """The state of one NetworkUDP driver sending to a UDPDataServer."""
+
+    def __init__(self, metrics):
+        self.reassembler = network_protocol.Reassembler(metrics)
+        self.decoder = network_protocol.FrameDecoder()
+
+    def receive(self, datagram):
+        """Return (data, offset) if datagram completes a new frame, or None.
+        Raise ValueError if it can't be decoded."""
+        cmd = datagram[0]
+        if cmd == CMDTYPE.FRAGMENT:
+            header = network_protocol.FRAGMENT_HEADER
+            _, sequence, index, count = header.unpack_from(datagram)
+            datagram = self.reassembler.add_fragment(
+                sequence, index, count, datagram[header.size:])
+            if not datagram:
+                return None
+            cmd = datagram[0]
+
+        elif cmd == CMDTYPE.PIXEL_DATA_V2:
+            sequence = network_protocol.HEADER.unpack_from(datagram)[2]
+            if not self.reassembler.accept(sequence):
+                return None
+
+        if cmd == CMDTYPE.PIXEL_DATA:
+            return datagram[3:], 0
+
+        if cmd == CMDTYPE.PIXEL_DATA_V2:
+            header = network_protocol.HEADER
+            _, flags, sequence, offset, length = header.unpack_from(datagram)
+            payload = datagram[header.size:header.size + length]
+            return self.decoder.decode(flags, sequence, offset, payload), offset
+
+        raise ValueError('Unexpected command %s' % cmd)
+
+
+class UDPDataHandler(SocketServer.BaseRequestHandler):
+    """Handles one datagram from a NetworkUDP driver."""
+
+    def handle(self):
+        datagram = self.request[0]
+        if not datagram:
+            return
+
+        source = self.server.sources.get(self.client_address)
+        if not source:
+            source = UDPSource(self.server.metrics)
+            self.server.sources[self.client_address] = source
+
+        try:
+            frame = source.receive(datagram)
+        except Exception as e:
+            self.server.metrics.increment('bad_frames')
+            log.error('Bad datagram from %s: %s', self.client_address, e)
+            return
+
+        if frame:
+            self.server.update(*frame)
 
 
 class ThreadedDataServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
@@ -79,15 +197,38 @@ class ThreadedDataServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
     hasFrame = None
 
 
-class NetworkReceiver:
+class UDPDataServer(SocketServer.UDPServer):
+    """Handles datagrams one at a time, so frames stay in order."""
+    max_packet_size = 0xFFFF
+    update = None
+    metrics = None
 
-    def __init__(self, layout, port=3142, interface='0.0.0.0'):
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+        self.sources = {}
+
+
+class NetworkReceiver:
+    """
+    Receives frames from Network drivers over TCP or, if udp is True, from
+    NetworkUDP drivers.  Over UDP, fragmented frames are reassembled, frames
+    arriving after a later frame are dropped, and lost and late frames are
+    counted in self.metrics.
+    """
+
+    def __init__(self, layout, port=3142, interface='0.0.0.0', udp=False):
         self.layout = layout
         self.address = (interface, port)
-        SocketServer.TCPServer.allow_reuse_address = True
-        self._server = ThreadedDataServer(self.address, ThreadedDataHandler)
+        self.metrics = metrics.Metrics('receiver', type(self).__name__)
+        if udp:
+            self._server = UDPDataServer(self.address, UDPDataHandler)
+            self._server.metrics = self.metrics
+        else:
+            SocketServer.TCPServer.allow_reuse_address = True
+            self._server = ThreadedDataServer(
+                self.address, ThreadedDataHandler)
+            self._server.set_brightness = self.set_brightness
         self._server.update = self.update
-        self._server.set_brightness = self.layout.set_brightness
 
     def start(self, join=False):
         self._t = threading.Thread(target=self._server.serve_forever)
@@ -103,6 +244,10 @@ class NetworkReceiver:
         self._server.server_close()
         # self._t.join()
 
-    def update(self, data):
-        self.layout.setBuffer(list(data))
+    def update(self, data, offset=0):
+        self.layout.set_many(data, offset)
         self.layout.push_to_driver()
+
+    def set_brightness(self, brightness):
+        self.layout.set_brightness(brightness)
+        return True
@@ -1,28 +1,43 @@
 import socket, sys, time, os
 
 from . driver_base import DriverBase
+from . network_protocol import CMDTYPE, DEFAULT_MTU, FrameEncoder, fragment
 from .. import log, util
 from .. return_codes import RETURN_CODES
 
 
-class CMDTYPE:
-    SETUP_DATA = 1  # reserved for future use
-    PIXEL_DATA = 2
-    BRIGHTNESS = 3
+class NetworkUDP(DriverBase):
+    """
+    Driver for communicating with another device on the network.
 
+    There's no way to negotiate the frame protocol over UDP, so `protocol`
+    must be set to 2 to send version 2 frames, which can be compressed with
+    zlib at level `compress`.  Frames are never sent as deltas, since any
+    datagram might be lost.
 
-class NetworkUDP(DriverBase):
-    """Driver for communicating with another device on the network."""
+    Frames larger than `mtu` bytes are split into numbered fragments, which
+    only a NetworkReceiver with udp=True can put back together.  By default,
+    version 2 frames are split at DEFAULT_MTU, and version 1 frames are never
+    split, so that they still reach any version 1 receiver.
+    """
 
     def __init__(self, num=0, width=0, height=0, host="localhost",
-                 broadcast=False, port=3142, broadcast_interface='', **kwds):
+                 broadcast=False, port=3142, broadcast_interface='',
+                 protocol=1, compress=0, mtu=None, **kwds):
         super().__init__(num, width, height, **kwds)
+        self._protocol = protocol
+        self._encoder = FrameEncoder(compress)
+        if mtu is None and protocol >= 2:
+            mtu = DEFAULT_MTU
+        self._mtu = mtu
+        self._sequence = 0
 
         self._host = host
         self._port = port
         self._sock = None
         self._broadcast = broadcast
         self._broadcast_interface = broadcast_interface
+        self._connect()
 
     def _generateHeader(self, cmd, size):
         packet = bytearray()
@@ -46,21 +61,35 @@ class NetworkUDP(DriverBase):
             raise IOError(error)
 
     def _compute_packet(self):
-        count = self.bufByteCount()
-        self._packet = util.generate_header(CMDTYPE.PIXEL_DATA, count)
         indexes = range(self._pos, self._pos + self.numLEDs)
-        self._packet.extend(int(c) for i in indexes for c in self._colors[i])
+        data = bytes(int(c) for i in indexes for c in self._colors[i])
+        if self._protocol >= 2:
+            self._packet = self._encoder.encode(data)
+        else:
+            self._packet = util.generate_header(CMDTYPE.PIXEL_DATA, len(data))
+            self._packet.extend(data)
+
+        # The version 2 encoder's sequence number stays in step with this.
+        self._packet_sequence = self._sequence
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
 
     # Push new data to strand
     def _send_packet(self):
         try:
-            s = self._connect()
-            s.sendto(self._packet, (self._host, self._port))
+            if not self._mtu or len(self._packet) <= self._mtu:
+                datagrams = [self._packet]
+            else:
+                datagrams = fragment(
+                    self._packet, self._packet_sequence, self._mtu)
 
-            s.close()
+            for datagram in datagrams:
+                self._sock.sendto(datagram, (self._host, self._port))
 
         except Exception as e:
             log.exception(e)
             error = "Problem communicating with network receiver!"
             log.error(error)
             raise IOError(error)
+
+    def cleanup(self):
+        self._sock.close()
@@ -0,0 +1,69 @@
+import struct
+
+from . import network
+from . driver_base import DriverBase
+
+PORT = 7890
+
+# The commands in an Open Pixel Control message.
+SET_PIXEL_COLORS = 0
+SYSTEM_EXCLUSIVE = 255
+
+# Channel 0 sends to every channel.
+BROADCAST_CHANNEL = 0
+
+# channel, command, length
+HEADER = struct.Struct('>BBH')
+
+MAX_PIXELS = 0xFFFF // 3
+
+
+class Connection(network.Connection):
+    """
+    A long-lived TCP connection to an OPC server - see network.Connection.
+    OPC servers never acknowledge messages, so none are ever waited for.
+    """
+
+    def __init__(self, host, port, timeout=5):
+        super().__init__(host, port, timeout=timeout, protocol=1)
+
+    def _read_acks(self, count):
+        self.in_flight = 0
+
+
+class OPC(DriverBase):
+    """
+    Driver for Open Pixel Control servers.
+
+    Each OPC driver sends its pixels to one OPC `channel`, so a layout with
+    several OPC drivers sends each driver's part of the layout to its own
+    channel.
+
+    The message header is computed once, and the pixels are rendered
+    straight into the message after it, so each frame is sent without being
+    copied.
+    """
+
+    def __init__(self, num=0, width=0, height=0, host='localhost', port=PORT,
+                 channel=BROADCAST_CHANNEL, timeout=5, **kwds):
+        super().__init__(num, width, height, **kwds)
+        if self.numLEDs > MAX_PIXELS:
+            raise ValueError('An OPC channel can hold at most %d pixels' %
+                             MAX_PIXELS)
+
+        self._connection = Connection(host, port, timeout)
+        self._packet = self.maker.make_packet(HEADER.size + self.bufByteCount())
+        self._packet[:HEADER.size] = HEADER.pack(
+            channel, SET_PIXEL_COLORS, self.bufByteCount())
+
+    def _render_target(self):
+        return self._packet, HEADER.size, 3
+
+    def _compute_packet(self):
+        self._render()
+
+    def _send_packet(self):
+        self._connection.send(self._packet)
+
+    def cleanup(self):
+        self._connection.close()
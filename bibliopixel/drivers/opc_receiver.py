@@ -0,0 +1,79 @@
+import threading
+
+try:
+    import SocketServer
+except:
+    import socketserver as SocketServer
+from . import opc
+from . network_receiver import ThreadedDataHandler
+from .. import log
+
+
+class OPCDataHandler(ThreadedDataHandler):
+    """Handles one connection from an OPC client, which can send any number
+    of messages."""
+
+    def handle_command(self):
+        """Handle one message.  Return False if the connection was closed."""
+        header = self.read(opc.HEADER.size)
+        if header is None:
+            return False
+
+        channel, command, length = opc.HEADER.unpack(header)
+        data = self.read(length)
+        if data is None:
+            return False
+
+        if command == opc.SET_PIXEL_COLORS:
+            self.server.update(channel, data)
+        return True
+
+
+class OPCDataServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    daemon_threads = True
+    update = None
+
+
+class OPCReceiver:
+    """
+    An Open Pixel Control server which displays the pixels it receives on a
+    layout.
+
+    Channel 0 addresses the whole layout, and channel n addresses the pixels
+    of the layout's nth driver, so an OPC client can send to each driver of
+    a layout separately.
+    """
+
+    def __init__(self, layout, port=opc.PORT, interface='0.0.0.0'):
+        self.layout = layout
+        self.address = (interface, port)
+
+        # The (offset, size) in pixels of each channel in the layout.
+        self.channels = {opc.BROADCAST_CHANNEL: (0, len(layout._colors))}
+        for i, d in enumerate(layout.drivers):
+            self.channels[i + 1] = d._pos, d.numLEDs
+
+        SocketServer.TCPServer.allow_reuse_address = True
+        self._server = OPCDataServer(self.address, OPCDataHandler)
+        self._server.update = self.update
+
+    def start(self, join=False):
+        self._t = threading.Thread(target=self._server.serve_forever)
+        self._t.daemon = True  # don't hang on exit
+        self._t.start()
+        log.info("Listening on %s", self.address)
+        if join:
+            self._t.join()
+
+    def stop(self):
+        log.info("Closing server...")
+        self._server.shutdown()
+        self._server.server_close()
+
+    def update(self, channel, data):
+        if channel not in self.channels:
+            return
+        offset, size = self.channels[channel]
+        view = memoryview(data)[:3 * size]
+        self.layout.set_many(view[:len(view) - len(view) % 3], offset)
+        self.layout.push_to_driver()
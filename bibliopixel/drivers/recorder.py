@@ -0,0 +1,46 @@
+import time
+
+from . driver_base import DriverBase
+from .. util import frame_file
+
+
+class Recorder(DriverBase):
+    """
+    Driver which records every rendered frame into a frame file - see
+    util.frame_file - for the Replay animation to play back later.
+
+    Frames are recorded after brightness, gamma and channel order have been
+    applied, so to replay them unchanged, leave gamma and c_order at their
+    defaults.
+
+    fps - the frame rate to store in the file, or 0 to replay frames at the
+        times they were recorded
+    """
+
+    def __init__(self, num=0, width=0, height=0, filename='frames.bpx', fps=0,
+                 compress=0, delta=False,
+                 keyframe_interval=frame_file.DEFAULT_KEYFRAME_INTERVAL,
+                 **kwds):
+        super().__init__(num, width, height, **kwds)
+        self._writer = frame_file.FrameWriter(
+            filename, self.numLEDs, fps, compress, delta, keyframe_interval)
+        self._start_time = []
+
+    def _begin_frame(self, flush=None):
+        # Record unchanged frames too, so that the recording keeps the time
+        # that every frame was shown, but don't render them again.
+        if not super()._begin_frame(flush):
+            self._dirty = 0, 0
+        return True
+
+    def _compute_packet(self):
+        self._render()
+
+    def _send_packet(self):
+        # A list, so that it's shared with the copies that send each frame.
+        if not self._start_time:
+            self._start_time.append(time.time())
+        self._writer.write(self._buf, time.time() - self._start_time[0])
+
+    def cleanup(self):
+        self._writer.close()
@@ -0,0 +1,244 @@
+"""
+Publish frames to other processes on the same host through shared memory.
+
+The SharedMemory driver writes each frame into a named POSIX shared memory
+segment or, if `path` is set, into a memory-mapped file.  The segment starts
+with a HEADER holding
+
+    magic        - MAGIC
+    version      - VERSION
+    data_offset  - where the pixel data starts: DATA_OFFSET
+    pixel_count  - the number of RGB pixels
+    width        - the width of the driver, or 0
+    height       - the height of the driver, or 0
+    reserved     - 0
+    sequence     - a seqlock counter: odd while a frame is being written
+    frame        - the number of the last frame written, counting from 1
+    timestamp    - when that frame was written, in seconds since the epoch
+
+followed at data_offset by the RGB bytes of the last frame.
+
+A reader copies the data between two reads of the sequence number, and
+only keeps the copy if the sequence number was even and didn't change -
+see FrameReader.
+"""
+
+import mmap, os, struct, time
+
+from . driver_base import DriverBase
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+MAGIC = b'BPix'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHIIIIQQd')
+SEQUENCE = struct.Struct('<Q')
+FRAME = struct.Struct('<Qd')
+
+SEQUENCE_OFFSET = 24
+FRAME_OFFSET = 32
+DATA_OFFSET = 64
+
+DEFAULT_NAME = 'bibliopixel'
+
+SEGMENT_EXISTS_ERROR = """
+The shared memory segment "{0}" already exists.
+Perhaps another SharedMemory driver is writing to it?
+
+Use a different name, or set replace=True to remove the old segment -
+for example, one left over from a writer that didn't clean up.
+"""
+
+
+class SharedMemory(DriverBase):
+    """
+    Driver which publishes every frame into shared memory, so that other
+    processes on this host can read it without a network round trip.
+
+    name - the name of the POSIX shared memory segment
+    path - if set, a file to memory-map instead of a shared memory segment
+    replace - if True, remove any existing segment with the same name
+        instead of raising ValueError
+    """
+
+    def __init__(self, num=0, width=0, height=0, name=DEFAULT_NAME, path=None,
+                 replace=False, **kwds):
+        super().__init__(num, width, height, **kwds)
+        size = DATA_OFFSET + self.bufByteCount()
+        self._segment = _Segment(name, path, size, create=True,
+                                 replace=replace)
+
+        buf = self._segment.buf
+        buf[:DATA_OFFSET] = bytes(DATA_OFFSET)
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, DATA_OFFSET, self.numLEDs,
+                         width, height, 0, 0, 0, 0)
+        self._data = buf[DATA_OFFSET:size]
+
+    def _compute_packet(self):
+        self._render()
+
+    def _send_packet(self):
+        # The sequence and frame numbers are kept only in the segment, so
+        # they carry over between the copies that send each frame.
+        buf = self._segment.buf
+        sequence = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0]
+        frame = FRAME.unpack_from(buf, FRAME_OFFSET)[0]
+
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, sequence + 1)
+        self._data[:] = self._buf
+        FRAME.pack_into(buf, FRAME_OFFSET, frame + 1, time.time())
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, sequence + 2)
+
+    def cleanup(self):
+        self._data.release()
+        self._segment.close(unlink=True)
+
+
+class FrameReader(object):
+    """
+    Reads frames written by a SharedMemory driver.
+
+    The data attribute is a zero-copy view of the pixels, which may change
+    while it is being read.  read() returns a consistent copy.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, path=None):
+        self._segment = _Segment(name, path)
+        buf = self._segment.buf
+        (magic, version, data_offset, self.pixel_count, self.width,
+         self.height, _, _, _, _) = HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            self._segment.close()
+            raise ValueError('Not a BiblioPixel frame segment')
+
+        self.data = buf[data_offset:data_offset + 3 * self.pixel_count]
+
+    @property
+    def frame(self):
+        """The number of the last frame written, or 0 if there is none."""
+        return FRAME.unpack_from(self._segment.buf, FRAME_OFFSET)[0]
+
+    def read(self, out=None, retries=1000):
+        """
+        Copy the latest frame into out, or into a new bytearray if out is
+        None, and return (frame, timestamp, out).
+
+        Raise IOError if no consistent frame could be read after `retries`
+        tries, which means the writer is updating faster than we can copy.
+        """
+        buf = self._segment.buf
+        if out is None:
+            out = bytearray(len(self.data))
+
+        for i in range(retries):
+            before = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0]
+            if not before % 2:
+                out[:] = self.data
+                frame, timestamp = FRAME.unpack_from(buf, FRAME_OFFSET)
+                after = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0]
+                if before == after:
+                    return frame, timestamp, out
+            time.sleep(0)
+
+        raise IOError('Unable to read a consistent frame')
+
+    def wait(self, frame, timeout=None, interval=0.001):
+        """Wait until a frame after `frame` has been written.  Return False
+        if timeout seconds passed first."""
+        end = timeout and time.time() + timeout
+        while self.frame <= frame:
+            if end and time.time() > end:
+                return False
+            time.sleep(interval)
+        return True
+
+    def close(self):
+        if self.data is not None:
+            self.data.release()
+            self.data = None
+        self._segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _Segment(object):
+    """A named shared memory segment or memory-mapped file."""
+
+    def __init__(self, name, path, size=0, create=False, replace=False):
+        self._shm = self._mmap = None
+        if path:
+            fd = os.open(path, os.O_RDWR | (os.O_CREAT if create else 0))
+            try:
+                if create:
+                    os.ftruncate(fd, size)
+                self._mmap = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            self.buf = memoryview(self._mmap)
+
+        elif not shared_memory:
+            raise ValueError('Shared memory segments need Python 3.8 or '
+                             'later: set path to use a file instead')
+
+        elif create:
+            try:
+                self._shm = shared_memory.SharedMemory(name, True, size)
+            except FileExistsError:
+                if not replace:
+                    raise ValueError(SEGMENT_EXISTS_ERROR.format(name))
+                _unlink(name)
+                self._shm = shared_memory.SharedMemory(name, True, size)
+            self.buf = self._shm.buf
+
+        else:
+            self._shm, self._mmap = _attach(name)
+            self.buf = self._shm.buf if self._shm else memoryview(self._mmap)
+
+    def close(self, unlink=False):
+        self.buf.release()
+        if self._mmap:
+            self._mmap.close()
+        if self._shm:
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+
+
+def _attach(name):
+    """
+    Attach to an existing segment, and return (SharedMemory, None) or
+    (None, mmap).
+
+    Before Python 3.13, every SharedMemory is registered with the resource
+    tracker, which deletes the segment when this process exits, so POSIX
+    segments are mapped directly instead.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False), None
+    except TypeError:
+        pass
+
+    try:
+        import _posixshmem
+    except ImportError:  # Windows, which has no resource tracker
+        return shared_memory.SharedMemory(name), None
+
+    fd = _posixshmem.shm_open('/' + name, os.O_RDWR, mode=0o600)
+    try:
+        return None, mmap.mmap(fd, 0)
+    finally:
+        os.close(fd)
+
+
+def _unlink(name):
+    shm = shared_memory.SharedMemory(name)
+    shm.close()
+    shm.unlink()
@@ -1,6 +1,7 @@
-import math, threading, time
+import array, math, threading, time
 
 from .. import colors, data_maker, font, log, matrix
+from . import layout
 from . layout import Layout
 from . geometry.cube import gen_cube, pixel_positions_from_cube
 
@@ -30,6 +31,11 @@ class Cube(Layout):
 
         self.set_pixel_positions(pixel_positions_from_cube(self.cube_map))
 
+        # The strip index of each voxel, ordered by z, then y, then x.
+        self._index_map = array.array('i', (
+            self.cube_map[k][j][i]
+            for k in range(z) for j in range(y) for i in range(x)))
+
     def get_pixel_positions(self):
         return pixel_positions_from_cube(self.coord_map)
 
@@ -40,6 +46,48 @@ class Cube(Layout):
         except IndexError:
             pass
 
+    def blit(self, colors, x=0, y=0, z=0, dx=None, dy=None, dz=None):
+        """Copy a box of colors onto the cube in one pass.
+
+        colors - colors for the box ordered by z, then y, then x, either as a
+            sequence of colors or as a flat RGB buffer
+        x, y, z - the corner of the box on the cube
+        dx, dy, dz - the size of the box.  dx and dy default to the size of
+            the cube and dz is computed from the number of colors.
+
+        Parts of the box off the cube are clipped.
+        """
+        colors = layout._color_list(colors, use_numpy=self._use_numpy)
+        dx = dx or self.x
+        dy = dy or self.y
+        dz = dz or len(colors) // (dx * dy)
+        if dx * dy * dz != len(colors):
+            raise ValueError('Expected %d colors for a %dx%dx%d box, got %d' %
+                             (dx * dy * dz, dx, dy, dz, len(colors)))
+
+        if (x, y, z, dx, dy, dz) == (0, 0, 0, self.x, self.y, self.z):
+            self.set_indices(self._index_map, colors)
+            return
+
+        # Clip the box to the cube.
+        x0, x1 = max(x, 0), min(x + dx, self.x)
+        y0, y1 = max(y, 0), min(y + dy, self.y)
+        z0, z1 = max(z, 0), min(z + dz, self.z)
+
+        indices, picks = [], []
+        for k in range(z0, z1):
+            for j in range(y0, y1):
+                begin = (k * self.y + j) * self.x
+                pick = ((k - z) * dy + j - y) * dx - x
+                indices.extend(self._index_map[begin + x0:begin + x1])
+                picks.extend(range(pick + x0, pick + x1))
+
+        if layout.numpy and isinstance(colors, layout.numpy.ndarray):
+            colors = colors[picks]
+        else:
+            colors = [colors[i] for i in picks]
+        self.set_indices(indices, colors)
+
     def get(self, x, y, z):
         try:
             pixel = self.cube_map[z][y][x]
@@ -1,3 +1,4 @@
+import array
 from . import index_ops
 from . import Rotation, rotate_and_flip
 
@@ -61,6 +62,30 @@ def gen_matrix(dx, dy, serpentine=True, offset=0,
     return result
 
 
+def flatten_matrix(coord_map, width, height):
+    """Compile a coordinate map into a flat array of strip indices keyed by
+    y * width + x.  Coordinates missing from the map get -1."""
+    result = array.array('i', [-1] * (width * height))
+    for y, row in enumerate(coord_map[:height]):
+        for x, index in enumerate(row[:width]):
+            result[y * width + x] = index
+    return result
+
+
+def fan_out_matrix(coord_map, width, height, pixel_width, pixel_height):
+    """Return a list, keyed by y * width + x, of the tuple of strip indices
+    for each pixel on a matrix scaled by pixel_width and pixel_height."""
+    flat = flatten_matrix(coord_map, width * pixel_width, height * pixel_height)
+    stride = width * pixel_width
+
+    def fan_out(x, y):
+        xs = range(x * pixel_width, (x + 1) * pixel_width)
+        ys = range(y * pixel_height, (y + 1) * pixel_height)
+        return tuple(flat[j * stride + i] for j in ys for i in xs)
+
+    return [fan_out(x, y) for y in range(height) for x in range(width)]
+
+
 def pixel_positions_from_matrix(coord_map):
     max_width = 0
     for x in coord_map:
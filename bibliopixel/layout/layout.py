@@ -1,7 +1,9 @@
-import time
+import numbers, time
 from .. import colors, data_maker, util
 from .. threads.update_threading import UpdateThreading
 
+numpy = data_maker.numpy
+
 
 class Layout(object):
 
@@ -17,11 +19,18 @@ class Layout(object):
         # be changed by list surgery, never assignment.
         self._colors = maker.color_list(self.numLEDs)
 
+        # If True, self._colors is a (numLEDs, 3) numpy array and we can use
+        # vectorized operations on it.
+        self._use_numpy = maker.use_numpy
+
         pos = 0
         for d in self.drivers:
             d.set_colors(self._colors, pos)
             pos += d.numLEDs
 
+        # The range of pixels changed since the last push_to_driver().
+        self._dirty_start, self._dirty_end = 0, len(self._colors)
+
         self.frame_render_time = 0
         self.animation_sleep_time = None
 
@@ -40,15 +49,91 @@ class Layout(object):
         self.all_off()
         self.push_to_driver()
         self.threading.wait_for_update()
+        self.threading.stop()
 
     def _get_base(self, pixel):
-        if pixel >= 0 and pixel < self.numLEDs:
+        if 0 <= pixel < len(self._colors):
+            if self._use_numpy:
+                # Don't hand out a view into the buffer.
+                return tuple(self._colors[pixel].tolist())
             return self._colors[pixel]
         return 0, 0, 0  # don't go out of bounds
 
     def _set_base(self, pixel, color):
-        if pixel >= 0 and pixel < self.numLEDs:
+        if 0 <= pixel < len(self._colors):
             self._colors[pixel] = tuple(color)
+            if pixel < self._dirty_start:
+                self._dirty_start = pixel
+            if pixel >= self._dirty_end:
+                self._dirty_end = pixel + 1
+
+    def set_indices(self, indices, colors):
+        """Set many pixels at once.
+
+        indices - a sequence of pixel indices.  Indices out of range are ignored.
+        colors - either a sequence of colors, one per index, or a flat RGB
+            buffer three times as long as indices.
+        """
+        colors = _color_list(colors, len(indices), self._use_numpy)
+        count = len(self._colors)
+
+        if self._use_numpy:
+            indices = numpy.asarray(indices, dtype=int)
+            mask = (indices >= 0) & (indices < count)
+            indices = indices[mask]
+            if len(indices):
+                self._colors[indices] = numpy.asarray(colors)[mask]
+                self.set_dirty(int(indices.min()), int(indices.max()) + 1)
+            return
+
+        start, end = count, 0
+        for i, c in zip(indices, colors):
+            if 0 <= i < count:
+                self._colors[i] = tuple(c)
+                start, end = min(i, start), max(i + 1, end)
+        self.set_dirty(start, end)
+
+    def set_many(self, colors, start=0):
+        """Set a contiguous run of pixels beginning at start.
+
+        colors - either a sequence of colors or a flat RGB buffer.  Colors
+            past the end of the layout are ignored.
+        """
+        colors = _color_list(colors, use_numpy=self._use_numpy)
+        if start < 0:
+            colors, start = colors[-start:], 0
+        end = min(start + len(colors), len(self._colors))
+        if start >= end:
+            return
+
+        colors = colors[:end - start]
+        if self._use_numpy:
+            self._colors[start:end] = colors
+        else:
+            self._colors[start:end] = [tuple(c) for c in colors]
+        self.set_dirty(start, end)
+
+    def set_dirty(self, start=0, end=None):
+        """Mark the pixels from start up to end as changed.
+
+        Everything that goes through the Layout's methods does this
+        automatically - only code writing directly into self._colors needs to
+        call it."""
+        if end is None:
+            end = len(self._colors)
+        if start < end:
+            self._dirty_start = min(start, self._dirty_start)
+            self._dirty_end = max(end, self._dirty_end)
+
+    def _push_dirty(self):
+        """Report the changed pixels to each driver and reset them."""
+        start, end = self._dirty_start, self._dirty_end
+        self._dirty_start, self._dirty_end = len(self._colors), 0
+
+        pos = 0
+        for d in self.drivers:
+            d.set_dirty(max(start - pos, 0), min(end - pos, d.numLEDs))
+            pos += d.numLEDs
 
     def get_pixel_positions(self):
         result = []
@@ -59,6 +144,7 @@ class Layout(object):
     def push_to_driver(self):
         """Push the current pixel state to the driver"""
         # This is overridden elsewhere.
+        self._push_dirty()
         self.threading.push_to_driver()
 
     # use with caution!
@@ -72,6 +158,7 @@ class Layout(object):
                           "Expected: {} bytes / Received: {} bytes"
                           .format(len(self._colors), len(buf)))
         self._colors[:] = buf
+        self.set_dirty()
 
     def setBuffer(self, buf):
         """DEPRECATED!"""
@@ -99,7 +186,11 @@ class Layout(object):
 
     def all_off(self):
         """Set all pixels off"""
-        self._colors[:] = [(0, 0, 0)] * self.numLEDs
+        if self._use_numpy:
+            self._colors.fill(0)
+        else:
+            self._colors[:] = [(0, 0, 0)] * self.numLEDs
+        self.set_dirty()
 
     # Fill the strand (or a subset) with a single color using a Color object
     def fill(self, color, start=0, end=-1):
@@ -107,6 +198,10 @@ class Layout(object):
         start = max(start, 0)
         if end < 0 or end >= self.numLEDs:
             end = self.numLEDs - 1
+        if self._use_numpy:
+            self._colors[start:end + 1] = tuple(color)
+            self.set_dirty(start, end + 1)
+            return
         for led in range(start, end + 1):  # since 0-index include end in range
             self._set_base(led, color)
 
@@ -119,3 +214,28 @@ class Layout(object):
     def fillHSV(self, hsv, start=0, end=-1):
         """Fill the entire strip with HSV color tuple"""
         self.fill(colors.hsv2rgb(hsv), start, end)
+
+
+def _color_list(colors, count=None, use_numpy=False):
+    """Return colors as a sequence of colors, unflattening it if it is a flat
+    RGB buffer.  If use_numpy is True, a flat buffer of bytes becomes a numpy
+    array without being copied."""
+    if use_numpy and isinstance(colors, (bytes, bytearray, memoryview)):
+        colors = numpy.frombuffer(colors, dtype=numpy.uint8)
+
+    if numpy and isinstance(colors, numpy.ndarray):
+        if colors.size % 3:
+            raise ValueError('Flat color buffer length %d is not a multiple '
+                             'of 3' % colors.size)
+        colors = colors.reshape(-1, 3)
+
+    elif len(colors) and isinstance(colors[0], numbers.Number):
+        if len(colors) % 3:
+            raise ValueError('Flat color buffer length %d is not a multiple '
+                             'of 3' % len(colors))
+        # https://stackoverflow.com/questions/1624883
+        colors = list(zip(*(iter(colors),) * 3))
+
+    if count is not None and len(colors) != count:
+        raise ValueError('Expected %d colors but got %d' % (count, len(colors)))
+    return colors
@@ -1,8 +1,11 @@
-import math, threading, time
+import array, math, threading, time
 
 from .. import colors, data_maker, font, matrix, log
+from . import layout
 from . layout import Layout
-from . geometry.matrix import Rotation, gen_matrix, pixel_positions_from_matrix
+from . geometry.matrix import (
+    Rotation, gen_matrix, fan_out_matrix, flatten_matrix,
+    pixel_positions_from_matrix)
 
 
 class Matrix(Layout):
@@ -86,10 +89,23 @@ class Matrix(Layout):
             self._set = self.__setNormal
         else:
             self._set = self.__setScaled
-            self.width = self.width / pw
-            self.height = self.height / ph
+            self.width = self.width // pw
+            self.height = self.height // ph
             self.numLEDs = self.width * self.height
 
+        # matrix_map compiled into flat tables keyed by y * width + x.
+        # _index_map holds the first strip index for each pixel and
+        # _fan_out_map, if the matrix is scaled, all of them.
+        if pw == 1 and ph == 1:
+            self._index_map = flatten_matrix(
+                self.matrix_map, self.width, self.height)
+            self._fan_out_map = None
+        else:
+            self._fan_out_map = fan_out_matrix(
+                self.matrix_map, self.width, self.height, pw, ph)
+            self._index_map = array.array(
+                'i', (f[0] for f in self._fan_out_map))
+
         self.fonts = font.fonts
 
     def get_pixel_positions(self):
@@ -124,19 +140,13 @@ class Matrix(Layout):
             self.set = self._setTexture
 
     def __setNormal(self, x, y, color):
-        try:
-            pixel = self.matrix_map[y][x]
-            self._set_base(pixel, color)
-        except IndexError:
-            pass
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._set_base(self._index_map[y * self.width + x], color)
 
     def __setScaled(self, x, y, color):
-        sx = x * self.pixelSize[0]
-        sy = y * self.pixelSize[1]
-
-        for xs in range(sx, sx + self.pixelSize[0]):
-            for ys in range(sy, sy + self.pixelSize[1]):
-                self.__setNormal(xs, ys, color)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            for pixel in self._fan_out_map[y * self.width + x]:
+                self._set_base(pixel, color)
 
     # Set single pixel to Color value
     def _setColor(self, x, y, color=None):
@@ -152,12 +162,51 @@ class Matrix(Layout):
             except IndexError:
                 pass
 
+    def blit(self, colors, x=0, y=0, width=None, height=None):
+        """Copy a rectangular region of colors onto the matrix in one pass.
+
+        colors - row-major colors for the region, either as a sequence of
+            colors or as a flat RGB buffer
+        x, y - the top-left corner of the region on the matrix
+        width, height - the size of the region.  width defaults to the width
+            of the matrix and height is computed from the number of colors.
+
+        Parts of the region off the matrix are clipped.
+        """
+        colors = layout._color_list(colors, use_numpy=self._use_numpy)
+        width = width or self.width
+        height = height or len(colors) // width
+        if width * height != len(colors):
+            raise ValueError('Expected %d colors for a %dx%d region, got %d' %
+                             (width * height, width, height, len(colors)))
+
+        # Clip the region to the matrix.
+        x0, x1 = max(x, 0), min(x + width, self.width)
+        y0, y1 = max(y, 0), min(y + height, self.height)
+
+        indices, picks = [], []
+        for row in range(y0, y1):
+            begin = row * self.width
+            pick = (row - y) * width - x
+            if self._fan_out_map:
+                for column in range(x0, x1):
+                    pixels = self._fan_out_map[begin + column]
+                    indices.extend(pixels)
+                    picks.extend([pick + column] * len(pixels))
+            else:
+                indices.extend(self._index_map[begin + x0:begin + x1])
+                picks.extend(range(pick + x0, pick + x1))
+
+        if layout.numpy and isinstance(colors, layout.numpy.ndarray):
+            colors = colors[picks]
+        else:
+            colors = [colors[i] for i in picks]
+        self.set_indices(indices, colors)
+
     def get(self, x, y):
-        try:
-            pixel = self.matrix_map[y][x]
-            return self._get_base(pixel)
-        except IndexError:
-            return 0, 0, 0
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._get_base(self._index_map[y * self.width + x])
+        return 0, 0, 0
 
     def setHSV(self, x, y, hsv):
         color = colors.hsv2rgb(hsv)
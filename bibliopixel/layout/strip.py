@@ -32,6 +32,11 @@ class Strip(Layout):
 
     def _setScaled(self, pixel, color):
         start = pixel * self.pixelWidth
+        if self._use_numpy:
+            if 0 <= start < len(self._colors):
+                self._colors[start:start + self.pixelWidth] = tuple(color)
+                self.set_dirty(start, start + self.pixelWidth)
+            return
         for p in range(start, start + self.pixelWidth):
             self._set_base(p, color)
 
@@ -4,14 +4,20 @@ from .importer import import_symbol
 ALIASES = {
     'driver': {
         'apa102': 'bibliopixel.drivers.API.APA102.APA102',
+        'artnet': 'bibliopixel.drivers.artnet.ArtNet',
         'sk9822': 'bibliopixel.drivers.API.APA102.APA102',
         'dummy': 'bibliopixel.drivers.dummy_driver.Dummy',
+        'e131': 'bibliopixel.drivers.e131.E131',
         'hue': 'bibliopixel.drivers.hue.Hue',
+        'hue_async': 'bibliopixel.drivers.hue.AsyncHue',
         'image': 'bibliopixel.drivers.image_sequence.ImageSequence',
         'lpd8806': 'bibliopixel.drivers.API.LPD8806.LPD8806',
         'network': 'bibliopixel.drivers.network.Network',
         'network_udp': 'bibliopixel.drivers.network.NetworkUDP',
+        'opc': 'bibliopixel.drivers.opc.OPC',
+        'recorder': 'bibliopixel.drivers.recorder.Recorder',
         'serial': 'bibliopixel.drivers.serial.Serial',
+        'shared_memory': 'bibliopixel.drivers.shared_memory.SharedMemory',
         'simpixel': 'bibliopixel.drivers.SimPixel.SimPixel',
         'ws281x': 'bibliopixel.drivers.API.WS281X.WS281X',
         'ws2801': 'bibliopixel.drivers.API.WS2801.WS2801',
@@ -28,11 +34,14 @@ ALIASES = {
     },
 
     'animation': {
+        'artnet_receiver': 'bibliopixel.animation.dmx_receiver.ArtNetReceiver',
+        'e131_receiver': 'bibliopixel.animation.dmx_receiver.E131Receiver',
         'off': 'bibliopixel.animation.off.OffAnim',
         'matrix_calibration':
         'bibliopixel.animation.tests.MatrixCalibrationTest',
         'matrix_test': 'bibliopixel.animation.tests.MatrixChannelTest',
         'receiver': 'bibliopixel.animation.receiver.BaseReceiver',
+        'replay': 'bibliopixel.animation.replay.Replay',
         'sequence': 'bibliopixel.animation.Sequence',
         'strip_test': 'bibliopixel.animation.tests.StripChannelTest',
     },
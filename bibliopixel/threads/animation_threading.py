@@ -1,5 +1,6 @@
 import threading, time
 from .. import log
+from . import scheduler
 
 
 class AnimationThreading(object):
@@ -13,7 +14,7 @@ class AnimationThreading(object):
         self.run = run
         self.stop_event = threading.Event()
         self.thread = None
-        self.frame_overrun = False
+        self.scheduler = None
 
     def stop_thread(self, wait=False):
         if self.thread:
@@ -30,22 +31,29 @@ class AnimationThreading(object):
         self.run()
         log.debug('Thread Complete')
 
-    def wait(self, wait_time, timestamps):
+    def start_schedule(self, wait_time, metrics=None):
+        """Start a new grid of frame deadlines wait_time apart."""
         if not wait_time:
+            self.scheduler = None
             return
 
-        elapsed_time = timestamps[-1] - timestamps[0]
-        if elapsed_time > wait_time:
-            logger = log.debug if self.frame_overrun else log.warning
-            logger('Frame-time of %dms set, but took %dms!',
-                   1000 * wait_time, 1000 * elapsed_time)
-            self.frame_overrun = True
+        self.scheduler = scheduler.Scheduler(
+            wait_time, self.runner.frame_policy, self.runner.sync_time,
+            metrics)
+        self.scheduler.start(self.sleep)
 
-        elif self.runner.threaded:
-            self.stop_event.wait(wait_time - elapsed_time)
+    def wait(self):
+        """
+        Wait until the next frame is due, and return how many frames the
+        schedule moved forward - more than 1 if frames were skipped.
+        """
+        return self.scheduler.wait(self.sleep) if self.scheduler else 1
 
+    def sleep(self, seconds):
+        if self.runner.threaded:
+            self.stop_event.wait(seconds)
         else:
-            time.sleep(wait_time - elapsed_time)
+            time.sleep(seconds)
 
     def start(self):
         if not self.runner.threaded:
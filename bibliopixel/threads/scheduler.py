@@ -0,0 +1,113 @@
+import math, time
+from .. import log
+
+# What to do when a frame finishes after the next frame's deadline.
+SKIP, DROP, SLIP = 'skip', 'drop', 'slip'
+POLICIES = SKIP, DROP, SLIP
+
+
+class Scheduler(object):
+    """
+    Schedules frames on a fixed grid of absolute deadlines: frame N is due at
+    `origin + N * period`, measured on a monotonic clock.  Unlike sleeping for
+    whatever is left of each frame, errors in each sleep don't accumulate.
+
+    When a frame finishes after the next deadline, the policy decides what
+    happens next:
+
+        'skip': wait for the next deadline still ahead, skipping the frames
+                that were missed.
+        'drop': like 'skip', but the animation also moves forward by the
+                missed frames' steps, so it stays where it would have been.
+        'slip': start the next frame at once, and move the grid later.
+
+    If sync_time is set, the grid is fixed to the wall clock: frame N is due
+    at `sync_time + N * period` seconds since the epoch, so hosts whose clocks
+    are synchronized - by NTP, for example - show frame N at the same moment.
+
+    If metrics is set, each frame that finishes late counts as one of its
+    dropped_frames, and each frame missed by 'skip' or 'drop' as one of its
+    skipped_frames.
+    """
+
+    def __init__(self, period, policy=SLIP, sync_time=None, metrics=None,
+                 clock=time.monotonic, wall_clock=time.time):
+        if policy not in POLICIES:
+            raise ValueError('Unknown frame policy "%s", must be one of %s' %
+                             (policy, ', '.join(POLICIES)))
+        self.period = period
+        self.policy = policy
+        self.sync_time = sync_time
+        self.metrics = metrics
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.origin = None
+        self.frame = 0
+        self.overrun = False
+
+    def deadline(self, frame=None):
+        """Return the monotonic time when a frame is due."""
+        return self.origin + self.period * (
+            self.frame if frame is None else frame)
+
+    def start(self, sleep=time.sleep):
+        """
+        Start the grid, and return the number of the first frame.  If the
+        grid is synchronized, first sleep until that frame is due.
+        """
+        now = self.clock()
+        if self.sync_time is None:
+            self.origin, self.frame = now, 0
+            return 0
+
+        since = self.wall_clock() - self.sync_time
+        self.frame = max(0, math.ceil(since / self.period))
+        self.origin = now - since
+        self._sleep_until(self.deadline(), sleep)
+        return self.frame
+
+    def wait(self, sleep=time.sleep):
+        """
+        Wait for the next frame's deadline, and return how many frames the
+        grid moved forward: 1, or more if the 'skip' or 'drop' policies
+        skipped frames.
+        """
+        if self.origin is None:
+            self.start(sleep)
+
+        now = self.clock()
+        deadline = self.deadline(self.frame + 1)
+        if now <= deadline:
+            self.frame += 1
+            self._sleep_until(deadline, sleep)
+            return 1
+
+        self._report_overrun(now - self.deadline())
+        if self.policy == SLIP:
+            if self.metrics:
+                self.metrics.record('jitter', now - deadline)
+            self.frame += 1
+            self.origin = now - self.period * self.frame
+            return 1
+
+        next_frame = int((now - self.origin) // self.period) + 1
+        advance, self.frame = next_frame - self.frame, next_frame
+        if self.metrics:
+            self.metrics.increment('skipped_frames', advance - 1)
+        self._sleep_until(self.deadline(), sleep)
+        return advance
+
+    def _sleep_until(self, deadline, sleep):
+        delay = deadline - self.clock()
+        if delay > 0:
+            sleep(delay)
+        if self.metrics:
+            self.metrics.record('jitter', self.clock() - deadline)
+
+    def _report_overrun(self, elapsed):
+        logger = log.debug if self.overrun else log.warning
+        logger('Frame-time of %dms set, but took %dms!',
+               1000 * self.period, 1000 * elapsed)
+        self.overrun = True
+        if self.metrics:
+            self.metrics.increment('dropped_frames')
@@ -0,0 +1,39 @@
+import threading, time
+
+
+class TokenBucket(object):
+    """
+    Limits how often something happens, while allowing short bursts.
+
+    The bucket refills with `rate` tokens a second, and holds at most
+    `burst` tokens.  take() uses up tokens, first waiting until there are
+    enough.  Callers on several threads are served in the order they called.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = burst
+        self.time = clock()
+        self.lock = threading.Lock()
+
+    def take(self, tokens=1):
+        """Wait until there are enough tokens, and use them up.  Return the
+        number of seconds waited."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.time) * self.rate)
+            self.time = now
+
+            # Tokens can go negative, which reserves them for this caller.
+            self.tokens -= tokens
+            wait = max(0, -self.tokens / self.rate)
+
+        if wait:
+            self.sleep(wait)
+        return wait
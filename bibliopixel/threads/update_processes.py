@@ -0,0 +1,193 @@
+import ctypes, mmap, multiprocessing, time
+from .. import data_maker, log
+
+NO_FORK_ERROR = """
+Multiprocess updates need the "fork" start method for multiprocessing,
+which is not available on this platform.
+"""
+
+NOT_SHARED_ERROR = """
+Multiprocess updates need the layout's colors in shared memory.
+Use a Maker with shared_memory=True.
+"""
+
+# Commands sent to a worker process.
+FRAME, STOP = 1, 2
+
+# Offsets into a worker's control array.
+COMMAND, BRIGHTNESS, DIRTY_REPORTED, DIRTY_START, DIRTY_END, LAST_UPDATE = (
+    range(6))
+
+
+class DriverProcess(object):
+    """
+    Runs one driver's update_colors() in a worker process.
+
+    The layout's colors, and the driver's _buf and _packet, live in shared
+    memory.  Each frame's brightness and dirty range are passed through a
+    small shared control array, and the frames are coordinated with
+    multiprocessing events.
+
+    The driver's metrics are recorded in the worker process, so they are not
+    visible in the parent.
+    """
+
+    def __init__(self, context, driver, barrier):
+        self.driver = driver
+        self.barrier = barrier
+        self.control = context.RawArray(ctypes.c_double, 6)
+
+        self.go = context.Event()
+        self.computed = context.Event()
+        self.done = context.Event()
+        self.done.set()
+
+        _share_buffers(driver)
+        self.process = context.Process(target=self.run, daemon=True)
+        self.process.start()
+
+    def update_colors(self):
+        """Start a frame once the last one is done."""
+        self.done.wait()
+        self.done.clear()
+
+        brightness, dirty, reported = self.driver._take_waiting()
+        c = self.control
+        c[COMMAND] = FRAME
+        c[BRIGHTNESS] = -1 if brightness is None else brightness
+        c[DIRTY_REPORTED] = reported
+        c[DIRTY_START], c[DIRTY_END] = dirty or (0, 0)
+        self.go.set()
+
+    def wait_for_compute(self):
+        self.computed.wait()
+        self.computed.clear()
+
+    def wait_for_send(self):
+        self.done.wait()
+        self.driver.lastUpdate = self.control[LAST_UPDATE]
+
+    def stop(self):
+        self.done.wait()
+        self.control[COMMAND] = STOP
+        self.go.set()
+        self.process.join()
+
+    def run(self):
+        """The main loop of the worker process."""
+        d, c = self.driver, self.control
+        while True:
+            self.go.wait()
+            self.go.clear()
+            if c[COMMAND] == STOP:
+                return
+
+            frame_start, computed = time.time(), False
+            try:
+                brightness = None if c[BRIGHTNESS] < 0 else int(c[BRIGHTNESS])
+                start, end = int(c[DIRTY_START]), int(c[DIRTY_END])
+                dirty = (start, end) if start < end else None
+                d._set_waiting(brightness, dirty, bool(c[DIRTY_REPORTED]))
+
+                if d._begin_frame():
+                    d._compute_frame()
+                    self.computed.set()
+                    computed = True
+                    d._send_frame()
+            except Exception:
+                log.exception('Error updating driver')
+
+            if not computed:
+                self.computed.set()
+            try:
+                # Wait for all the drivers to send this frame, then sync.
+                self.barrier.wait()
+                d._sync_frame()
+            except Exception:
+                log.exception('Error syncing driver')
+
+            c[LAST_UPDATE] = time.time() - frame_start
+            self.done.set()
+
+
+class UseProcesses(object):
+    """
+    Runs each driver in its own worker process, so that layouts with many
+    drivers can use more than one core.
+
+    Like UseThreading, push_to_driver() returns once every driver has computed
+    its packet, and the packets are sent while the animation draws the next
+    frame.
+
+    The workers are forked on the first push_to_driver(), so that they see
+    everything set up on the layout and drivers after the layout was made.
+    """
+
+    def __init__(self, layout):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError(NO_FORK_ERROR)
+        if not _is_shared(layout._colors):
+            raise ValueError(NOT_SHARED_ERROR)
+
+        self.layout = layout
+        self.processes = []
+
+    def _start(self):
+        drivers = self.layout.drivers
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(len(drivers))
+        self.processes = [DriverProcess(context, d, barrier) for d in drivers]
+
+    def update_colors(self):
+        if not self.processes:
+            self._start()
+        for p in self.processes:
+            p.update_colors()
+        for p in self.processes:
+            p.wait_for_compute()
+
+    def wait_for_update(self):
+        """Wait until every frame has been sent."""
+        for p in self.processes:
+            p.wait_for_send()
+
+    def push_to_driver(self):
+        """Push the current pixel state to the driver"""
+        self.update_colors()
+
+    def stop(self):
+        """Stop the workers.  They are forked again if the layout is pushed
+        after this."""
+        for p in self.processes:
+            p.stop()
+        self.processes = []
+
+
+def _is_shared(colors):
+    """Return True if colors is a RawArray, or a numpy array backed by a
+    RawArray or by shared memory."""
+    while colors is not None:
+        if isinstance(colors, memoryview):
+            colors = colors.obj
+        if isinstance(colors, (ctypes.Array, mmap.mmap)):
+            return True
+        colors = getattr(colors, 'base', None)
+    return False
+
+
+def _share_buffers(driver):
+    """Move a driver's _buf and _packet into shared memory, if they aren't
+    there already."""
+    make_packet = data_maker.shared_list_maker(data_maker.BYTE)
+    buf = getattr(driver, '_buf', None)
+    packet = getattr(driver, '_packet', None)
+
+    if isinstance(buf, bytearray):
+        driver._buf = make_packet(len(buf))
+        driver._buf[:] = buf
+
+    if packet is not None and packet is buf:
+        driver._packet = driver._buf
+    elif isinstance(packet, bytearray):
+        driver._packet = make_packet(len(packet))
+        driver._packet[:] = packet
@@ -1,74 +1,110 @@
 import threading, time
 from .. import log
-from . import compose_events, threads
+from . import producer_consumer, task_thread, threads, update_processes
 
+# The default number of computed frames that may wait to be sent.
+DEFAULT_QUEUE_DEPTH = 2
 
-class UpdateDriverThread(threads.Loop):
 
-    def __init__(self, driver):
-        super().__init__()
-        self.setDaemon(True)
-        self._wait = threading.Event()
-        self._reading = threading.Event()
-        self._reading.set()
-        self._updating = threading.Event()
-        self._driver = driver
+class DriverPipeline(object):
+    """
+    Runs one driver in two stages: _compute_packet on a compute thread, and
+    _send_packet on an I/O thread, so that the next frame can be computed
+    while the previous one is still being sent.  Up to `depth` computed frames
+    can wait to be sent.
+    """
 
-    def update_colors(self):
-        self._reading.wait()
-        self._reading.clear()
-        self._wait.set()
-
-    def sync(self):
-        self._updating.wait()
-        self._driver.sync()
-
-    def sending(self):
-        return self._wait.isSet()
-
-    def loop(self):
-        self._wait.wait()
-        self._updating.clear()
-        self._driver.update_colors()
-        self._wait.clear()
-        self._reading.set()
-        self._updating.set()
-
-
-class UpdateThread(threads.Loop):
-
-    def __init__(self, drivers):
-        super().__init__()
-        self.setDaemon(True)
-        self._wait = threading.Event()
-        self._reading = threading.Event()
-        self._reading.set()
-        self._drivers = drivers
-        for d in self._drivers:
-            t = UpdateDriverThread(d)
-            t.start()
-            d._thread = t
-
-        events = (d._thread._updating for d in self._drivers)
-        self._updated = compose_events.compose_events(events)
+    def __init__(self, driver, barrier, depth=DEFAULT_QUEUE_DEPTH):
+        self.driver = driver
+        self.barrier = barrier
+        self.queues = producer_consumer.Queues(*([None] for i in range(depth)))
 
-    def update_colors(self):
-        self._reading.wait()
-        for d in self._drivers:
-            d._thread.update_colors()
-        self._reading.clear()
-        self._wait.set()
+        # The number of frames that have been computed but not yet sent.
+        self.pending = 0
+        self.pending_changed = threading.Condition()
+        self.stopping = False
 
-    def loop(self):
-        self._wait.wait()
-        self._updated.wait()
+        ready = threading.Event()
+        ready.set()
+        self.computed = task_thread.Task(event=ready)
+        self.compute_thread = task_thread.TaskThread(
+            self.computed, task_thread.Task(self.compute))
+        self.io_thread = threads.Loop(self.send)
 
-        for d in self._drivers:
-            d._thread.sync()
+        self.compute_thread.start()
+        self.io_thread.start()
 
-        self._updated.clear()
-        self._wait.clear()
-        self._reading.set()
+    def update_colors(self):
+        """Start computing a frame, once the previous one is computed."""
+        self.compute_thread.produce()
+
+    def wait_for_compute(self):
+        self.computed.event.wait()
+
+    def wait_for_send(self):
+        with self.pending_changed:
+            self.pending_changed.wait_for(lambda: not self.pending)
+
+    def stop(self):
+        """Send the frames already computed, then stop and join both
+        threads."""
+        self.wait_for_compute()
+        self.wait_for_send()
+        self.stopping = True
+
+        # Wake each thread so it sees that it has been stopped.
+        self.compute_thread.stop()
+        self.compute_thread.consumer_task.event.set()
+        self.compute_thread.join()
+
+        self.io_thread.stop()
+        with self.queues.produce() as frame:
+            frame[:] = None, None
+        self.io_thread.join()
+
+    def compute(self):
+        if self.stopping:
+            return
+        try:
+            d = self.driver
+            start = time.time()
+            if d._begin_frame(self.wait_for_send):
+                d._compute_frame()
+                sender = d._copy_for_send()
+            else:
+                sender = None
+        except Exception:
+            log.exception('Error computing packet')
+            sender = None
+
+        with self.pending_changed:
+            self.pending += 1
+
+        with self.queues.produce() as frame:
+            frame[:] = sender, start
+
+    def send(self):
+        with self.queues.consume() as frame:
+            sender, start = frame
+        if self.stopping:
+            return
+
+        try:
+            if sender:
+                sender._send_frame()
+                self.driver.lastUpdate = time.time() - start
+        except Exception:
+            log.exception('Error sending packet')
+
+        try:
+            # Wait for all the drivers to send this frame, then sync them.
+            self.barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+
+        with self.pending_changed:
+            self.pending -= 1
+            self.pending_changed.notify_all()
 
 
 class NoThreading(object):
@@ -82,7 +118,7 @@ class NoThreading(object):
         for d in self.layout.drivers:
             d.update_colors()
         for d in self.layout.drivers:
-            d.sync()
+            d._sync_frame()
 
     def wait_for_update(self):
         pass
@@ -92,24 +128,80 @@ class NoThreading(object):
         self.wait_for_update()
         self.update_colors()
 
+    def stop(self):
+        pass
+
 
 class UseThreading(NoThreading):
-    def __init__(self, layout):
+    """
+    A three stage pipeline: the animation thread draws frame N + 1 while each
+    driver's I/O thread sends frame N.  Between them, each driver's compute
+    thread turns the layout's colors into a packet.
+
+    push_to_driver() returns as soon as every driver has computed its packet,
+    because after that the layout's colors are free to change.
+    """
+
+    def __init__(self, layout, depth=DEFAULT_QUEUE_DEPTH):
         self.layout = layout
-        self.update_thread = UpdateThread(layout.drivers)
-        self.update_thread.start()
+        self.depth = depth
+        self._start()
+
+    def _start(self):
+        drivers = self.layout.drivers
+
+        def sync():
+            for d in drivers:
+                d._sync_frame()
+
+        self.barrier = threading.Barrier(len(drivers), action=sync)
+        self.pipelines = [
+            DriverPipeline(d, self.barrier, self.depth) for d in drivers]
+        self.stopped = False
 
     def update_colors(self):
-        self.update_thread.update_colors()
+        if self.stopped:
+            # The layout is being reused after cleanup().
+            self._start()
+        for p in self.pipelines:
+            p.update_colors()
+        for p in self.pipelines:
+            p.wait_for_compute()
 
     def wait_for_update(self):
-        while all([d._thread.sending() for d in self.layout.drivers]):
-            time.sleep(0.000001)
+        """Wait until every frame has been sent."""
+        for p in self.pipelines:
+            p.wait_for_compute()
+            p.wait_for_send()
+
+    def push_to_driver(self):
+        """Push the current pixel state to the driver"""
+        self.update_colors()
+
+    def stop(self):
+        """Finish sending, then stop every driver's threads.  The threads
+        are started again if the layout is pushed after this."""
+        if self.stopped:
+            return
+        for p in self.pipelines:
+            p.stop()
+        self.barrier.abort()
+        self.stopped = True
 
 
 def UpdateThreading(enable, layout):
     """
     UpdateThreading handles threading - and eventually multiprocessing - for
     Layout.
+
+    enable is either False for no threading, True for threading with the
+    default queue depth, an integer queue depth, or 'process' to run each
+    driver in its own process.
     """
-    return (UseThreading if enable else NoThreading)(layout)
+    if not enable:
+        return NoThreading(layout)
+    if enable == 'process':
+        return update_processes.UseProcesses(layout)
+    if enable is True:
+        return UseThreading(layout)
+    return UseThreading(layout, depth=enable)
@@ -0,0 +1,219 @@
+"""
+A compact, indexed file of recorded frames, which can be memory-mapped and
+played back without parsing.
+
+A frame file starts with a HEADER holding
+
+    magic              - MAGIC
+    version            - VERSION
+    flags              - COMPRESSED and/or DELTA, if any frame might use them
+    pixel_count        - the number of RGB pixels in each frame
+    fps                - the frame rate it was recorded at, or 0 if unknown
+    frame_count        - the number of frames
+    index_offset       - where the index starts, or 0 if it was never written
+    keyframe_interval  - how often a frame is not a delta
+
+followed by the frames, each a FRAME_HEADER holding
+
+    timestamp  - seconds since the first frame
+    flags      - COMPRESSED and/or DELTA
+    size       - the number of bytes of payload that follow
+
+and then its payload: the frame's RGB bytes.  If DELTA is set, each byte has
+been XORed with the same byte of the previous frame.  If COMPRESSED is set,
+the payload has then been compressed with zlib.
+
+The file ends with the index: an INDEX_ENTRY holding the offset and timestamp
+of each frame.  If the index is missing - because recording was interrupted -
+FrameFile rebuilds it by scanning the frames.
+"""
+
+import mmap, struct, zlib
+
+MAGIC = b'BPXF'
+VERSION = 1
+
+COMPRESSED, DELTA = 1, 2
+
+HEADER = struct.Struct('<4sHHIdIQI')
+FRAME_HEADER = struct.Struct('<dB3xI')
+INDEX_ENTRY = struct.Struct('<Qd')
+
+# Frames start this far into the file, leaving room for HEADER to grow.
+HEADER_SIZE = 64
+
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+
+class FrameWriter(object):
+    """Writes frames to a frame file."""
+
+    def __init__(self, filename, pixel_count, fps=0, compress=0, delta=False,
+                 keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        compress - a zlib compression level from 1 to 9, or 0 for none
+        delta - if True, store most frames as deltas from the previous frame
+        keyframe_interval - with delta, store every nth frame whole, so that
+            seeking never decodes more than n frames
+        """
+        self.pixel_count = pixel_count
+        self.fps = fps
+        self.compress = compress
+        self.delta = delta
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.flags = (COMPRESSED if compress else 0) | (DELTA if delta else 0)
+
+        self.index = []
+        self.previous = None
+        self.fp = open(filename, 'wb')
+        self._write_header(0)
+
+    def write(self, data, timestamp):
+        """Write one frame of RGB bytes, recorded timestamp seconds after the
+        first frame."""
+        data = bytes(data)
+        if len(data) != 3 * self.pixel_count:
+            raise ValueError('Frame has %d bytes, expected %d' %
+                             (len(data), 3 * self.pixel_count))
+
+        flags, payload = 0, data
+        keyframe = not len(self.index) % self.keyframe_interval
+        if self.delta and not keyframe:
+            payload = _xor(self.previous, data)
+            flags |= DELTA
+        self.previous = data
+
+        if self.compress:
+            compressed = zlib.compress(payload, self.compress)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= COMPRESSED
+
+        self.index.append((self.fp.tell(), timestamp))
+        self.fp.write(FRAME_HEADER.pack(timestamp, flags, len(payload)))
+        self.fp.write(payload)
+
+    def close(self):
+        """Write the index and finish the file."""
+        index_offset = self.fp.tell()
+        self.fp.write(b''.join(INDEX_ENTRY.pack(*i) for i in self.index))
+        self.fp.seek(0)
+        self._write_header(index_offset)
+        self.fp.close()
+
+    def _write_header(self, index_offset):
+        header = HEADER.pack(
+            MAGIC, VERSION, self.flags, self.pixel_count, self.fps,
+            len(self.index), index_offset, self.keyframe_interval)
+        self.fp.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FrameFile(object):
+    """
+    Reads a memory-mapped frame file.
+
+    Frames which are neither compressed nor deltas are returned as views into
+    the file, without being copied, so they must be released before the file
+    is closed.
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, version, self.flags, self.pixel_count, self.fps, frame_count,
+         index_offset, self.keyframe_interval) = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('%s is not a frame file' % filename)
+
+        if index_offset:
+            end = index_offset + frame_count * INDEX_ENTRY.size
+            self.index = list(INDEX_ENTRY.iter_unpack(
+                self._view[index_offset:end]))
+        else:
+            self.index = self._scan()
+
+        # The last frame decoded, to decode deltas without starting over.
+        self._current = None, None
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def duration(self):
+        """The time from the first frame to the last."""
+        return self.index[-1][1] if self.index else 0
+
+    def timestamp(self, i):
+        return self.index[i][1]
+
+    def frame(self, i):
+        """Return the RGB bytes of frame i."""
+        i = range(len(self))[i]
+        last, data = self._current
+        if last != i:
+            flags, payload = self._read(i)
+            if flags & DELTA:
+                if last != i - 1:
+                    data = self._seek(i - 1)
+                payload = _xor(data, payload)
+            self._current = i, payload
+        return self._current[1]
+
+    def close(self):
+        self._current = None, None
+        self.index = []
+        self._view.release()
+        self._mmap.close()
+
+    def _flags(self, i):
+        return FRAME_HEADER.unpack_from(self._view, self.index[i][0])[1]
+
+    def _read(self, i):
+        """Return the flags and payload of frame i, decompressed but not
+        undeltaed."""
+        offset = self.index[i][0]
+        _, flags, size = FRAME_HEADER.unpack_from(self._view, offset)
+        begin = offset + FRAME_HEADER.size
+        payload = self._view[begin:begin + size]
+        if flags & COMPRESSED:
+            payload = zlib.decompress(payload)
+        return flags, payload
+
+    def _seek(self, i):
+        """Decode frame i from the keyframe before it."""
+        key = i
+        while self._flags(key) & DELTA:
+            key -= 1
+        for j in range(key, i + 1):
+            data = self.frame(j)
+        return data
+
+    def _scan(self):
+        index, offset = [], HEADER_SIZE
+        while offset + FRAME_HEADER.size <= len(self._view):
+            timestamp, _, size = FRAME_HEADER.unpack_from(self._view, offset)
+            if offset + FRAME_HEADER.size + size > len(self._view):
+                break  # The last frame was only partly written.
+            index.append((offset, timestamp))
+            offset += FRAME_HEADER.size + size
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _xor(a, b):
+    x = int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')
+    return x.to_bytes(len(b), 'little')
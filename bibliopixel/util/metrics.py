@@ -0,0 +1,150 @@
+"""
+Rolling frame timing statistics for animations and drivers.
+
+Each BaseAnimation and DriverBase has a Metrics, which records how long each
+stage of a frame took into a rolling Histogram, and counts events like
+dropped frames.
+
+    driver.metrics.summary()   # a dictionary of statistics
+    metrics.to_json()          # statistics for every live Metrics
+    metrics.to_prometheus()    # the same, in Prometheus text format
+"""
+
+import collections, contextlib, itertools, json, time, weakref
+
+# How many of the most recent values each Histogram remembers.
+DEFAULT_SIZE = 1000
+
+QUANTILES = 0.5, 0.95, 0.99
+
+PROMETHEUS_PREFIX = 'bibliopixel'
+
+_REGISTRY = weakref.WeakSet()
+_IDS = itertools.count()
+
+
+class Histogram(object):
+    """The most recent `size` values of some measurement."""
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.values = collections.deque(maxlen=size)
+        self.count = 0
+        self.total = 0
+
+    def record(self, value):
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, p):
+        """Return the p-th percentile (0 <= p <= 100) of the recent values."""
+        return _quantile(sorted(self.values), p / 100)
+
+    def summary(self):
+        result = {'count': self.count, 'sum': self.total}
+        values = sorted(self.values)
+        if values:
+            result.update(mean=sum(values) / len(values),
+                          min=values[0], max=values[-1])
+            for q in QUANTILES:
+                result['p%d' % (100 * q)] = _quantile(values, q)
+        return result
+
+
+class Metrics(object):
+    """Timings and counters for one animation or driver."""
+
+    def __init__(self, owner, name, size=DEFAULT_SIZE):
+        """
+        owner - what kind of thing is being measured, like 'driver'
+        name - the name of the thing, usually its class name
+        """
+        self.owner = owner
+        self.name = name
+        self.id = next(_IDS)
+        self.size = size
+        self.histograms = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+        _REGISTRY.add(self)
+
+    def record(self, stage, seconds):
+        """Record the time taken by one stage of a frame."""
+        h = self.histograms.get(stage)
+        if h is None:
+            h = self.histograms[stage] = Histogram(self.size)
+        h.record(seconds)
+
+    def increment(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.time() - start)
+
+    def summary(self):
+        return {
+            'owner': self.owner,
+            'name': self.name,
+            'id': self.id,
+            'stages': {k: v.summary() for k, v in self.histograms.items()},
+            'counters': dict(self.counters),
+        }
+
+    def prometheus_samples(self):
+        """Yield (metric family, type, sample line) for Prometheus."""
+        labels = 'owner="%s",name="%s",id="%d"' % (
+            self.owner, self.name, self.id)
+        family = PROMETHEUS_PREFIX + '_stage_seconds'
+
+        for stage, h in self.histograms.items():
+            summary = h.summary()
+            stage_labels = '%s,stage="%s"' % (labels, stage)
+            for q in QUANTILES:
+                if summary['count']:
+                    yield family, 'summary', '%s{%s,quantile="%s"} %s' % (
+                        family, stage_labels, q, summary['p%d' % (100 * q)])
+            yield family, 'summary', '%s_sum{%s} %s' % (
+                family, stage_labels, summary['sum'])
+            yield family, 'summary', '%s_count{%s} %s' % (
+                family, stage_labels, summary['count'])
+
+        for counter, value in self.counters.items():
+            name = '%s_%s_total' % (PROMETHEUS_PREFIX, counter)
+            yield name, 'counter', '%s{%s} %s' % (name, labels, value)
+
+
+def all_metrics():
+    """Return every live Metrics, in order of creation."""
+    return sorted(_REGISTRY, key=lambda m: m.id)
+
+
+def summaries():
+    return [m.summary() for m in all_metrics()]
+
+
+def to_json(**kwds):
+    return json.dumps(summaries(), **kwds)
+
+
+def to_prometheus():
+    families = collections.OrderedDict()
+    for m in all_metrics():
+        for family, kind, line in m.prometheus_samples():
+            families.setdefault((family, kind), []).append(line)
+
+    lines = []
+    for (family, kind), samples in families.items():
+        lines.append('# TYPE %s %s' % (family, kind))
+        lines.extend(samples)
+    return ''.join(line + '\n' for line in lines)
+
+
+def _quantile(values, q):
+    """Return the q-th quantile (0 <= q <= 1) of a sorted list."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * q))]
@@ -2,6 +2,8 @@ import math
 
 
 def generate_header(cmd, size):
+    if not 0 <= size <= 0xFFFF:
+        raise ValueError('Size %s does not fit in a 16-bit header' % size)
     packet = bytearray()
     packet.append(cmd)
     packet.append(size & 0xFF)
@@ -4,12 +4,13 @@ from setuptools.command.install_scripts import install_scripts
 from setuptools.command.install import install as _install
 from os.path import join as pjoin, splitext, split as psplit
 import sys
+import glob
 import os
 
 
 INSTALLATION_ERROR = """INSTALLATION ERROR!
 
-BiblioPixel v3 requires Python 3.4+ but
+BiblioPixel v3 requires Python 3.5+ but
 you are using version {0.major}.{0.minor}.{0.micro}
 
 If you absolutely require using Python 2,
@@ -18,7 +19,7 @@ please install BiblioPixel v2.x using:
     > pip install "bibliopixel<3.0"
 
 However we highly recommend using the latest BiblioPixel
-(v3+) with Python 3.4+.
+(v3+) with Python 3.5+.
 """
 
 
@@ -63,7 +64,7 @@ class do_install_scripts(install_scripts):
                 fobj.write(bat_contents)
 
 
-if sys.version_info.major != 3:
+if sys.version_info < (3, 5):
     print(INSTALLATION_ERROR.format(sys.version_info))
     sys.exit(1)
 
@@ -86,7 +87,33 @@ class RunTests(TestCommand):
 
 
 class RunBenchmark(RunTests):
+    """
+    Run the benchmarks, and fail if any is more than BENCHMARK_TOLERANCE
+    slower than the last baseline saved for this kind of machine.
+
+    If there is no baseline yet, the results are saved as the baseline.
+    To save a new baseline later:
+
+        pytest benchmark --benchmark-storage=benchmark/baselines \\
+            --benchmark-autosave
+    """
     DIRECTORY = 'benchmark'
+    BENCHMARK_STORAGE = 'benchmark/baselines'
+    BENCHMARK_TOLERANCE = '25%'
+
+    def finalize_options(self):
+        super().finalize_options()
+        from pytest_benchmark.utils import get_machine_id
+
+        baselines = os.path.join(self.BENCHMARK_STORAGE, get_machine_id())
+        self.test_args.append('--benchmark-storage=' + self.BENCHMARK_STORAGE)
+        if glob.glob(os.path.join(baselines, '*.json')):
+            self.test_args += [
+                '--benchmark-compare',
+                '--benchmark-compare-fail=median:' + self.BENCHMARK_TOLERANCE,
+            ]
+        else:
+            self.test_args.append('--benchmark-autosave')
 
 
 class RunCoverage(RunTests):
@@ -132,7 +159,6 @@ setup(
     classifiers=[
         'Development Status :: 4 - Beta',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
     ],
     tests_require=['pytest'],
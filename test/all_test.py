@@ -23,13 +23,21 @@ from bibliopixel.layout import geometry
 from bibliopixel.drivers import (
     SPI,
     # SimPixel,
+    artnet,
+    async_network_receiver,
+    dmx,
     driver_base,
     dummy_driver,
+    e131,
     hue,
     network,
     network_receiver,
     network_udp,
+    opc,
+    opc_receiver,
+    recorder,
     serial,
+    shared_memory,
     # timedata_visualizer,
 )
 
@@ -0,0 +1,217 @@
+import socket, unittest
+
+from bibliopixel.animation import dmx_receiver
+from bibliopixel.drivers import artnet, e131
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.layout import Strip
+
+
+class DMXTest(unittest.TestCase):
+    def setUp(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(2)
+        self.port = self.sock.getsockname()[1]
+
+    def tearDown(self):
+        self.sock.close()
+
+    def send(self, driver, frames=1):
+        strip = Strip(driver)
+        for frame in range(frames):
+            for i in range(strip.numLEDs):
+                strip.set(i, (i % 256, 1, 2))
+            strip.push_to_driver()
+        driver.cleanup()
+        return bytes(x for i in range(strip.numLEDs) for x in (i % 256, 1, 2))
+
+    def receive(self, count):
+        return [self.sock.recv(1024) for i in range(count)]
+
+    def test_e131(self):
+        driver = e131.E131(num=400, host='127.0.0.1', port=self.port,
+                           universe=7, sync_universe=64000)
+        self.assertEqual(len(driver._universes), 3)
+        data = self.send(driver, 2)
+        packets = self.receive(8)
+
+        expected = [(7, 1), (8, 1), (9, 1), ('sync', 1),
+                    (7, 2), (8, 2), (9, 2), ('sync', 2)]
+        for packet, ex in zip(packets, expected):
+            if ex[0] == 'sync':
+                self.assertEqual(len(packet), e131.SYNC_PACKET.size)
+                fields = e131.SYNC_PACKET.unpack(packet)
+                self.assertEqual(fields[-3:], (ex[1], 64000, 0))
+                continue
+
+            fields = e131.DATA_HEADER.unpack_from(packet)
+            self.assertEqual(fields[2], e131.ACN_PACKET_IDENTIFIER)
+            self.assertEqual(fields[3] & 0xFFF, len(packet) - 16)
+            self.assertEqual(fields[8:13], (
+                b'BiblioPixel' + bytes(53), 100, 64000, ex[1], 0))
+            self.assertEqual(fields[13], ex[0])
+            size = len(packet) - e131.DATA_HEADER.size
+            self.assertEqual(fields[19], size + 1)
+
+        payload = b''.join(p[e131.DATA_HEADER.size:] for p in packets[:3])
+        self.assertEqual(payload, data)
+
+    def test_multicast_address(self):
+        self.assertEqual(e131.multicast_address(1), '239.255.0.1')
+        self.assertEqual(e131.multicast_address(0x1234), '239.255.18.52')
+
+    def test_artnet(self):
+        driver = artnet.ArtNet(num=171, host='127.0.0.1', port=self.port,
+                               universe=0x123, sync=True)
+        data = self.send(driver)
+        packets = self.receive(3)
+
+        headers = [artnet.DMX_HEADER.unpack_from(p) for p in packets[:2]]
+        self.assertEqual(headers[0], (
+            artnet.ID, artnet.OP_DMX, 0, 14, 1, 0, 0x23, 1, 1, 254))
+        self.assertEqual(headers[1], (
+            artnet.ID, artnet.OP_DMX, 0, 14, 1, 0, 0x24, 1, 0, 4))
+
+        size = artnet.DMX_HEADER.size
+        self.assertEqual(packets[0][size:] + packets[1][size:], data + b'\0')
+        self.assertEqual(packets[2], b'Art-Net\0\0\x52\0\x0e\0\0')
+
+    def test_artnet_sequence(self):
+        driver = artnet.ArtNet(num=1)
+        self.assertEqual(driver._next_sequence(0), 1)
+        self.assertEqual(driver._next_sequence(255), 1)
+        driver.cleanup()
+
+    def test_unchanged_frames(self):
+        driver = e131.E131(num=10, host='127.0.0.1', port=self.port,
+                           keepalive=0)
+        strip = Strip(driver)
+        strip.fill((1, 2, 3))
+        for i in range(5):
+            strip.push_to_driver()
+        packets = self.receive(5)
+        driver.cleanup()
+
+        sequences = [e131.DATA_HEADER.unpack_from(p)[11] for p in packets]
+        self.assertEqual(sequences, [1, 2, 3, 4, 5])
+        for p in packets:
+            self.assertEqual(p[e131.DATA_HEADER.size:], b'\1\2\3' * 10)
+
+    def test_keepalive(self):
+        driver = e131.E131(num=10, host='127.0.0.1', port=self.port)
+        strip = Strip(driver)
+        strip.fill((1, 2, 3))
+        strip.push_to_driver()
+        strip.push_to_driver()
+        self.assertEqual(driver.metrics.counters['skipped_frames'], 1)
+
+        driver._last_frame -= 2
+        strip.push_to_driver()
+        packets = self.receive(2)
+        driver.cleanup()
+
+        sequences = [e131.DATA_HEADER.unpack_from(p)[11] for p in packets]
+        self.assertEqual(sequences, [1, 2])
+        self.assertEqual(packets[0][e131.DATA_HEADER.size:],
+                         packets[1][e131.DATA_HEADER.size:])
+
+    def test_pixels_per_universe(self):
+        driver = e131.E131(num=100, host='127.0.0.1', pixels_per_universe=30)
+        self.assertEqual([u[1:3] for u in driver._universes],
+                         [(0, 90), (90, 180), (180, 270), (270, 300)])
+        driver.cleanup()
+
+        with self.assertRaises(ValueError):
+            e131.E131(num=100, pixels_per_universe=171)
+
+
+class DMXReceiverTest(unittest.TestCase):
+    def receive(self, receiver, driver):
+        receiver.start_receiver()
+        try:
+            strip = Strip(driver)
+            strip.fill((0, 2, 3))
+            strip.set(strip.numLEDs - 1, (4, 5, 6))
+            strip.push_to_driver()
+            driver.cleanup()
+
+            self.assertTrue(receiver._hold_for_data.wait(2))
+            receiver.step()
+        finally:
+            receiver.stop()
+        return receiver.layout
+
+    def test_e131(self):
+        receiver = dmx_receiver.E131Receiver(
+            Strip(DriverBase(num=400)), interface='127.0.0.1', port=0,
+            multicast=False)
+        driver = e131.E131(num=400, host='127.0.0.1',
+                           port=receiver.address[1])
+        layout = self.receive(receiver, driver)
+        self.assertEqual(layout.get(0), (0, 2, 3))
+        self.assertEqual(layout.get(399), (4, 5, 6))
+
+    def test_artnet(self):
+        receiver = dmx_receiver.ArtNetReceiver(
+            Strip(DriverBase(num=200)), universe=5, interface='127.0.0.1',
+            port=0)
+        driver = artnet.ArtNet(num=200, host='127.0.0.1', universe=5,
+                               port=receiver.address[1], sync=True)
+        layout = self.receive(receiver, driver)
+        self.assertEqual(layout.get(199), (4, 5, 6))
+
+    def test_sync(self):
+        receiver = dmx_receiver.E131Receiver(
+            Strip(DriverBase(num=200)), interface='127.0.0.1', port=0,
+            multicast=False)
+        receiver._receive_universe(1, b'\1' * 510, True)
+        receiver._receive_universe(2, b'\2' * 90, True)
+        self.assertFalse(receiver._hold_for_data.is_set())
+
+        receiver._present()
+        self.assertTrue(receiver._hold_for_data.is_set())
+        receiver.step()
+        self.assertEqual(receiver.layout.get(0), (1, 1, 1))
+        self.assertEqual(receiver.layout.get(199), (2, 2, 2))
+
+        receiver._receive_universe(2, b'\3' * 90, False)
+        receiver._receive_universe(9, b'\4' * 90, False)
+        receiver._receive_universe(1, b'\5' * 510, False)
+        receiver.step()
+        self.assertEqual(receiver.layout.get(0), (5, 5, 5))
+        self.assertEqual(receiver.layout.get(199), (3, 3, 3))
+        receiver.thread_cleanup()
+
+    def test_sync_packets(self):
+        receiver = dmx_receiver.E131Receiver(
+            Strip(DriverBase(num=10)), interface='127.0.0.1', port=0,
+            multicast=False, sync_universe=7)
+        senders = [e131.E131(num=10, sync_universe=u) for u in (7, 8)]
+        sync, other = (s._sync_packet[0] for s in senders)
+        for s in senders:
+            s.cleanup()
+        self.assertEqual(receiver._parse(sync), dmx_receiver.SYNC)
+
+        # The wrong sync universe.
+        self.assertIsNone(receiver._parse(other))
+
+        # Other extended packets, like universe discovery.
+        discovery = bytearray(sync)
+        discovery[40:44] = (2).to_bytes(4, 'big')
+        self.assertIsNone(receiver._parse(discovery))
+        self.assertIsNone(receiver._parse(sync[:-3]))
+        receiver.thread_cleanup()
+
+    def test_sync_from_data(self):
+        receiver = dmx_receiver.E131Receiver(
+            Strip(DriverBase(num=10)), interface='127.0.0.1', port=0,
+            multicast=False)
+        sender = e131.E131(num=10, sync_universe=9)
+        sync = sender._sync_packet[0]
+        data = sender._make_header(1, 30) + bytes(30)
+        sender.cleanup()
+        self.assertIsNone(receiver._parse(sync))
+
+        self.assertEqual(receiver._parse(data), (1, bytes(30), True))
+        self.assertEqual(receiver._parse(sync), dmx_receiver.SYNC)
+        receiver.thread_cleanup()
@@ -1,6 +1,7 @@
 import unittest
+from unittest import mock
 
-from bibliopixel import gamma
+from bibliopixel import data_maker, gamma
 from bibliopixel.drivers.driver_base import DriverBase, ChannelOrder
 from bibliopixel.drivers.SPI import SPI, SPI_INTERFACES
 
@@ -47,10 +48,73 @@ class DriverTest(unittest.TestCase):
         expected = [128, 128, 128, 128, 128, 132, 128, 128, 151, 128, 128, 190]
         self.do_test(driver, expected)
 
+    def test_brightness(self):
+        driver = DriverBase(num=4, c_order=ChannelOrder.GRB)
+        driver.set_brightness(128)
+        driver.update_colors()
+        expected = [0, 0, 0, 4, 0, 32, 8, 1, 64, 12, 1, 96]
+        self.do_test(driver, expected)
+
+        driver.set_brightness(255)
+        driver.update_colors()
+        expected = [0, 0, 0, 8, 1, 64, 16, 2, 128, 24, 3, 192]
+        self.do_test(driver, expected)
+
+    def test_float_colors(self):
+        driver = DriverBase(num=4, c_order=ChannelOrder.GRB)
+        colors = [tuple(c + 0.5 for c in color) for color in self.COLORS]
+        driver.set_colors(colors, 0)
+        driver._render()
+        expected = [0, 0, 0, 8, 1, 64, 16, 2, 128, 24, 3, 192]
+        self.assertEqual(list(driver._buf), expected)
+
+    def test_out_of_range_colors(self):
+        driver = DriverBase(num=2)
+        driver.set_colors([(-10, 0, 300), (1, 2, 3)], 0)
+        driver._render()
+        self.assertEqual(list(driver._buf), [0, 0, 255, 1, 2, 3])
+
+    @unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+    def test_numpy(self):
+        for integer in False, True:
+            maker = data_maker.Maker(use_numpy=True, integer=integer)
+            colors = maker.color_list(len(self.COLORS))
+            colors[:] = self.COLORS
+
+            driver = DriverBase(num=4, gamma=gamma.LPD8806, c_order='grb')
+            driver.set_colors(colors, 0)
+            driver._render()
+            expected = [
+                128, 128, 128, 128, 128, 132, 128, 128, 151, 128, 128, 190]
+            self.assertEqual(list(driver._buf), expected)
+
     def test_apa102(self):
         driver = SPI(ledtype='APA102', num=4, **self.SPD)
-        expected = [0, 0, 0, 0, 0, 8, 0, 0, 46, 0, 1, 125]
-        self.do_test(driver, expected)
+        driver.set_colors(self.COLORS, 0)
+        driver.update_colors()
+        expected = ([0, 0, 0, 0] +
+                    [255, 0, 0, 0, 255, 0, 0, 8, 255, 0, 0, 46, 255, 0, 1, 125] +
+                    [0] * 7)
+        self.assertEqual(list(driver._packet), expected)
+
+        driver.set_brightness(128)
+        driver.update_colors()
+        expected[4:20:4] = [0xF0] * 4
+        self.assertEqual(list(driver._packet), expected)
+
+    @unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+    def test_apa102_numpy(self):
+        maker = data_maker.Maker(use_numpy=True, integer=True)
+        colors = maker.color_list(len(self.COLORS))
+        colors[:] = self.COLORS
+
+        driver = SPI(ledtype='APA102', num=4, c_order='grb', **self.SPD)
+        driver.set_colors(colors, 0)
+        driver.update_colors()
+        expected = ([0, 0, 0, 0] +
+                    [255, 0, 0, 0, 255, 0, 0, 8, 255, 0, 0, 46, 255, 1, 0, 125] +
+                    [0] * 7)
+        self.assertEqual(list(driver._packet), expected)
 
     def test_lpd8806(self):
         driver = SPI(ledtype='LPD8806', num=4, **self.SPD)
@@ -58,6 +122,34 @@ class DriverTest(unittest.TestCase):
             128, 128, 128, 128, 128, 132, 128, 128, 151, 128, 128, 190, 0]
         self.do_test(driver, expected)
 
+    def test_ws281x(self):
+        def encode(byte):
+            # The original bit-by-bit encoding.
+            tmp = 0
+            for i in range(8):
+                tmp |= (0b100 | (0b10 if (byte & 1 << i) > 0 else 0)) << (i * 3)
+            return [tmp >> 16 & 0xff, tmp >> 8 & 0xff, tmp & 0xff]
+
+        for use_numpy in False, True:
+            if use_numpy and not data_maker.numpy:
+                continue
+            with mock.patch('bibliopixel.drivers.SPI.WS281X.numpy',
+                            use_numpy and data_maker.numpy):
+                driver = SPI(ledtype='WS2812', num=4, **self.SPD)
+                driver.set_colors(self.COLORS, 0)
+                driver.update_colors()
+
+            expected = [0]
+            for byte in driver._buf:
+                expected.extend(encode(byte))
+            self.assertEqual(list(driver._packet), expected)
+
+    def test_ws281x_max_pixels(self):
+        with self.assertRaises(ValueError):
+            SPI(ledtype='WS2812', num=456, **self.SPD)
+        driver = SPI(ledtype='WS2812', num=1000, max_pixels=0, **self.SPD)
+        self.assertEqual(len(driver._packet), 9001)
+
     def test_ws2801(self):
         driver = SPI(ledtype='WS2801', num=4, **self.SPD)
         expected = [0, 0, 0, 0, 0, 8, 0, 0, 45, 0, 0, 125]
@@ -0,0 +1,115 @@
+import os, tempfile, time, unittest
+
+from bibliopixel.animation.replay import Replay
+from bibliopixel.animation.runner import Runner
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.drivers.recorder import Recorder
+from bibliopixel.layout import Strip
+from bibliopixel.util import frame_file
+
+FRAMES = [bytes((i, i + 1, 7) * 10) for i in range(0, 200, 2)]
+
+
+class FrameFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'frames.bpx')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, close=True, **kwds):
+        writer = frame_file.FrameWriter(self.filename, 10, **kwds)
+        for i, f in enumerate(FRAMES):
+            writer.write(f, i / 10)
+        if close:
+            writer.close()
+        else:
+            writer.fp.flush()
+        return writer
+
+    def check(self):
+        with frame_file.FrameFile(self.filename) as f:
+            self.assertEqual(len(f), len(FRAMES))
+            self.assertEqual(f.pixel_count, 10)
+            self.assertAlmostEqual(f.duration, 9.9)
+            self.assertAlmostEqual(f.timestamp(3), 0.3)
+            for i in 0, 1, 2, 50, 99, 3, 2, -1:
+                self.assertEqual(bytes(f.frame(i)), FRAMES[i])
+
+    def test_plain(self):
+        self.write(fps=30)
+        self.check()
+        with frame_file.FrameFile(self.filename) as f:
+            self.assertEqual(f.fps, 30)
+            frame = f.frame(1)
+            self.assertIsInstance(frame, memoryview)
+            frame.release()
+
+    def test_delta(self):
+        self.write()
+        plain_size = os.path.getsize(self.filename)
+
+        self.write(delta=True, compress=9, keyframe_interval=16)
+        self.check()
+        self.assertLess(os.path.getsize(self.filename), 0.8 * plain_size)
+
+    def test_unfinished(self):
+        writer = self.write(close=False, delta=True)
+        self.check()
+        writer.fp.close()
+
+    def test_bad_file(self):
+        with open(self.filename, 'wb') as fp:
+            fp.write(bytes(100))
+        with self.assertRaises(ValueError):
+            frame_file.FrameFile(self.filename)
+
+    def test_record_and_replay(self):
+        driver = Recorder(num=10, filename=self.filename, fps=20, delta=True,
+                          compress=1)
+        strip = Strip(driver)
+        for i in range(5):
+            strip.fill((i, 2 * i, 3 * i))
+            strip.push_to_driver()
+        driver.cleanup()
+
+        layout = Strip(DriverBase(num=10))
+        replay = Replay(layout, filename=self.filename)
+        self.assertEqual(replay.internal_delay, 0.05)
+        for i in range(5):
+            replay.step()
+            self.assertEqual(layout.get(9), (i, 2 * i, 3 * i))
+        self.assertTrue(replay.completed)
+        self.assertEqual(replay.index, 0)
+        replay.file.close()
+
+    def test_record_unchanged_frames(self):
+        driver = Recorder(num=10, filename=self.filename)
+        strip = Strip(driver)
+        strip.fill((1, 2, 3))
+        for i in range(11):
+            strip.push_to_driver()
+        driver.cleanup()
+
+        with frame_file.FrameFile(self.filename) as f:
+            self.assertEqual(len(f), 11)
+            self.assertEqual(bytes(f.frame(10)), b'\1\2\3' * 10)
+
+    def test_replay_timestamps(self):
+        with frame_file.FrameWriter(self.filename, 10) as writer:
+            for i, timestamp in enumerate((0, 0.1, 0.3)):
+                writer.write(FRAMES[i], timestamp)
+
+        replay = Replay(Strip(DriverBase(num=10)), filename=self.filename)
+        replay.set_runner(Runner())
+        self.assertTrue(replay.free_run)
+
+        start = time.time()
+        for i in range(3):
+            replay.step()
+        self.assertGreaterEqual(time.time() - start, 0.29)
+        self.assertTrue(replay.completed)
+
+        replay.cleanup()
+        self.assertTrue(replay.file._mmap.closed)
@@ -0,0 +1,126 @@
+import unittest
+from unittest import mock
+
+from bibliopixel.drivers import hue
+from bibliopixel.layout import Strip
+
+
+class StubLight(object):
+    def __init__(self, light_id):
+        self.light_id = light_id
+        self.name = 'light %d' % light_id
+
+
+class StubBridge(object):
+    LIGHTS = 4
+
+    def __init__(self, ip):
+        self.commands = []
+        self.fail = False
+
+    def connect(self):
+        pass
+
+    def get_light_objects(self, mode):
+        lights = [StubLight(i + 1) for i in range(self.LIGHTS)]
+        if mode == 'name':
+            return {light.name: light for light in lights}
+        return {light.light_id: light for light in lights}
+
+    def set_light(self, light_id, cmd):
+        self.request('light', light_id, cmd)
+
+    def set_group(self, group_id, cmd):
+        self.request('group', group_id, cmd)
+
+    def request(self, kind, id, cmd):
+        if self.fail:
+            raise IOError('Bridge is busy')
+        self.commands.append((kind, id, cmd.get('hue')))
+
+
+@mock.patch.object(hue, 'Bridge', StubBridge)
+class AsyncHueTest(unittest.TestCase):
+    def make(self, num=4, **kwds):
+        self.driver = hue.AsyncHue(num, '127.0.0.1', light_rate=1000,
+                                   group_rate=1000, **kwds)
+        self.bridge = self.driver._bridge
+        return Strip(self.driver)
+
+    def commands(self, strip):
+        strip.push_to_driver()
+        result = sorted(self.bridge.commands)
+        self.bridge.commands.clear()
+        return result
+
+    def test_changes(self):
+        strip = self.make()
+        strip.set(1, (255, 0, 0))
+        self.assertEqual(self.commands(strip), [('light', 1, None),
+                                                ('light', 2, 0),
+                                                ('light', 3, None),
+                                                ('light', 4, None)])
+        strip.set(3, (0, 0, 255))
+        self.assertEqual(self.commands(strip), [('light', 4, 43690)])
+
+        # Nothing changed
+        strip.set(3, (0, 0, 255))
+        self.assertEqual(self.commands(strip), [])
+        self.driver.cleanup()
+
+    def test_groups(self):
+        strip = self.make()
+        self.assertEqual(self.driver._groups, {0: [1, 2, 3, 4]})
+        strip.fill((0, 255, 0))
+        self.assertEqual(self.commands(strip), [('group', 0, 21845)])
+
+        strip.fill((0, 0, 255))
+        strip.set(0, (255, 0, 0))
+        self.assertEqual(len(self.commands(strip)), 4)
+        self.driver.cleanup()
+
+    def test_named_groups(self):
+        strip = self.make(2, nameMap=['light 3', 'light 4'],
+                          groups={5: [3, 4]})
+        self.assertEqual(self.driver._groups, {5: [3, 4]})
+        strip.fill((0, 255, 0))
+        # Too few lights changed to use a group.
+        self.assertEqual(self.commands(strip), [('light', 3, 21845),
+                                                ('light', 4, 21845)])
+        self.driver.cleanup()
+
+        with self.assertRaises(ValueError):
+            self.make(2, nameMap=['light 3', 'light 4'], groups={5: [1, 2]})
+
+    def test_retry(self):
+        strip = self.make()
+        strip.fill((255, 0, 0))
+        self.commands(strip)
+
+        self.bridge.fail = True
+        strip.set(2, (0, 255, 0))
+        self.assertEqual(self.commands(strip), [])
+        # Failures wait for the compute thread to pick them up.
+        self.assertEqual(self.driver._failures.qsize(), 1)
+        self.assertEqual(self.driver._last_colors[2], (0, 255, 0))
+
+        self.bridge.fail = False
+        strip.set(0, (0, 0, 255))
+        self.assertEqual(self.commands(strip), [('light', 1, 43690),
+                                                ('light', 3, 21845)])
+        self.driver.cleanup()
+
+    def test_retry_unchanged(self):
+        strip = self.make()
+        strip.fill((255, 0, 0))
+        self.commands(strip)
+
+        self.bridge.fail = True
+        strip.set(2, (0, 255, 0))
+        self.assertEqual(self.commands(strip), [])
+
+        # Nothing changed in this frame, but the failed light is sent again.
+        self.bridge.fail = False
+        self.assertEqual(self.commands(strip), [('light', 3, 21845)])
+        self.assertEqual(self.commands(strip), [])
+        self.driver.cleanup()
@@ -35,3 +35,13 @@ class MatrixTest(unittest.TestCase):
         self.assertEqual(m.get(1, 1), 4)
         self.assertEqual(m.get(2, 2), 8)
         self.assertEqual(m.get(2, 3), 9)
+
+    def test_flatten(self):
+        coord_map = [[0, 1, 2], [5, 4]]
+        flat = matrix.flatten_matrix(coord_map, 3, 2)
+        self.assertEqual(list(flat), [0, 1, 2, 5, 4, -1])
+
+    def test_fan_out(self):
+        coord_map = [[0, 1, 2, 3], [7, 6, 5, 4]]
+        fan_out = matrix.fan_out_matrix(coord_map, 2, 1, 2, 2)
+        self.assertEqual(fan_out, [(0, 1, 7, 6), (2, 3, 5, 4)])
@@ -0,0 +1,180 @@
+import unittest
+
+from bibliopixel import data_maker
+from bibliopixel.layout import Cube, Strip
+from bibliopixel.drivers.driver_base import DriverBase
+
+
+WHITE = (255, 255, 255)
+
+
+class BaseLayoutTest(unittest.TestCase):
+
+    def make_strip(self, num=8, **kwds):
+        return Strip(DriverBase(num=num), maker=self.maker, **kwds)
+
+    def colors(self, strip):
+        return [tuple(int(i) for i in c) for c in strip._colors]
+
+    def test_set_get(self):
+        strip = self.make_strip()
+        strip.set(3, (1, 2, 3))
+        strip.set(8, (1, 2, 3))  # Out of bounds is ignored.
+        self.assertEqual(tuple(strip.get(3)), (1, 2, 3))
+        self.assertEqual(tuple(strip.get(8)), (0, 0, 0))
+
+    def test_fill(self):
+        strip = self.make_strip()
+        strip.fill((1, 2, 3), 2, 4)
+        expected = [(0, 0, 0)] * 2 + [(1, 2, 3)] * 3 + [(0, 0, 0)] * 3
+        self.assertEqual(self.colors(strip), expected)
+
+        strip.fill((4, 5, 6))
+        self.assertEqual(self.colors(strip), [(4, 5, 6)] * 8)
+
+    def test_all_off(self):
+        strip = self.make_strip()
+        strip.fill((4, 5, 6))
+        strip.all_off()
+        self.assertEqual(self.colors(strip), [(0, 0, 0)] * 8)
+
+    def test_set_colors(self):
+        strip = self.make_strip(num=2)
+        strip.setBuffer([1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.colors(strip), [(1, 2, 3), (4, 5, 6)])
+        with self.assertRaises(IOError):
+            strip.set_colors([(0, 0, 0)])
+
+    def test_set_indices(self):
+        strip = self.make_strip(num=4)
+        strip.set_indices([3, 0, 9, -1], [(1, 2, 3), (4, 5, 6), WHITE, WHITE])
+        expected = [(4, 5, 6), (0, 0, 0), (0, 0, 0), (1, 2, 3)]
+        self.assertEqual(self.colors(strip), expected)
+
+        strip.set_indices([1, 2], bytearray([7, 8, 9, 10, 11, 12]))
+        expected = [(4, 5, 6), (7, 8, 9), (10, 11, 12), (1, 2, 3)]
+        self.assertEqual(self.colors(strip), expected)
+
+        with self.assertRaises(ValueError):
+            strip.set_indices([1, 2], [WHITE])
+
+    def test_set_many(self):
+        strip = self.make_strip(num=4)
+        strip.set_many([(1, 2, 3), (4, 5, 6), WHITE], 2)
+        expected = [(0, 0, 0), (0, 0, 0), (1, 2, 3), (4, 5, 6)]
+        self.assertEqual(self.colors(strip), expected)
+
+        strip.set_many([7, 8, 9, 10, 11, 12], -1)
+        expected = [(10, 11, 12), (0, 0, 0), (1, 2, 3), (4, 5, 6)]
+        self.assertEqual(self.colors(strip), expected)
+
+        strip.set_many(memoryview(bytes(range(1, 7))), 1)
+        expected = [(10, 11, 12), (1, 2, 3), (4, 5, 6), (4, 5, 6)]
+        self.assertEqual(self.colors(strip), expected)
+
+    def test_cube_blit(self):
+        cube = Cube(DriverBase(num=8), 2, 2, 2, maker=self.maker)
+        cube.blit([(1, 1, 1), (2, 2, 2), (3, 3, 3), (4, 4, 4)], 1, 0, 1, dx=2)
+        self.assertEqual(tuple(cube.get(1, 0, 1)), (1, 1, 1))
+        self.assertEqual(tuple(cube.get(1, 1, 1)), (3, 3, 3))
+        self.assertEqual(sum(1 for c in self.colors(cube) if c[0]), 2)
+
+        cube.blit([(i, i, i) for i in range(8)])
+        self.assertEqual(tuple(cube.get(1, 0, 0)), (1, 1, 1))
+        self.assertEqual(tuple(cube.get(0, 1, 1)), (6, 6, 6))
+
+        # Clipped on every side.
+        cube.blit([(9, 9, 9)] * 27, -1, -1, -1, dx=3, dy=3)
+        self.assertEqual(set(self.colors(cube)), {(9, 9, 9)})
+
+        # A flat RGB buffer, clipped.
+        cube.blit(bytes(range(24)), 1, 0, 0, dx=2, dy=2)
+        self.assertEqual(tuple(cube.get(1, 1, 1)), (18, 19, 20))
+        self.assertEqual(tuple(cube.get(0, 1, 1)), (9, 9, 9))
+
+    def test_render(self):
+        strip = self.make_strip(num=2)
+        strip.set(1, (1, 2, 3))
+        strip.drivers[0]._render()
+        self.assertEqual(list(strip.drivers[0]._buf), [0, 0, 0, 1, 2, 3])
+
+
+class CountingDriver(DriverBase):
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+        self.rendered = []
+
+    def _compute_packet(self):
+        self.rendered.append(self._dirty)
+        self._render()
+
+
+class DirtyTest(unittest.TestCase):
+    def make_strip(self):
+        drivers = [CountingDriver(num=4), CountingDriver(num=4)]
+        return Strip(drivers), drivers
+
+    def test_unchanged(self):
+        strip, (d1, d2) = self.make_strip()
+        strip.push_to_driver()
+        strip.push_to_driver()
+        self.assertEqual(d1.rendered, [None])
+        self.assertEqual(d2.rendered, [None])
+
+    def test_sparse(self):
+        strip, (d1, d2) = self.make_strip()
+        strip.push_to_driver()
+        strip.set(5, (1, 2, 3))
+        strip.set(6, (1, 2, 3))
+        strip.push_to_driver()
+        self.assertEqual(d1.rendered, [None])
+        self.assertEqual(d2.rendered, [None, (1, 3)])
+        self.assertEqual(list(d2._buf), [0, 0, 0, 1, 2, 3, 1, 2, 3, 0, 0, 0])
+
+    def test_fill(self):
+        strip, (d1, d2) = self.make_strip()
+        strip.push_to_driver()
+        strip.fill((1, 2, 3), 2, 4)
+        strip.push_to_driver()
+        self.assertEqual(d1.rendered, [None, (2, 4)])
+        self.assertEqual(d2.rendered, [None, (0, 1)])
+
+        strip.all_off()
+        strip.push_to_driver()
+        self.assertEqual(d1.rendered, [None, (2, 4), (0, 4)])
+        self.assertEqual(d2.rendered, [None, (0, 1), (0, 4)])
+
+    def test_brightness(self):
+        strip, (d1, d2) = self.make_strip()
+        strip.push_to_driver()
+        strip.set_brightness(128)
+        strip.push_to_driver()
+        self.assertEqual(d1.rendered, [None, None])
+        self.assertEqual(d2.rendered, [None, None])
+
+
+class LayoutTest(BaseLayoutTest):
+    maker = data_maker.Maker()
+
+
+class SharedLayoutTest(BaseLayoutTest):
+    maker = data_maker.Maker(shared_memory=True)
+
+
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class NumpyLayoutTest(BaseLayoutTest):
+    maker = data_maker.numpy and data_maker.Maker(use_numpy=True)
+
+
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class NumpyIntegerLayoutTest(BaseLayoutTest):
+    maker = data_maker.numpy and data_maker.Maker(use_numpy=True, integer=True)
+
+
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class SharedNumpyLayoutTest(BaseLayoutTest):
+    maker = data_maker.numpy and data_maker.Maker(
+        use_numpy=True, shared_memory=True)
+
+
+del BaseLayoutTest  # http://stackoverflow.com/a/22836015/43839
@@ -38,14 +38,14 @@ class BaseMatrixTest(unittest.TestCase):
     def test_draw_circle2(self):
         matrix = self.make_matrix(width=8, height=8)
         matrix.drawCircle(4, 4, 15, WHITE)
-        expected = [3, 13, 17, 31]  # Why isn't this empty!?
+        expected = []  # Negative coordinates are clipped, not wrapped.
         self.assert_changed(matrix, expected)
 
     def test_draw_circle3(self):
         matrix = self.make_matrix(width=4, height=12)
         matrix.drawCircle(4, 6, 20, WHITE)
-        expected = [0]
-        self.assert_changed(matrix, expected)  # Huh?
+        expected = []
+        self.assert_changed(matrix, expected)
 
     def test_fill_circle1(self):
         matrix = self.make_matrix(width=16, height=16)
@@ -162,6 +162,43 @@ class BaseMatrixTest(unittest.TestCase):
         expected = []
         self.assert_changed(matrix, expected)
 
+    def test_blit(self):
+        matrix = self.make_matrix(width=4, height=4)
+        matrix.blit([WHITE] * 4, 3, 1, width=2)
+        self.assert_changed(matrix, [4, 11])
+
+        matrix = self.make_matrix(width=4, height=4)
+        matrix.blit([255] * 48)
+        self.assert_unchanged(matrix, [])
+
+        matrix = self.make_matrix(width=4, height=4)
+        matrix.blit(bytearray([255] * 12), 1, 2, width=2)
+        self.assert_changed(matrix, [9, 10, 13, 14])
+
+    def test_blit_scaled(self):
+        matrix = self.make_matrix(width=4, height=4, pixelSize=(2, 2))
+        matrix.blit([WHITE], 1, 0, width=1)
+        self.assert_changed(matrix, [2, 3, 4, 5])
+
+    def test_set_get_clipped(self):
+        matrix = self.make_matrix(width=4, height=4)
+        matrix.set(-1, 0, WHITE)
+        matrix.set(0, -1, WHITE)
+        matrix.set(4, 0, WHITE)
+        self.assert_changed(matrix, [])
+        self.assertEqual(tuple(matrix.get(-1, 0)), (0, 0, 0))
+
+        matrix.set(1, 1, WHITE)
+        self.assert_changed(matrix, [6])
+        self.assertEqual(tuple(matrix.get(1, 1)), WHITE)
+
+    def test_set_get_scaled(self):
+        matrix = self.make_matrix(width=4, height=4, pixelSize=(2, 2))
+        matrix.set(0, 1, WHITE)
+        self.assert_changed(matrix, [8, 9, 14, 15])
+        self.assertEqual(tuple(matrix.get(0, 1)), WHITE)
+        self.assertEqual(tuple(matrix.get(1, 1)), (0, 0, 0))
+
     def test_draw_text(self):
         matrix = self.make_matrix(width=32, height=10)
         matrix.drawText('abc', color=WHITE)
@@ -184,4 +221,20 @@ class SharedMatrixIntegerTest(BaseMatrixTest):
     maker = data_maker.Maker(shared_memory=True, integer=True)
 
 
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class NumpyMatrixTest(BaseMatrixTest):
+    maker = data_maker.numpy and data_maker.Maker(use_numpy=True)
+
+
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class NumpyMatrixIntegerTest(BaseMatrixTest):
+    maker = data_maker.numpy and data_maker.Maker(use_numpy=True, integer=True)
+
+
+@unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+class SharedNumpyMatrixTest(BaseMatrixTest):
+    maker = data_maker.numpy and data_maker.Maker(
+        use_numpy=True, shared_memory=True)
+
+
 del BaseMatrixTest  # http://stackoverflow.com/a/22836015/43839
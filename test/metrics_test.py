@@ -0,0 +1,99 @@
+import json, time, unittest
+
+from bibliopixel.animation import StripChannelTest
+from bibliopixel.animation.runner import Runner
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.layout import Strip
+from bibliopixel.util import metrics
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        h = metrics.Histogram(size=100)
+        for i in range(200):
+            h.record(i)
+
+        self.assertEqual(h.percentile(50), 150)
+        self.assertEqual(h.percentile(100), 199)
+        summary = h.summary()
+        self.assertEqual(summary['count'], 200)
+        self.assertEqual(summary['min'], 100)
+        self.assertEqual(summary['p50'], 150)
+        self.assertEqual(summary['p95'], 195)
+        self.assertEqual(summary['p99'], 199)
+
+    def test_empty(self):
+        h = metrics.Histogram()
+        self.assertEqual(h.percentile(50), 0)
+        self.assertEqual(h.summary(), {'count': 0, 'sum': 0})
+
+
+class MetricsTest(unittest.TestCase):
+    def test_record(self):
+        m = metrics.Metrics('test', 'Test')
+        m.record('stage', 0.5)
+        m.increment('dropped_frames')
+        with m.timer('stage'):
+            pass
+
+        summary = m.summary()
+        self.assertEqual(summary['stages']['stage']['count'], 2)
+        self.assertEqual(summary['counters'], {'dropped_frames': 1})
+        self.assertIn(summary, json.loads(metrics.to_json()))
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE bibliopixel_stage_seconds summary\n', text)
+        labels = 'owner="test",name="Test",id="%d"' % m.id
+        self.assertIn(
+            'bibliopixel_stage_seconds_count{%s,stage="stage"} 2\n' % labels,
+            text)
+        self.assertIn(
+            'bibliopixel_dropped_frames_total{%s} 1\n' % labels, text)
+
+    def test_animation(self):
+        driver = DriverBase(num=12)
+        anim = StripChannelTest(Strip(driver))
+        anim.internal_delay = 0.001
+        anim.set_runner(Runner(max_steps=3))
+        anim.start()
+
+        stages = anim.metrics.summary()['stages']
+        self.assertEqual(stages['step']['count'], 3)
+        self.assertEqual(stages['update']['count'], 3)
+        self.assertEqual(stages['sleep']['count'], 3)
+
+        stages = driver.metrics.summary()['stages']
+        self.assertEqual(stages['compute_packet']['count'], 4)
+        self.assertEqual(stages['send_packet']['count'], 4)
+        self.assertEqual(stages['sync']['count'], 4)
+
+    def run_slow(self, frame_policy):
+        class Slow(StripChannelTest):
+            def step(self, amt=1):
+                self.amounts.append(amt)
+                time.sleep(0.025)
+
+        anim = Slow(Strip(DriverBase(num=12)))
+        anim.amounts = []
+        anim.internal_delay = 0.01
+        anim.set_runner(Runner(max_steps=4, frame_policy=frame_policy))
+        anim.start()
+        return anim
+
+    def test_dropped_frames(self):
+        anim = self.run_slow('slip')
+        self.assertEqual(anim.amounts, [1, 1, 1, 1])
+        self.assertEqual(anim.metrics.counters['dropped_frames'], 4)
+
+    def test_skipped_frames(self):
+        # Skipped frames don't count towards max_steps under 'skip'...
+        anim = self.run_slow('skip')
+        self.assertEqual(anim.amounts, [1, 1, 1, 1])
+        self.assertEqual(anim.metrics.counters['dropped_frames'], 4)
+        self.assertGreater(anim.metrics.counters['skipped_frames'], 0)
+
+        # ...but do under 'drop', where they are stepped.
+        anim = self.run_slow('drop')
+        self.assertEqual(anim.amounts[0], 1)
+        self.assertGreater(anim.amounts[1], 1)
+        self.assertLess(len(anim.amounts), 4)
@@ -0,0 +1,236 @@
+import socket, time, unittest
+
+from bibliopixel.drivers import network, network_protocol, network_udp
+from bibliopixel.drivers.async_network_receiver import (
+    AsyncNetworkReceiver, LatestFrame)
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.drivers.network_receiver import NetworkReceiver
+from bibliopixel.layout import Strip
+from bibliopixel.util import metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class NetworkTest(unittest.TestCase):
+    def setUp(self):
+        self.received = Strip(DriverBase(num=4))
+        self.receiver = NetworkReceiver(self.received, port=0,
+                                        interface='127.0.0.1')
+        self.port = self.receiver._server.server_address[1]
+        self.receiver.start()
+
+    def tearDown(self):
+        self.receiver.stop()
+
+    def test_frames(self):
+        driver = network.Network(num=4, port=self.port, max_in_flight=3)
+        strip = Strip(driver)
+        for i in range(10):
+            strip.fill((i, 2 * i, 3 * i))
+            strip.push_to_driver()
+
+        connection = driver._connection
+        self.assertTrue(connection.sock)
+        self.assertLessEqual(connection.in_flight, 3)
+
+        driver.cleanup()
+        self.assertEqual(connection.in_flight, 0)
+        self.assertEqual(self.received.get(3), (9, 18, 27))
+
+    def test_large_frames(self):
+        num = 30000  # Too many for version 1 of the protocol.
+        self.received = Strip(DriverBase(num=num))
+        self.receiver.layout = self.received
+
+        driver = network.Network(num=num, port=self.port, compress=1,
+                                 delta=True)
+        strip = Strip(driver)
+        strip.fill((1, 2, 3))
+        strip.push_to_driver()
+        strip.set(20000, (4, 5, 6))
+        strip.push_to_driver()
+        driver.cleanup()
+
+        self.assertEqual(driver._connection.version, 2)
+        self.assertEqual(driver._changed, (20000, 20001))
+        self.assertEqual(self.received.get(19999), (1, 2, 3))
+        self.assertEqual(self.received.get(20000), (4, 5, 6))
+        self.assertEqual(self.received.get(num - 1), (1, 2, 3))
+
+    def test_version_1(self):
+        driver = network.Network(num=4, port=self.port, protocol=1)
+        strip = Strip(driver)
+        strip.fill((1, 2, 3))
+        strip.push_to_driver()
+        driver.cleanup()
+        self.assertEqual(driver._connection.version, 1)
+        self.assertEqual(self.received.get(3), (1, 2, 3))
+
+    def test_brightness(self):
+        driver = network.Network(num=4, port=self.port)
+        self.assertTrue(driver.set_device_brightness(128))
+        driver.cleanup()
+
+    def test_reconnect(self):
+        driver = network.Network(num=4, port=free_port())
+        strip = Strip(driver)
+        strip.push_to_driver()  # Fails, but doesn't raise
+
+        connection = driver._connection
+        self.assertIsNone(connection.sock)
+        self.assertEqual(connection.retry_delay, 2 * network.RETRY_DELAY_MIN)
+
+        connection.port, connection.retry_time = self.port, 0
+        strip.fill((1, 2, 3))
+        strip.push_to_driver()
+        driver.cleanup()
+        self.assertEqual(connection.retry_delay, network.RETRY_DELAY_MIN)
+        self.assertEqual(self.received.get(0), (1, 2, 3))
+
+
+class FrameProtocolTest(unittest.TestCase):
+    def round_trip(self, encoder, decoder, data, offset=0):
+        frame = encoder.encode(data, offset)
+        cmd, flags, sequence, off, length = network_protocol.HEADER.unpack_from(
+            frame)
+        self.assertEqual(cmd, network_protocol.CMDTYPE.PIXEL_DATA_V2)
+        self.assertEqual(off, offset)
+        payload = frame[network_protocol.HEADER.size:]
+        self.assertEqual(len(payload), length)
+        return flags, decoder.decode(flags, sequence, off, payload)
+
+    def test_delta(self):
+        encoder = network_protocol.FrameEncoder(compress=9, delta=True)
+        decoder = network_protocol.FrameDecoder()
+        frames = [(bytes(range(90)), 0), (bytes(range(90)), 0),
+                  (b'abcdef', 10), (bytes(300), 0)]
+        for data, offset in frames:
+            flags, decoded = self.round_trip(encoder, decoder, data, offset)
+            self.assertEqual(decoded, data)
+            self.assertTrue(flags & network_protocol.DELTA)
+        self.assertEqual(decoder.previous, bytes(300))
+
+    def test_incompressible(self):
+        encoder = network_protocol.FrameEncoder(compress=9)
+        decoder = network_protocol.FrameDecoder()
+        flags, decoded = self.round_trip(encoder, decoder, b'abc')
+        self.assertEqual((flags, decoded), (0, b'abc'))
+
+    def test_missing_frame(self):
+        encoder = network_protocol.FrameEncoder(delta=True)
+        decoder = network_protocol.FrameDecoder()
+        self.round_trip(encoder, decoder, b'abc')
+        encoder.encode(b'def')
+        with self.assertRaises(ValueError):
+            self.round_trip(encoder, decoder, b'ghi')
+
+
+class NetworkUDPTest(unittest.TestCase):
+    def test_fragments(self):
+        received = Strip(DriverBase(num=1000))
+        receiver = NetworkReceiver(received, port=0, interface='127.0.0.1',
+                                   udp=True)
+        port = receiver._server.server_address[1]
+        receiver.start()
+        try:
+            for protocol in 1, 2:
+                driver = network_udp.NetworkUDP(
+                    num=1000, host='127.0.0.1', port=port, protocol=protocol,
+                    mtu=500)
+                strip = Strip(driver)
+                strip.fill((protocol, 2, 3))
+                strip.push_to_driver()
+                driver.cleanup()
+
+                for i in range(100):
+                    if received.get(999) == (protocol, 2, 3):
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(received.get(999), (protocol, 2, 3))
+        finally:
+            receiver.stop()
+
+        self.assertEqual(receiver.metrics.counters, {'frames': 2})
+
+    def test_version_1_not_fragmented(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            sock.settimeout(2)
+            driver = network_udp.NetworkUDP(
+                num=1000, host='127.0.0.1', port=sock.getsockname()[1])
+            strip = Strip(driver)
+            strip.fill((1, 2, 3))
+            strip.push_to_driver()
+            driver.cleanup()
+
+            datagram = sock.recv(65536)
+        self.assertEqual(datagram[0], network_protocol.CMDTYPE.PIXEL_DATA)
+        self.assertEqual(len(datagram), 3 + 3000)
+        self.assertEqual(datagram[3:], b'\1\2\3' * 1000)
+
+    def test_reassembler(self):
+        m = metrics.Metrics('test', 'reassembler')
+        r = network_protocol.Reassembler(m)
+        packet = bytes(range(100))
+        header = network_protocol.FRAGMENT_HEADER
+        fragments = [header.unpack_from(f) + (f[header.size:],)
+                     for f in network_protocol.fragment(packet, 5, 40)]
+        self.assertEqual(len(fragments), 4)
+
+        results = [r.add_fragment(*f[1:]) for f in reversed(fragments)]
+        self.assertEqual(results, [None, None, None, packet])
+
+        self.assertFalse(r.add_fragment(*fragments[0][1:]))
+        self.assertFalse(r.accept(4))
+        self.assertTrue(r.accept(8))
+        self.assertEqual(m.counters,
+                         {'frames': 2, 'late_frames': 2, 'lost_frames': 2})
+
+
+class AsyncNetworkReceiverTest(unittest.TestCase):
+    def test_frames(self):
+        received = Strip(DriverBase(num=30000))
+        receiver = AsyncNetworkReceiver(received, port=0,
+                                        interface='127.0.0.1')
+        receiver.start()
+        try:
+            for protocol in 1, 2:
+                num = 30000 if protocol == 2 else 1000
+                driver = network.Network(num=num, port=receiver.address[1],
+                                         protocol=protocol, compress=1)
+                strip = Strip(driver)
+                for i in range(20):
+                    strip.fill((protocol, i, 3))
+                    strip.push_to_driver()
+                driver.cleanup()
+
+                for i in range(100):
+                    if received.get(num - 1) == (protocol, 19, 3):
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(received.get(num - 1), (protocol, 19, 3))
+        finally:
+            receiver.stop()
+
+        counters = receiver.metrics.counters
+        self.assertEqual(counters['frames'], 40)
+        self.assertEqual(counters['frames'], counters['displayed_frames'] +
+                         counters.get('dropped_frames', 0))
+
+    def test_latest_frame(self):
+        latest = LatestFrame(12)
+        self.assertFalse(latest.put(b'abc', 0))
+        self.assertTrue(latest.put(b'defghi', 2))
+        data, offset = latest.take()
+        self.assertEqual((bytes(data), offset), (b'abc\0\0\0defghi', 0))
+
+        latest.put(b'xyz', 1)
+        data, offset = latest.take()
+        self.assertEqual((bytes(data), offset), (b'xyz', 1))
+
+        latest.stop()
+        self.assertIsNone(latest.take())
@@ -0,0 +1,67 @@
+import time, unittest
+
+from bibliopixel.drivers import opc
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.drivers.opc_receiver import OPCReceiver
+from bibliopixel.layout import Strip
+
+
+class OPCTest(unittest.TestCase):
+    def setUp(self):
+        self.received = Strip([DriverBase(num=4), DriverBase(num=6)])
+        self.receiver = OPCReceiver(self.received, port=0,
+                                    interface='127.0.0.1')
+        self.port = self.receiver._server.server_address[1]
+        self.receiver.start()
+
+    def tearDown(self):
+        self.receiver.stop()
+
+    def wait_for(self, index, color):
+        for i in range(100):
+            if self.received.get(index) == color:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.received.get(index), color)
+
+    def test_channels(self):
+        self.assertEqual(self.receiver.channels, {0: (0, 10), 1: (0, 4),
+                                                  2: (4, 6)})
+        drivers = [opc.OPC(num=4, port=self.port, channel=1),
+                   opc.OPC(num=6, port=self.port, channel=2)]
+        strip = Strip(drivers)
+        for i in range(3):
+            strip.fill((i, 2, 3))
+            strip.set(3, (4, 5, 6))
+            strip.push_to_driver()
+
+        connection = drivers[0]._connection
+        self.assertTrue(connection.sock)
+        for d in drivers:
+            d.cleanup()
+
+        self.wait_for(9, (2, 2, 3))
+        self.wait_for(3, (4, 5, 6))
+
+    def test_packet(self):
+        driver = opc.OPC(num=2, port=self.port, channel=5)
+        strip = Strip(driver)
+        strip.set(1, (1, 2, 3))
+        strip.push_to_driver()
+        self.assertEqual(driver._packet, b'\x05\x00\x00\x06\0\0\0\1\2\3')
+        driver.cleanup()
+
+        # Channel 5 doesn't exist in the receiving layout.
+        self.assertEqual(self.received.get(1), (0, 0, 0))
+
+    def test_broadcast(self):
+        driver = opc.OPC(num=12, port=self.port)
+        strip = Strip(driver)
+        strip.fill((7, 8, 9))
+        strip.push_to_driver()
+        driver.cleanup()
+        self.wait_for(9, (7, 8, 9))
+
+    def test_too_many_pixels(self):
+        with self.assertRaises(ValueError):
+            opc.OPC(num=opc.MAX_PIXELS + 1)
@@ -0,0 +1,70 @@
+import unittest
+
+from bibliopixel.threads import scheduler
+from bibliopixel.util import metrics
+
+
+class FakeClock(object):
+    def __init__(self, time=100.0):
+        self.time = time
+        self.sleeps = []
+
+    def __call__(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.time += seconds
+
+
+class SchedulerTest(unittest.TestCase):
+    def make(self, policy=scheduler.SLIP, **kwds):
+        self.clock = FakeClock()
+        self.metrics = metrics.Metrics('test', policy)
+        self.scheduler = scheduler.Scheduler(
+            0.1, policy, metrics=self.metrics, clock=self.clock, **kwds)
+        self.scheduler.start(self.clock.sleep)
+        return self.scheduler
+
+    def frame(self, seconds):
+        self.clock.time += seconds
+        return self.scheduler.wait(self.clock.sleep)
+
+    def test_no_drift(self):
+        s = self.make()
+        for i in range(100):
+            self.assertEqual(self.frame(0.0123), 1)
+        self.assertAlmostEqual(self.clock.time, 110.0)
+        self.assertEqual(s.frame, 100)
+        jitter = self.metrics.summary()['stages']['jitter']
+        self.assertEqual(jitter['count'], 100)
+        self.assertAlmostEqual(jitter['max'], 0)
+
+    def test_slip(self):
+        self.make(scheduler.SLIP)
+        self.assertEqual(self.frame(0.25), 1)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(self.frame(0.01), 1)
+        self.assertAlmostEqual(self.clock.time, 100.35)
+        self.assertEqual(self.metrics.counters, {'dropped_frames': 1})
+
+    def test_skip(self):
+        s = self.make(scheduler.SKIP)
+        self.assertEqual(self.frame(0.25), 3)
+        self.assertAlmostEqual(self.clock.time, 100.3)
+        self.assertEqual(s.frame, 3)
+        self.assertEqual(self.frame(0.01), 1)
+        self.assertAlmostEqual(self.clock.time, 100.4)
+        self.assertEqual(self.metrics.counters,
+                         {'dropped_frames': 1, 'skipped_frames': 2})
+
+    def test_sync_time(self):
+        self.make(sync_time=1000.0, wall_clock=lambda: 1000.234)
+        self.assertEqual(self.scheduler.frame, 3)
+        self.assertAlmostEqual(self.clock.sleeps[0], 0.066)
+        self.assertEqual(self.frame(0.01), 1)
+        self.assertAlmostEqual(self.clock.time, 100.166)
+
+    def test_bad_policy(self):
+        with self.assertRaises(ValueError):
+            scheduler.Scheduler(0.1, 'wait')
@@ -0,0 +1,78 @@
+import os, tempfile, unittest
+
+from bibliopixel.drivers import shared_memory
+from bibliopixel.layout import Strip
+
+
+class SharedMemoryTest(unittest.TestCase):
+    def frames(self, **kwds):
+        driver = shared_memory.SharedMemory(num=4, **kwds)
+        strip = Strip(driver)
+        reader = shared_memory.FrameReader(**kwds)
+        try:
+            self.assertEqual(reader.pixel_count, 4)
+            self.assertEqual(reader.frame, 0)
+
+            strip.set(1, (1, 2, 3))
+            strip.push_to_driver()
+            self.assertTrue(reader.wait(0, timeout=1))
+            frame, timestamp, data = reader.read()
+            self.assertEqual(frame, 1)
+            self.assertEqual(data, b'\0\0\0\1\2\3\0\0\0\0\0\0')
+            self.assertGreater(timestamp, 0)
+
+            strip.set(3, (4, 5, 6))
+            strip.push_to_driver()
+            self.assertEqual(reader.read(data)[0], 2)
+            self.assertEqual(data[9:], b'\4\5\6')
+            self.assertEqual(bytes(reader.data[9:]), b'\4\5\6')
+            self.assertFalse(reader.wait(2, timeout=0.01))
+        finally:
+            reader.close()
+            driver.cleanup()
+
+    def test_shared_memory(self):
+        self.frames(name='bp_shared_memory_test')
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.frames(path=os.path.join(d, 'frames'))
+
+    def test_torn_frame(self):
+        name = 'bp_shared_memory_test_torn'
+        driver = shared_memory.SharedMemory(width=2, height=3, name=name)
+        reader = shared_memory.FrameReader(name=name)
+        try:
+            self.assertEqual((reader.width, reader.height), (2, 3))
+            # Pretend a frame is being written.
+            shared_memory.SEQUENCE.pack_into(
+                driver._segment.buf, shared_memory.SEQUENCE_OFFSET, 1)
+            with self.assertRaises(IOError):
+                reader.read(retries=3)
+        finally:
+            reader.close()
+            driver.cleanup()
+
+    def test_existing_segment(self):
+        name = 'bp_shared_memory_test_existing'
+        driver = shared_memory.SharedMemory(num=4, name=name)
+        try:
+            with self.assertRaises(ValueError):
+                shared_memory.SharedMemory(num=4, name=name)
+
+            replaced = shared_memory.SharedMemory(num=2, name=name,
+                                                  replace=True)
+            with shared_memory.FrameReader(name=name) as reader:
+                self.assertEqual(reader.pixel_count, 2)
+            replaced.cleanup()
+        finally:
+            driver._data.release()
+            driver._segment.close()
+
+    def test_bad_segment(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'frames')
+            with open(path, 'wb') as fp:
+                fp.write(bytes(100))
+            with self.assertRaises(ValueError):
+                shared_memory.FrameReader(path=path)
@@ -0,0 +1,242 @@
+import json, os, socket, struct, time, unittest, zlib
+
+from bibliopixel.drivers.SimPixel import driver, websocket
+from bibliopixel.drivers.SimPixel.SimpleWebSocketServer import (
+    deflate_message, deflate_offer)
+from bibliopixel.layout import Strip
+
+HANDSHAKE = (
+    'GET / HTTP/1.1\r\n'
+    'Host: localhost\r\n'
+    'Upgrade: websocket\r\n'
+    'Connection: Upgrade\r\n'
+    'Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+    'Sec-WebSocket-Version: 13\r\n%s\r\n')
+DEFLATE = 'Sec-WebSocket-Extensions: permessage-deflate; client_max_window_bits\r\n'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def read_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def read_message(sock):
+    b1, b2 = read_exactly(sock, 2)
+    length = b2 & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', read_exactly(sock, 2))
+    elif length == 127:
+        length, = struct.unpack('!Q', read_exactly(sock, 8))
+    data = read_exactly(sock, length)
+    if b1 & 0x40:
+        data = inflate(data)
+    return data
+
+
+def inflate(data):
+    return zlib.decompressobj(-15).decompress(data + b'\x00\x00\xff\xff')
+
+
+def send_text(sock, text, compressed=False):
+    b1, data, mask = 0x81, json.dumps(text).encode(), os.urandom(4)
+    if compressed:
+        b1 |= 0x40
+        data = deflate_message(data)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    sock.sendall(struct.pack('!BB', b1, 0x80 | len(data)) + mask + masked)
+
+
+class EncodingTest(unittest.TestCase):
+    def test_runs(self):
+        base = bytes(30)
+        pixels = bytearray(base)
+        pixels[0:3] = b'\1\2\3'
+        pixels[9:10] = b'\4'
+        pixels[27:30] = b'\5\5\5'
+
+        self.assertEqual(websocket.runs(base, bytes(pixels)), b''.join((
+            struct.pack('<IH', 0, 4), bytes(pixels[0:12]),
+            struct.pack('<IH', 9, 1), b'\5\5\5')))
+        self.assertEqual(websocket.runs(base, base), b'')
+
+    def test_frame_messages(self):
+        frame = websocket.Frame(7, bytes(range(30)))
+        self.assertEqual(frame.message()[2:],
+                         websocket.PIXELS + frame.pixels)
+        keyframe = websocket.KEYFRAME + struct.pack('<I', 7) + frame.pixels
+        self.assertEqual(frame.message('xor')[2:], keyframe)
+
+        base = 5, bytes(range(30))
+        xor = frame.message('xor', base)[2:]
+        header = websocket.XOR + struct.pack('<II', 7, 5)
+        self.assertEqual(xor, header + bytes(30))
+        self.assertIs(frame.message('xor', base), frame.message('xor', base))
+
+        compressed = frame.message('xor', base, 15)
+        self.assertEqual(compressed[0], 0xC2)
+        self.assertEqual(
+            inflate(compressed[2:]), xor)
+
+    def test_deflate_offer(self):
+        self.assertEqual(deflate_offer(None), None)
+        self.assertEqual(deflate_offer('x-webkit-deflate-frame'), None)
+        self.assertEqual(
+            deflate_offer('permessage-deflate; client_max_window_bits'), 15)
+        self.assertEqual(
+            deflate_offer('permessage-deflate; server_max_window_bits=10'), 10)
+        self.assertEqual(deflate_offer(
+            'permessage-deflate; server_max_window_bits=8, '
+            'permessage-deflate'), 15)
+        self.assertEqual(deflate_offer('permessage-deflate; foo=1'), None)
+
+
+class BinaryFrameTest(unittest.TestCase):
+    def test_lengths(self):
+        for size, header in ((10, 2), (125, 2), (126, 4), (0x10000, 10)):
+            frame = websocket.binary_frame(websocket.PIXELS, bytes(size - 2))
+            self.assertEqual(len(frame), header + size)
+            self.assertEqual(frame[0], 0x82)
+
+
+class SimPixelTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = driver.SimPixel(
+            4, port=free_port(), pixel_positions=[(i, 0, 0) for i in range(4)])
+        self.strip = Strip(self.driver)
+        self.sockets = []
+
+    def tearDown(self):
+        for s in self.sockets:
+            s.close()
+        self.driver.cleanup()
+
+    def connect(self, rcvbuf=None, extensions=''):
+        sock = socket.socket()
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        sock.settimeout(5)
+        sock.connect(('127.0.0.1', self.driver.port))
+        self.sockets.append(sock)
+        sock.sendall((HANDSHAKE % extensions).encode())
+
+        response = b''
+        while not response.endswith(b'\r\n\r\n'):
+            response += sock.recv(1)
+        self.assertIn(b'101', response)
+        self.assertEqual(bool(extensions), b'permessage-deflate' in response)
+        return sock
+
+    def wait_for_clients(self, count):
+        for i in range(500):
+            if len(self.driver.websocks) == count:
+                return
+            time.sleep(0.01)
+        self.fail('Clients never connected')
+
+    def test_frames(self):
+        sock = self.connect()
+        self.assertEqual(read_message(sock)[:2], websocket.POSITIONS)
+        self.wait_for_clients(1)
+
+        self.strip.fill((1, 2, 3))
+        self.strip.push_to_driver()
+        self.assertEqual(read_message(sock),
+                         websocket.PIXELS + bytes((1, 2, 3) * 4))
+
+    def test_slow_client(self):
+        self.driver.cleanup()
+        self.driver = driver.SimPixel(
+            20000, port=free_port(),
+            pixel_positions=[(i, 0, 0) for i in range(20000)])
+        self.strip = Strip(self.driver)
+
+        self.connect(rcvbuf=4096)  # and never read from it
+        fast = self.connect()
+        read_message(fast)
+        self.wait_for_clients(2)
+
+        start = time.time()
+        for i in range(100):
+            self.strip.fill((i, i, i))
+            self.strip.push_to_driver()
+        self.assertLess(time.time() - start, 5)
+
+        clients = self.driver.server.connections.values()
+        self.assertTrue(any(c.dropped_frames for c in clients))
+        for c in clients:
+            self.assertLessEqual(len(c.frames), websocket.MAX_QUEUED_FRAMES)
+
+        # The fast client still gets the latest frame.
+        for i in range(100):
+            message = read_message(fast)
+            if message[2] == 99:
+                break
+        else:
+            self.fail('Never got the last frame')
+
+    def negotiate(self, sock, request):
+        read_message(sock)
+        self.wait_for_clients(1)
+        send_text(sock, request)
+        return json.loads(read_message(sock).decode())
+
+    def push(self, color):
+        self.strip.fill(color)
+        self.strip.push_to_driver()
+
+    def test_deltas(self):
+        sock = self.connect(extensions=DEFLATE)
+        reply = self.negotiate(sock, {'encodings': ['zip', 'runs']})
+        self.assertEqual(reply, {'encoding': 'runs', 'fps': 0})
+
+        self.push((1, 2, 3))
+        header = websocket.KEYFRAME + struct.pack('<I', 1)
+        self.assertEqual(read_message(sock), header + bytes((1, 2, 3) * 4))
+
+        # Until frame 1 is acknowledged, every frame is a keyframe.
+        self.strip.set(3, (4, 5, 6))
+        self.strip.push_to_driver()
+        self.assertEqual(read_message(sock)[:2], websocket.KEYFRAME)
+
+        send_text(sock, {'ack': 1}, compressed=True)
+        for i in range(500):
+            if self.driver.server.connections:
+                client, = self.driver.server.connections.values()
+                if client.base:
+                    break
+            time.sleep(0.01)
+
+        self.strip.set(3, (7, 8, 9))
+        self.strip.push_to_driver()
+        self.assertEqual(read_message(sock), b''.join((
+            websocket.RUNS, struct.pack('<II', 3, 1),
+            struct.pack('<IH', 3, 1), bytes((7, 8, 9)))))
+
+    def test_fps(self):
+        self.driver.cleanup()
+        self.driver = driver.SimPixel(
+            4, port=free_port(), max_fps=20,
+            pixel_positions=[(i, 0, 0) for i in range(4)])
+        self.strip = Strip(self.driver)
+
+        sock = self.connect()
+        reply = self.negotiate(sock, {'fps': 50})
+        self.assertEqual(reply, {'encoding': 'pixels', 'fps': 20})
+
+        start = time.time()
+        for i in range(4):
+            self.push((i, i, i))
+            read_message(sock)
+        # The first frame is sent at once, and each other 1 / 20 s later.
+        self.assertGreaterEqual(time.time() - start, 0.14)
@@ -0,0 +1,57 @@
+import os, tempfile, unittest
+from unittest import mock
+
+from bibliopixel.drivers.SPI import interfaces
+
+
+class FakeSpiDev(object):
+    def __init__(self):
+        self.transfers = []
+
+    def xfer2(self, data):
+        assert isinstance(data, list)
+        self.transfers.append(data)
+
+
+class SpiInterfaceTest(unittest.TestCase):
+    def test_bufsiz(self):
+        with tempfile.NamedTemporaryFile('w') as fp:
+            fp.write('65536\n')
+            fp.flush()
+            with mock.patch.object(interfaces, 'SPIDEV_BUFSIZ_FILE', fp.name):
+                self.assertEqual(interfaces.spidev_bufsiz(), 65536)
+
+        with mock.patch.object(interfaces, 'SPIDEV_BUFSIZ_FILE', '/no/file'):
+            self.assertEqual(interfaces.spidev_bufsiz(),
+                             interfaces.DEFAULT_CHUNK_SIZE)
+            iface = interfaces.SpiDummyInterface(dev='', spi_speed=1)
+            self.assertEqual(iface.chunk_size, interfaces.DEFAULT_CHUNK_SIZE)
+
+    def test_chunks(self):
+        iface = interfaces.SpiDummyInterface(dev='', spi_speed=1, chunk_size=4)
+        data = bytearray(range(10))
+        chunks = list(iface.chunks(data))
+        self.assertEqual([bytes(c) for c in chunks],
+                         [bytes(range(4)), bytes(range(4, 8)), b'\x08\x09'])
+
+        data[0] = 23
+        self.assertEqual(chunks[0][0], 23)  # It didn't copy!
+
+    def test_file(self):
+        data = bytearray(range(250)) * 3
+        with tempfile.TemporaryDirectory() as d:
+            dev = os.path.join(d, 'spidev0.0')
+            open(dev, 'wb').close()
+            iface = interfaces.SpiFileInterface(
+                dev=dev, spi_speed=1, chunk_size=100)
+            iface.send_packet(data)
+            os.close(iface._fd)
+
+            with open(dev, 'rb') as fp:
+                self.assertEqual(fp.read(), data)
+
+    def test_old_pydev(self):
+        iface = interfaces.SpiDummyInterface(dev='', spi_speed=1, chunk_size=4)
+        iface._spi = FakeSpiDev()
+        interfaces.SpiPyDevInterface.send_packet(iface, bytearray(range(6)))
+        self.assertEqual(iface._spi.transfers, [[0, 1, 2, 3], [4, 5]])
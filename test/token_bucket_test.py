@@ -0,0 +1,30 @@
+import unittest
+
+from bibliopixel.threads.token_bucket import TokenBucket
+from . scheduler_test import FakeClock
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, burst=3, clock=clock, sleep=clock.sleep)
+        waits = [bucket.take() for i in range(5)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 0.1)
+        self.assertAlmostEqual(waits[4], 0.1)
+
+        clock.time += 10  # The bucket refills, but only up to burst
+        self.assertEqual([bucket.take() for i in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.take(), 0.1)
+
+    def test_reserve(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, clock=clock, sleep=lambda s: None)
+        self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 0.5)
+        # The first caller hasn't finished waiting, so this one waits longer.
+        self.assertAlmostEqual(bucket.take(), 1.0)
+
+    def test_bad_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
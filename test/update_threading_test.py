@@ -0,0 +1,143 @@
+import multiprocessing, threading, time, unittest
+
+from bibliopixel import data_maker
+from bibliopixel.drivers.driver_base import DriverBase
+from bibliopixel.layout import Strip
+
+
+class RecordingDriver(DriverBase):
+    def __init__(self, *args, delay=0, **kwds):
+        super().__init__(*args, **kwds)
+        self.delay = delay
+        self.sent = []
+        self.synced = 0
+
+    def _compute_packet(self):
+        self._render()
+        self._packet = self._buf
+
+    def _send_packet(self):
+        time.sleep(self.delay)
+        self.sent.append(bytes(self._packet))
+
+    def sync(self):
+        self.synced += 1
+
+
+class UpdateThreadingTest(unittest.TestCase):
+    def run_frames(self, threadedUpdate, delay=0):
+        drivers = [RecordingDriver(num=2, delay=delay),
+                   RecordingDriver(num=2, delay=delay / 2)]
+        strip = Strip(drivers, threadedUpdate=threadedUpdate)
+        for i in range(8):
+            strip.fill((i, i, i))
+            strip.push_to_driver()
+        strip.threading.wait_for_update()
+        return drivers
+
+    def assert_frames(self, drivers):
+        expected = [bytes([i] * 6) for i in range(8)]
+        for d in drivers:
+            self.assertEqual(d.sent, expected)
+            self.assertEqual(d.synced, 8)
+
+    def test_unthreaded(self):
+        self.assert_frames(self.run_frames(False))
+
+    def test_threaded(self):
+        self.assert_frames(self.run_frames(True, delay=0.002))
+
+    def test_depth(self):
+        self.assert_frames(self.run_frames(4, delay=0.002))
+
+    def test_stop(self):
+        drivers = [RecordingDriver(num=2, delay=0.01),
+                   RecordingDriver(num=2)]
+        strip = Strip(drivers, threadedUpdate=True)
+        strip.fill((1, 1, 1))
+        strip.push_to_driver()
+        strip.threading.stop()
+
+        for d in drivers:
+            self.assertEqual(d.sent, [bytes([1] * 6)])
+        for p in strip.threading.pipelines:
+            self.assertFalse(p.compute_thread.is_alive())
+            self.assertFalse(p.io_thread.is_alive())
+        self.assertTrue(strip.threading.barrier.broken)
+
+    def test_cleanup(self):
+        drivers = [RecordingDriver(num=2)]
+        strip = Strip(drivers, threadedUpdate=True)
+        pipelines = strip.threading.pipelines
+        strip.cleanup()
+        for p in pipelines:
+            self.assertFalse(p.compute_thread.is_alive())
+            self.assertFalse(p.io_thread.is_alive())
+
+        # The layout can still be used after cleanup().
+        strip.fill((2, 2, 2))
+        strip.push_to_driver()
+        strip.cleanup()
+        self.assertEqual(drivers[0].sent, [bytes(6), bytes([2] * 6), bytes(6)])
+
+    def test_overlap(self):
+        # The animation thread is free while the packet is being sent.
+        drivers = [RecordingDriver(num=2, delay=0.1)]
+        strip = Strip(drivers, threadedUpdate=True)
+        start = time.time()
+        strip.push_to_driver()
+        self.assertLess(time.time() - start, 0.09)
+        strip.threading.wait_for_update()
+        self.assertGreaterEqual(time.time() - start, 0.1)
+        self.assertEqual(drivers[0].sent, [bytes(6)])
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(),
+                 'fork is not available')
+class UpdateProcessesTest(unittest.TestCase):
+    def test_processes(self):
+        maker = data_maker.Maker(shared_memory=True)
+        drivers = [RecordingDriver(num=2), RecordingDriver(num=2)]
+        strip = Strip(drivers, threadedUpdate='process', maker=maker)
+        try:
+            for i in range(4):
+                strip.fill((i, i, i))
+                strip.push_to_driver()
+                strip.threading.wait_for_update()
+                # The workers rendered into the shared _buf.
+                for d in drivers:
+                    self.assertEqual(bytes(d._buf), bytes([i] * 6))
+        finally:
+            strip.threading.stop()
+
+    def test_lazy_start(self):
+        maker = data_maker.Maker(shared_memory=True)
+        drivers = [RecordingDriver(num=2)]
+        strip = Strip(drivers, threadedUpdate='process', maker=maker)
+        self.assertEqual(strip.threading.processes, [])
+
+        strip.push_to_driver()
+        process, = strip.threading.processes
+        self.assertTrue(process.process.is_alive())
+
+        strip.cleanup()
+        self.assertFalse(process.process.is_alive())
+        self.assertEqual(strip.threading.processes, [])
+
+    def test_not_shared(self):
+        with self.assertRaises(ValueError):
+            Strip([RecordingDriver(num=2)], threadedUpdate='process')
+
+    @unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+    def test_numpy_not_shared(self):
+        maker = data_maker.Maker(use_numpy=True)
+        with self.assertRaises(ValueError):
+            Strip([RecordingDriver(num=2)], threadedUpdate='process',
+                  maker=maker)
+
+    @unittest.skipIf(not data_maker.numpy, 'numpy is not installed')
+    def test_numpy_shared(self):
+        maker = data_maker.Maker(use_numpy=True, shared_memory=True)
+        strip = Strip([RecordingDriver(num=2)], threadedUpdate='process',
+                      maker=maker)
+        strip.threading.stop()